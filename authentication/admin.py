@@ -1,3 +1,36 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.auth.models import User
 
-# Register your models here.
+from jobs.models import Job
+from projects.deletion import delete_user
+
+
+class UserAdmin(BaseUserAdmin):
+    """
+    User admin that deletes through projects.deletion.delete_user.
+
+    Django's cascade would load every project and vacancy of the user into
+    memory inside one transaction; delete_user hands large accounts to a
+    background job that purges them in batches.
+    """
+
+    def _delete(self, request, user):
+        job = delete_user(user, owner=request.user)
+        if isinstance(job, Job):
+            self.message_user(
+                request,
+                f'{user} was deactivated, their projects are purged in the background (job {job.pk}).',
+                messages.WARNING
+            )
+
+    def delete_model(self, request, obj):
+        self._delete(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            self._delete(request, user)
+
+
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
@@ -0,0 +1,50 @@
+import time
+
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from project_management.querycache import LRUCache, cached_query
+
+# Seconds a cached user's is_active flag is trusted before it is read again
+ACTIVE_RECHECK_SECONDS = 30
+
+# user id -> monotonic time the user was last seen active in the database
+_active_checks = LRUCache(10000)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication with the token/user lookup served from the query cache.
+
+    The cache is invalidated on any User or Token write, so logout, password
+    change and deactivation take effect immediately. Bulk queryset updates
+    of users send no signal, so is_active is also read from the database
+    every ACTIVE_RECHECK_SECONDS: such a deactivation takes effect within
+    that delay.
+    """
+
+    def authenticate_credentials(self, key):
+        tokens = cached_query(Token.objects.select_related('user').filter(key=key))
+        if not tokens:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        token = tokens[0]
+        if not token.user.is_active or not self.is_still_active(token.user):
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
+
+    @staticmethod
+    def is_still_active(user):
+        """Whether the user is active in the database, checked at most every ACTIVE_RECHECK_SECONDS"""
+        now = time.monotonic()
+        checked_at = _active_checks.get(user.pk)
+        if checked_at is not None and now - checked_at < ACTIVE_RECHECK_SECONDS:
+            return True
+        if not User._base_manager.filter(pk=user.pk, is_active=True).exists():
+            return False
+        _active_checks.set(user.pk, now)
+        return True
@@ -4,6 +4,8 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from rest_framework.authtoken.models import Token
 
+from project_management.querycache import cached_count
+
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """
@@ -134,7 +136,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_projects_count(self, obj):
         """Get the number of projects owned by this user"""
-        return obj.projects.count()
+        return cached_count(obj.projects.all())
 
     def validate_email(self, value):
         """Validate email uniqueness for updates"""
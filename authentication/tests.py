@@ -1,3 +1,98 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from jobs.models import Job
+from jobs.queue import run_next_job
+from project_management.nplusone import detect_n_plus_one
+from projects.deletion import delete_user
+from projects.models import Project, Vacancy
+
+
+class ProfileQueryTests(TestCase):
+    """The profile endpoint runs a constant number of queries"""
+
+    def test_profile(self):
+        user = User.objects.create_user('owner', password='testpass123')
+        token = Token.objects.create(user=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        with detect_n_plus_one(threshold=1, label='profile'):
+            response = client.get('/auth/profile/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], 'owner')
+
+
+class TokenAuthenticationTests(TestCase):
+    """Cached token lookups still reject deactivated users"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='testpass123')
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_deactivated_by_save(self):
+        self.assertEqual(self.client.get('/auth/profile/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/auth/profile/').status_code, 401)
+
+    def test_deactivated_by_bulk_update(self):
+        self.assertEqual(self.client.get('/auth/profile/').status_code, 200)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with mock.patch('authentication.authentication.ACTIVE_RECHECK_SECONDS', 0):
+            self.assertEqual(self.client.get('/auth/profile/').status_code, 401)
+
+
+class UserAdminTests(TestCase):
+    """Admin deletes users (and their projects) through delete_user"""
+
+    def test_delete_selected(self):
+        admin = User.objects.create_superuser('admin', password='testpass123')
+        user = User.objects.create_user('owner', password='testpass123')
+        project = Project.objects.create(title='Project', description='Test', owner=user)
+        Vacancy.objects.create(project=project, title='Developer', description='Test', requirements='Python')
+        self.client.force_login(admin)
+
+        with mock.patch('authentication.admin.delete_user', wraps=delete_user) as deleted:
+            response = self.client.post('/admin/auth/user/', {
+                'action': 'delete_selected',
+                '_selected_action': [user.pk],
+                'post': 'yes',
+            })
+
+        self.assertEqual(response.status_code, 302)
+        deleted.assert_called_once()
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertFalse(Project.all_objects.filter(pk=project.pk).exists())
+        self.assertFalse(Vacancy.objects.filter(project_id=project.pk).exists())
+
+    @override_settings(PROJECT_DELETION={'SYNC_THRESHOLD': 0})
+    def test_large_account_purged_by_job(self):
+        admin = User.objects.create_superuser('admin', password='testpass123')
+        user = User.objects.create_user('owner', password='testpass123')
+        Token.objects.create(user=user)
+        project = Project.objects.create(title='Project', description='Test', owner=user)
+        Vacancy.objects.create(project=project, title='Developer', description='Test', requirements='Python')
+        self.client.force_login(admin)
+
+        response = self.client.post(f'/admin/auth/user/{user.pk}/delete/', {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        # Hidden and locked out right away, purged by the job
+        user.refresh_from_db()
+        self.assertFalse(user.is_active)
+        self.assertFalse(Token.objects.filter(user=user).exists())
+        self.assertFalse(Project.objects.filter(pk=project.pk).exists())
+        job = Job.objects.get(name='projects.purge_user')
+        self.assertEqual(job.args, [user.pk])
+
+        self.assertTrue(run_next_job())
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertFalse(Project.all_objects.filter(pk=project.pk).exists())
+        self.assertFalse(Vacancy.objects.filter(project_id=project.pk).exists())
@@ -1,11 +1,12 @@
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
-from django.contrib.auth import logout
 from drf_spectacular.utils import extend_schema
 from drf_spectacular.openapi import OpenApiResponse
 
+from throttling.throttles import LoginThrottle, PasswordChangeThrottle, RegisterThrottle
+
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -23,12 +24,14 @@ from .serializers import (
             response=UserSerializer,
             description="User successfully registered"
         ),
-        400: OpenApiResponse(description="Validation errors")
+        400: OpenApiResponse(description="Validation errors"),
+        429: OpenApiResponse(description="Too many registrations, see Retry-After")
     },
     tags=['Authentication']
 )
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([RegisterThrottle])
 def register_view(request):
     """
     Register a new user account
@@ -62,12 +65,14 @@ def register_view(request):
             response=UserSerializer,
             description="Login successful"
         ),
-        400: OpenApiResponse(description="Invalid credentials")
+        400: OpenApiResponse(description="Invalid credentials"),
+        429: OpenApiResponse(description="Too many login attempts, see Retry-After")
     },
     tags=['Authentication']
 )
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([LoginThrottle])
 def login_view(request):
     """
     Authenticate user and return auth token
@@ -115,9 +120,6 @@ def logout_view(request):
         token = Token.objects.get(user=request.user)
         token.delete()
 
-        # Also logout from Django session (if using sessions)
-        logout(request)
-
         return Response({
             'message': 'Logout successful'
         }, status=status.HTTP_200_OK)
@@ -188,12 +190,14 @@ def profile_update_view(request):
     responses={
         200: OpenApiResponse(description="Password changed successfully"),
         400: OpenApiResponse(description="Validation errors"),
-        401: OpenApiResponse(description="Authentication required")
+        401: OpenApiResponse(description="Authentication required"),
+        429: OpenApiResponse(description="Too many attempts, see Retry-After")
     },
     tags=['Authentication']
 )
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@throttle_classes([PasswordChangeThrottle])
 def change_password_view(request):
     """
     Change authenticated user's password
@@ -0,0 +1,49 @@
+"""
+Gunicorn configuration, picked up automatically from the working directory.
+
+The application is loaded and warmed up once in the master process
+(see project_management/warmup.py). Its objects are then frozen out of
+the garbage collector, so the forked workers keep sharing those memory
+pages copy-on-write instead of each importing Django, DRF and
+drf-spectacular again. Each worker opens its database connection right
+after the fork. Startup timings go to the error log.
+
+Command line options (bind, workers, timeout, ...) override this file.
+"""
+
+import gc
+import os
+import time
+
+_started = time.perf_counter()
+
+# ASGI through uvicorn workers: /api/events/ streams need it (501 under WSGI)
+wsgi_app = 'project_management.asgi:application'
+worker_class = 'uvicorn.workers.UvicornWorker'
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+timeout = 120
+
+# Import the application in the master before forking (not per worker)
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() in ('true', '1', 'yes')
+
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from project_management.warmup import format_report, warm_up
+
+    server.log.info('Application loaded in %.1f ms', (time.perf_counter() - _started) * 1000)
+    server.log.info(format_report(warm_up()))
+    gc.collect()
+    # Keep the garbage collector away from the shared pages, it would copy them
+    gc.freeze()
+    server.log.info('Froze %s objects before forking workers', gc.get_freeze_count())
+
+
+def post_worker_init(worker):
+    from project_management.warmup import format_report, warm_up, warm_up_worker
+
+    # Without preloading every worker warms itself up
+    report = warm_up_worker() if worker.cfg.preload_app else {**warm_up(), **warm_up_worker()}
+    worker.log.info('Worker %s: %s', worker.pid, format_report(report))
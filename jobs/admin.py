@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'max_attempts', 'owner', 'run_after', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    list_select_related = ('owner',)
+    search_fields = ('name',)
+    raw_id_fields = ('owner',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'locked_until', 'locked_by')
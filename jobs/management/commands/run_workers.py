@@ -0,0 +1,103 @@
+import multiprocessing
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import run_next_job, worker_id
+from jobs.registry import registered_tasks
+
+
+def _thread_loop(stop_event, poll_interval, burst):
+    worker = worker_id()
+    try:
+        while not stop_event.is_set():
+            if run_next_job(worker):
+                continue
+            if burst:
+                break
+            stop_event.wait(poll_interval)
+    finally:
+        connections.close_all()
+
+
+def _process_main(threads, poll_interval, burst):
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *args: stop_event.set())
+
+    pool = [
+        threading.Thread(
+            target=_thread_loop,
+            args=(stop_event, poll_interval, burst),
+            name=f'job-worker-{index}'
+        )
+        for index in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers (processes x threads polling the job table)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Number of worker processes'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=2,
+            help='Number of worker threads per process'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once the queue is empty instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        processes = max(options['processes'], 1)
+        threads = max(options['threads'], 1)
+        worker_args = (threads, options['poll_interval'], options['burst'])
+
+        self.stdout.write(
+            f'⚙️ Starting {processes} process(es) x {threads} thread(s), '
+            f'tasks: {", ".join(registered_tasks()) or "none"}'
+        )
+
+        if processes == 1:
+            _process_main(*worker_args)
+        else:
+            # Connections must not be shared with forked children
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            children = [
+                context.Process(target=_process_main, args=worker_args, name=f'job-process-{index}')
+                for index in range(processes)
+            ]
+            for child in children:
+                child.start()
+
+            def stop_children(*args):
+                for child in children:
+                    if child.is_alive():
+                        child.terminate()
+
+            signal.signal(signal.SIGTERM, stop_children)
+            try:
+                while any(child.is_alive() for child in children):
+                    time.sleep(0.5)
+            except KeyboardInterrupt:
+                stop_children()
+            for child in children:
+                child.join()
+
+        self.stdout.write(self.style.SUCCESS('✅ Workers stopped'))
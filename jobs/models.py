@@ -0,0 +1,123 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class Job(models.Model):
+    """
+    Background job stored in the database and executed by run_workers
+    """
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(
+        max_length=200,
+        verbose_name="Task Name",
+        help_text="Registered task name (see jobs/registry.py)"
+    )
+    args = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Arguments"
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Keyword Arguments"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        verbose_name="Status"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Attempts"
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=3,
+        verbose_name="Max Attempts"
+    )
+    run_after = models.DateTimeField(
+        verbose_name="Run After",
+        help_text="The job is not claimed before this time (used for retries)"
+    )
+    locked_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Locked Until",
+        help_text="Running jobs whose lock expired are claimed again"
+    )
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="Locked By"
+    )
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="Result"
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name="Last Error"
+    )
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        verbose_name="Owner",
+        help_text="User allowed to see the job status"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Created At"
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Started At"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Finished At"
+    )
+
+    class Meta:
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        ordering = ['-created_at']
+        indexes = [
+            # Claiming: queued jobs that are due, oldest first
+            models.Index(
+                fields=['run_after', 'id'],
+                condition=models.Q(status='queued'),
+                name='job_queued_idx'
+            ),
+            # Re-claiming running jobs whose worker died
+            models.Index(
+                fields=['locked_until'],
+                condition=models.Q(status='running'),
+                name='job_running_lock_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
@@ -0,0 +1,198 @@
+"""
+Database backed job queue.
+
+Jobs are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so any number of
+worker processes/threads can poll the same table without an external broker
+and without two workers picking the same job.
+
+Configuration (settings.JOBS):
+
+    JOBS = {
+        'LOCK_TIMEOUT': 600,    # seconds before a running job counts as abandoned
+        'RETRY_DELAY': 10,      # base delay in seconds, doubled on every attempt
+    }
+
+While a job runs, its worker extends the lock every LOCK_TIMEOUT / 4
+seconds, so only jobs whose worker died are claimed again, however long
+they take. A claim counts as an attempt; an abandoned job without
+attempts left is marked failed instead of being run again.
+"""
+
+import logging
+import os
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_task
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'LOCK_TIMEOUT': 600,
+    'RETRY_DELAY': 10,
+}
+
+# Lock extensions per LOCK_TIMEOUT, a few may be missed before the lock expires
+HEARTBEATS_PER_LOCK = 4
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'JOBS', {}))
+    return config
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def enqueue(task, *args, owner=None, max_attempts=3, delay=None, **kwargs):
+    """
+    Queue a registered task, returns the Job.
+
+    ``task`` is a task name or a function decorated with ``@task``. The job
+    row is created in the caller's transaction, so it only becomes visible
+    to workers once that transaction commits.
+    """
+    name = getattr(task, 'task_name', task)
+    get_task(name)  # fail early for unknown tasks
+    run_after = timezone.now() + (delay or timedelta(0))
+    return Job.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs,
+        owner=owner,
+        max_attempts=max_attempts,
+        run_after=run_after,
+    )
+
+
+def claim_job(worker=None):
+    """
+    Atomically claim the next due job, or return None.
+
+    Running jobs whose lock expired (their worker died) are claimed again,
+    or failed when they have no attempts left.
+    """
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            job = (
+                Job.objects
+                .select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=Job.STATUS_QUEUED, run_after__lte=now)
+                    | Q(status=Job.STATUS_RUNNING, locked_until__lt=now)
+                )
+                .order_by('run_after', 'id')
+                .first()
+            )
+            if job is None:
+                return None
+
+            if job.status == Job.STATUS_RUNNING and job.attempts >= job.max_attempts:
+                logger.warning('Job %s (%s) abandoned on its last attempt, failing it', job.pk, job.name)
+                job.status = Job.STATUS_FAILED
+                job.error = f'Worker {job.locked_by} stopped before finishing attempt {job.attempts}'
+                job.locked_until = None
+                job.finished_at = now
+                job.save(update_fields=['status', 'error', 'locked_until', 'finished_at'])
+                continue
+
+            job.status = Job.STATUS_RUNNING
+            job.attempts += 1
+            job.started_at = now
+            job.locked_until = now + timedelta(seconds=get_config()['LOCK_TIMEOUT'])
+            job.locked_by = worker or worker_id()
+            job.save(update_fields=['status', 'attempts', 'started_at', 'locked_until', 'locked_by'])
+        return job
+
+
+def extend_lock(job):
+    """Push back the lock of a job this worker is running, False if it lost the job"""
+    locked_until = timezone.now() + timedelta(seconds=get_config()['LOCK_TIMEOUT'])
+    extended = Job.objects.filter(
+        pk=job.pk, status=Job.STATUS_RUNNING, locked_by=job.locked_by
+    ).update(locked_until=locked_until)
+    if extended:
+        job.locked_until = locked_until
+    return bool(extended)
+
+
+@contextmanager
+def heartbeat(job):
+    """Keep extending the lock of ``job`` from a background thread while the block runs"""
+    interval = get_config()['LOCK_TIMEOUT'] / HEARTBEATS_PER_LOCK
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                if not extend_lock(job):
+                    logger.warning('Job %s (%s) is no longer locked by %s', job.pk, job.name, job.locked_by)
+                    return
+        except Exception:
+            logger.exception('Could not extend the lock of job %s', job.pk)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name=f'job-heartbeat-{job.pk}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job):
+    """Execute a claimed job and record its outcome (retrying on failure)"""
+    try:
+        with heartbeat(job):
+            result = get_task(job.name)(*job.args, **job.kwargs)
+    except Exception as exc:
+        logger.exception('Job %s (%s) failed on attempt %s', job.pk, job.name, job.attempts)
+        job.error = ''.join(traceback.format_exception(exc))[-10000:]
+        job.locked_until = None
+        if job.attempts < job.max_attempts:
+            delay = get_config()['RETRY_DELAY'] * 2 ** (job.attempts - 1)
+            job.status = Job.STATUS_QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+        else:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'locked_until', 'run_after', 'finished_at'])
+        return False
+
+    job.status = Job.STATUS_SUCCEEDED
+    job.result = result
+    job.locked_until = None
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'locked_until', 'finished_at'])
+    return True
+
+
+def run_next_job(worker=None):
+    """Claim and run one job, returns False when the queue is empty"""
+    job = claim_job(worker)
+    if job is None:
+        return False
+    try:
+        run_job(job)
+    finally:
+        # Long running workers must not keep broken or stale connections.
+        # A caller's transaction (tests, a job run from a request) is left
+        # alone: outside autocommit the check would close it underneath
+        for connection in connections.all():
+            if not connection.in_atomic_block:
+                connection.close_if_unusable_or_obsolete()
+    return True
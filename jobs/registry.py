@@ -0,0 +1,40 @@
+"""
+Registry of functions that can run as background jobs.
+
+    @task('projects.purge_project')
+    def purge_project(project_id):
+        ...
+
+Task modules are named ``tasks.py`` and imported automatically at startup.
+Arguments and return values must be JSON serializable.
+"""
+
+_tasks = {}
+
+
+class TaskNotRegistered(KeyError):
+    pass
+
+
+def task(name):
+    """Register a function under a stable task name"""
+
+    def decorator(func):
+        if name in _tasks and _tasks[name] is not func:
+            raise ValueError(f"Task '{name}' is already registered")
+        _tasks[name] = func
+        func.task_name = name
+        return func
+
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise TaskNotRegistered(name)
+
+
+def registered_tasks():
+    return sorted(_tasks)
@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import claim_job, enqueue, extend_lock, run_job, run_next_job
+from .registry import task
+
+calls = []
+
+
+@task('jobs.tests.record')
+def record_task(value):
+    calls.append(value)
+    return {'value': value}
+
+
+@task('jobs.tests.fail')
+def fail_task():
+    raise RuntimeError('boom')
+
+
+@override_settings(JOBS={'LOCK_TIMEOUT': 600, 'RETRY_DELAY': 10})
+class QueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_marks_running(self):
+        job = enqueue(record_task, 1)
+
+        claimed = claim_job('worker-a')
+
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, Job.STATUS_RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertEqual(claimed.locked_by, 'worker-a')
+        self.assertGreater(claimed.locked_until, timezone.now() + timedelta(seconds=590))
+        # A running job with a valid lock is not claimed twice
+        self.assertIsNone(claim_job('worker-b'))
+
+    def test_claim_order_and_delay(self):
+        later = enqueue(record_task, 1, delay=timedelta(minutes=5))
+        first = enqueue(record_task, 2)
+        second = enqueue(record_task, 3)
+
+        self.assertEqual(claim_job().pk, first.pk)
+        self.assertEqual(claim_job().pk, second.pk)
+        self.assertIsNone(claim_job())
+        later.refresh_from_db()
+        self.assertEqual(later.status, Job.STATUS_QUEUED)
+
+    def test_run_next_job(self):
+        job = enqueue(record_task, 7)
+
+        self.assertTrue(run_next_job())
+        self.assertFalse(run_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.result, {'value': 7})
+        self.assertIsNone(job.locked_until)
+        self.assertEqual(calls, [7])
+
+    def test_retry_with_backoff(self):
+        job = enqueue(fail_task, max_attempts=3)
+
+        for attempt, delay in ((1, 10), (2, 20)):
+            before = timezone.now()
+            with self.assertLogs('jobs.queue', 'ERROR'):
+                self.assertFalse(run_job(claim_job()))
+            job.refresh_from_db()
+            self.assertEqual(job.status, Job.STATUS_QUEUED)
+            self.assertEqual(job.attempts, attempt)
+            self.assertIn('boom', job.error)
+            self.assertGreaterEqual(job.run_after, before + timedelta(seconds=delay))
+            self.assertLess(job.run_after, timezone.now() + timedelta(seconds=delay + 1))
+            # Not due before the backoff elapsed
+            self.assertIsNone(claim_job())
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            self.assertFalse(run_job(claim_job()))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_reclaim_expired_lock(self):
+        job = enqueue(record_task, 1)
+        claim_job('worker-a')
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        claimed = claim_job('worker-b')
+
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.attempts, 2)
+        self.assertEqual(claimed.locked_by, 'worker-b')
+
+    def test_reclaim_without_attempts_left_fails(self):
+        job = enqueue(record_task, 1, max_attempts=1)
+        other = enqueue(record_task, 2)
+        claim_job('worker-a')
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        # The abandoned job is failed and the next one claimed instead
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            claimed = claim_job('worker-b')
+
+        self.assertEqual(claimed.pk, other.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('worker-a', job.error)
+        self.assertIsNone(job.locked_until)
+
+    def test_extend_lock(self):
+        job = enqueue(record_task, 1)
+        claimed = claim_job('worker-a')
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() + timedelta(seconds=5))
+
+        self.assertTrue(extend_lock(claimed))
+        job.refresh_from_db()
+        self.assertGreater(job.locked_until, timezone.now() + timedelta(seconds=590))
+
+        # Once another worker took the job over, the lock is not extended
+        Job.objects.filter(pk=job.pk).update(locked_by='worker-b')
+        self.assertFalse(extend_lock(claimed))
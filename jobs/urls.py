@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+from . import views
+
+router = SimpleRouter()
+router.register(r'jobs', views.JobViewSet, basename='job')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
+
+# GET    /api/jobs/{id}/             - Get background job status
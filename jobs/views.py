@@ -0,0 +1,30 @@
+from rest_framework import mixins, permissions, viewsets
+from drf_spectacular.utils import extend_schema
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    ViewSet for checking the status of background jobs.
+
+    - retrieve: Get the status of a job started by the authenticated user
+    """
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Return jobs owned by the current user only
+        """
+        return Job.objects.filter(owner=self.request.user)
+
+    @extend_schema(
+        summary="Get job status",
+        description="Status, attempts and result of a background job started by the authenticated user",
+        responses={200: JobSerializer}
+    )
+    def retrieve(self, request, *args, **kwargs):
+        """Get a specific job"""
+        return super().retrieve(request, *args, **kwargs)
@@ -2,6 +2,9 @@
 ASGI config for project_management project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Required for the Server-Sent Events endpoint (/api/events/), e.g.:
+
+    gunicorn project_management.asgi:application -k uvicorn.workers.UvicornWorker
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -0,0 +1,272 @@
+"""
+Batch endpoint: many API calls in one round trip.
+
+POST /api/batch/ with
+
+    {"requests": [
+        {"id": "list", "method": "GET", "path": "/api/projects/?page=1"},
+        {"id": "stats-1", "method": "GET", "path": "/api/projects/1/stats/"},
+        {"id": "me", "path": "/auth/profile/"},
+        {"method": "PATCH", "path": "/api/vacancies/7/", "body": {"is_active": false}}
+    ]}
+
+The batch is authenticated once; sub-requests reuse that user and run
+in-process through the URL resolver and the regular views (middleware is
+applied to the batch as a whole). Batches made only of reads run
+concurrently on a small thread pool; a batch containing writes runs
+sequentially in order. cached_query/cached_count results are shared
+between the sub-requests (see querycache.batch_scope).
+
+Configuration (settings.BATCH_REQUESTS):
+
+    BATCH_REQUESTS = {
+        'MAX_REQUESTS': 50,
+        'MAX_WORKERS': 4,      # threads for read-only batches (1 = sequential)
+    }
+"""
+
+import contextvars
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from drf_spectacular.utils import extend_schema
+from rest_framework import permissions, serializers, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from throttling.throttles import BatchThrottle
+
+from .querycache import batch_scope, reset_batch_scope
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_REQUESTS': 50,
+    'MAX_WORKERS': 4,
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+ALLOWED_METHODS = SAFE_METHODS + ('POST', 'PUT', 'PATCH', 'DELETE')
+BATCHABLE_PREFIXES = ('/api/', '/auth/')
+
+# Request metadata passed on to every sub-request
+FORWARDED_META = (
+    'SERVER_NAME', 'SERVER_PORT', 'REMOTE_ADDR', 'HTTP_HOST', 'HTTP_USER_AGENT',
+    'HTTP_ACCEPT_LANGUAGE', 'HTTP_X_FORWARDED_FOR', 'HTTP_X_FORWARDED_PROTO',
+)
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'BATCH_REQUESTS', {}))
+    return config
+
+
+class SubRequestSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False, allow_blank=True)
+    method = serializers.CharField(default='GET')
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False)
+
+    def validate_method(self, value):
+        method = value.upper()
+        if method not in ALLOWED_METHODS:
+            raise serializers.ValidationError(f'Choose from: {", ".join(ALLOWED_METHODS)}.')
+        return method
+
+    def validate_path(self, value):
+        path = urlsplit(value).path
+        if not path.startswith(BATCHABLE_PREFIXES):
+            raise serializers.ValidationError(
+                f'Only {", ".join(BATCHABLE_PREFIXES)} endpoints can be batched.'
+            )
+        if path.rstrip('/') == '/api/batch':
+            raise serializers.ValidationError('Batches cannot be nested.')
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value):
+        limit = get_config()['MAX_REQUESTS']
+        if len(value) > limit:
+            raise serializers.ValidationError(f'At most {limit} requests per batch.')
+        return value
+
+
+def build_sub_request(request, method, path, body=None):
+    """A Django request for ``path``, authenticated as the batch user"""
+    parts = urlsplit(path)
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    environ = {
+        key: value for key, value in request.META.items() if key in FORWARDED_META
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': parts.path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': parts.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(payload),
+        'wsgi.url_scheme': request.scheme,
+    })
+    sub_request = WSGIRequest(environ)
+    # Picked up by rest_framework.request.Request: no second authentication
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    sub_request.user = request.user
+    return sub_request
+
+
+def _response_body(response):
+    if hasattr(response, 'data'):
+        return response.data
+    if response.streaming:
+        return None
+    content = response.content.decode(response.charset or 'utf-8')
+    if response.get('Content-Type', '').startswith('application/json') and content:
+        return json.loads(content)
+    return content
+
+
+def execute(request, item):
+    """Run one sub-request, returns its result entry"""
+    result = {'id': item.get('id'), 'status': None, 'body': None}
+    path = urlsplit(item['path']).path
+    try:
+        match = resolve(path)
+    except Resolver404:
+        result.update(status=status.HTTP_404_NOT_FOUND, body={'detail': 'Not found.'})
+        return result
+
+    if iscoroutinefunction(match.func):
+        result.update(
+            status=status.HTTP_400_BAD_REQUEST,
+            body={'detail': 'Streaming endpoints cannot be batched.'}
+        )
+        return result
+
+    sub_request = build_sub_request(request, item['method'], item['path'], item.get('body'))
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Http404:
+        result.update(status=status.HTTP_404_NOT_FOUND, body={'detail': 'Not found.'})
+        return result
+    except Exception:
+        logger.exception('Batch sub-request %s %s failed', item['method'], item['path'])
+        result.update(
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            body={'detail': 'Internal server error.'}
+        )
+        return result
+
+    result.update(status=response.status_code, body=_response_body(response))
+    if response.has_header('Location'):
+        result['location'] = response['Location']
+    return result
+
+
+class BatchExecutor(ThreadPoolExecutor):
+    """
+    Thread pool whose threads keep one database connection each for the
+    whole batch, closed once when the pool shuts down.
+    """
+
+    def __init__(self, max_workers):
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        super().__init__(max_workers=max_workers, thread_name_prefix='batch', initializer=self._register)
+
+    def _register(self):
+        # connections[alias] is the connection of the calling (pool) thread
+        with self._connections_lock:
+            self._connections.extend(connections[alias] for alias in connections)
+
+    def shutdown(self, wait=True, **kwargs):
+        super().shutdown(wait=wait, **kwargs)
+        if not wait:
+            return
+        # The pool threads are gone, their connections are closed from here
+        with self._connections_lock:
+            pool_connections, self._connections = self._connections, []
+        for connection in pool_connections:
+            connection.inc_thread_sharing()
+            try:
+                connection.close()
+            finally:
+                connection.dec_thread_sharing()
+
+
+def execute_batch(request, items):
+    """Run sub-requests, concurrently when none of them writes"""
+    workers = min(get_config()['MAX_WORKERS'], len(items))
+    read_only = all(item['method'] in SAFE_METHODS for item in items)
+
+    with batch_scope():
+        if read_only and workers > 1:
+            context = contextvars.copy_context()
+            with BatchExecutor(max_workers=workers) as pool:
+                futures = [
+                    # Each task runs in its own copy sharing the batch memo
+                    pool.submit(context.copy().run, execute, request, item)
+                    for item in items
+                ]
+                return [future.result() for future in futures]
+
+        results = []
+        for item in items:
+            results.append(execute(request, item))
+            if item['method'] not in SAFE_METHODS:
+                # Later reads must see this write
+                reset_batch_scope()
+        return results
+
+
+class BatchView(APIView):
+    """
+    Execute many API requests in one round trip.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [BatchThrottle]
+
+    @extend_schema(
+        summary="Batch API requests",
+        description=(
+            "Run up to BATCH_REQUESTS['MAX_REQUESTS'] API requests at once. Responses are "
+            "returned in request order with their own status codes; read-only batches run concurrently."
+        ),
+        request=BatchSerializer,
+        responses={200: {
+            'type': 'object',
+            'properties': {
+                'responses': {'type': 'array', 'items': {
+                    'type': 'object',
+                    'properties': {
+                        'id': {'type': 'string', 'nullable': True},
+                        'status': {'type': 'integer'},
+                        'body': {'nullable': True},
+                        'location': {'type': 'string'}
+                    }
+                }}
+            }
+        }},
+        tags=['Batch']
+    )
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = execute_batch(request, serializer.validated_data['requests'])
+        return Response({'responses': results})
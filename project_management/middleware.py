@@ -0,0 +1,85 @@
+"""
+Route-aware middleware: the browser stack only where a browser needs it.
+
+The API is token authenticated (DRF authenticates in the view), so
+sessions, CSRF, Django's session authentication, messages and
+clickjacking headers only matter for the admin and the HTML docs. The
+classes below are the stock Django middleware, skipped for requests on
+the lean routes (``/api/`` and ``/auth/`` by default): those go through
+CORS, security, static files and CommonMiddleware only. Everything else
+(``/admin/``, ``/api/docs/``, ``/api/redoc/``, ...) runs the full stack.
+
+Skipping means the middleware passes the request straight on: no session
+lookup or cookie, no ``request.user`` before DRF sets it, no CSRF check
+(DRF views are CSRF exempt anyway) and no messages storage.
+
+Configuration (settings.API_MIDDLEWARE), read once per process:
+
+    API_MIDDLEWARE = {
+        'LEAN_PREFIXES': ('/api/', '/auth/'),
+        'FULL_STACK_PREFIXES': ('/api/docs/', '/api/redoc/'),   # exceptions
+    }
+
+``python manage.py bench_middleware`` measures the overhead saved.
+"""
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import clickjacking, csrf
+
+DEFAULTS = {
+    'LEAN_PREFIXES': ('/api/', '/auth/'),
+    'FULL_STACK_PREFIXES': ('/api/docs/', '/api/redoc/'),
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'API_MIDDLEWARE', {}))
+    return config
+
+
+class BrowserOnlyMixin:
+    """Runs the wrapped middleware for full stack routes only"""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        config = get_config()
+        self.lean_prefixes = tuple(config['LEAN_PREFIXES'])
+        self.full_stack_prefixes = tuple(config['FULL_STACK_PREFIXES'])
+
+    def is_lean(self, request):
+        path = request.path_info
+        return path.startswith(self.lean_prefixes) and not path.startswith(self.full_stack_prefixes)
+
+    def __call__(self, request):
+        if self.is_lean(request):
+            # A coroutine when the chain runs in async mode, the caller awaits it
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(BrowserOnlyMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(BrowserOnlyMixin, csrf.CsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if self.is_lean(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(BrowserOnlyMixin, auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(BrowserOnlyMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+class XFrameOptionsMiddleware(BrowserOnlyMixin, clickjacking.XFrameOptionsMiddleware):
+    pass
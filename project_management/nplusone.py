@@ -0,0 +1,211 @@
+"""
+N+1 query detector for development and tests.
+
+Every SQL statement executed inside a tracked block is reduced to a
+fingerprint (the parameterized SQL with literals stripped). When the same
+fingerprint is executed more than ``THRESHOLD`` times, the block is reported
+together with the code that issued the query (serializer field and the first
+stack frame inside this project).
+
+Configuration (settings.NPLUSONE_DETECTOR):
+
+    NPLUSONE_DETECTOR = {
+        'ENABLED': DEBUG,     # middleware is removed from the stack when False
+        'THRESHOLD': 5,       # allowed repetitions of the same query
+        'ACTION': 'log',      # 'log', 'warn' or 'raise'
+    }
+
+Usage in tests:
+
+    with detect_n_plus_one(threshold=1):
+        self.client.get('/api/projects/')
+"""
+
+import logging
+import re
+import sys
+import warnings
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'THRESHOLD': 5,
+    'ACTION': 'log',
+}
+ACTIONS = ('log', 'warn', 'raise')
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+THIS_FILE = str(Path(__file__).resolve())
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class NPlusOneError(Exception):
+    """Raised when a repeated query is detected and ACTION is 'raise'"""
+
+
+class NPlusOneWarning(UserWarning):
+    """Emitted when a repeated query is detected and ACTION is 'warn'"""
+
+
+def get_config(**overrides):
+    """Merge settings.NPLUSONE_DETECTOR with defaults and explicit overrides"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'NPLUSONE_DETECTOR', {}))
+    config.update({key.upper(): value for key, value in overrides.items() if value is not None})
+    if config['ACTION'] not in ACTIONS:
+        raise ValueError(f"NPLUSONE_DETECTOR ACTION must be one of {ACTIONS}")
+    return config
+
+
+def fingerprint(sql):
+    """Reduce a SQL statement to its shape, independent of parameter values"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def find_origin():
+    """
+    Describe the code that issued the current query.
+
+    Returns the serializer field being rendered (if any) and the innermost
+    stack frame that belongs to this project rather than Django/DRF.
+    """
+    frame = sys._getframe(1)
+    origin = None
+    serializer_field = None
+
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if origin is None and filename.startswith(PROJECT_ROOT) and filename != THIS_FILE \
+                and 'site-packages' not in filename:
+            origin = f'{Path(filename).relative_to(PROJECT_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}'
+
+        if serializer_field is None and frame.f_code.co_name == 'to_representation':
+            field = frame.f_locals.get('field')
+            instance = frame.f_locals.get('self')
+            if field is not None and getattr(field, 'field_name', None):
+                serializer_field = f'{type(instance).__name__}.{field.field_name}'
+
+        if origin is not None and serializer_field is not None:
+            break
+        frame = frame.f_back
+
+    return {'origin': origin, 'serializer_field': serializer_field}
+
+
+class QueryTracker:
+    """
+    Database execute wrapper that counts queries per fingerprint.
+
+    Install with ``connection.execute_wrapper(tracker)``; ``report()`` returns
+    the fingerprints executed more than ``threshold`` times.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = {}
+        self.origins = {}
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        key = fingerprint(sql)
+        count = self.counts.get(key, 0) + 1
+        self.counts[key] = count
+        self.total += 1
+        # Stack inspection is only paid once per offending fingerprint
+        if count == self.threshold + 1:
+            self.origins[key] = find_origin()
+        return execute(sql, params, many, context)
+
+    def report(self):
+        return [
+            {'sql': key, 'count': count, **self.origins.get(key, {})}
+            for key, count in self.counts.items()
+            if count > self.threshold
+        ]
+
+    @contextmanager
+    def track(self, using=None):
+        aliases = [using] if using else list(connections)
+        with ExitStack() as stack:
+            for alias in aliases:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+
+def format_report(problems, label):
+    lines = [f'N+1 queries detected in {label}:']
+    for problem in problems:
+        lines.append(f"  {problem['count']}x {problem['sql']}")
+        if problem.get('serializer_field'):
+            lines.append(f"     serializer field: {problem['serializer_field']}")
+        if problem.get('origin'):
+            lines.append(f"     origin: {problem['origin']}")
+    return '\n'.join(lines)
+
+
+def handle_report(problems, label, action):
+    """Log, warn or raise for the detected problems"""
+    if not problems:
+        return
+    message = format_report(problems, label)
+    if action == 'raise':
+        raise NPlusOneError(message)
+    if action == 'warn':
+        warnings.warn(message, NPlusOneWarning, stacklevel=3)
+    else:
+        logger.warning(message)
+
+
+@contextmanager
+def detect_n_plus_one(threshold=None, action='raise', using=None, label='block'):
+    """
+    Test helper: fail (or log/warn) if any query shape repeats too often.
+
+    Defaults to raising so a regression fails the test immediately.
+    """
+    config = get_config(threshold=threshold, action=action)
+    tracker = QueryTracker(config['THRESHOLD'])
+    with tracker.track(using=using):
+        yield tracker
+    handle_report(tracker.report(), label, config['ACTION'])
+
+
+class NPlusOneMiddleware:
+    """
+    Middleware that runs the detector for every request.
+
+    Removed from the middleware chain unless NPLUSONE_DETECTOR['ENABLED'].
+    """
+
+    def __init__(self, get_response):
+        config = get_config()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = config['THRESHOLD']
+        self.action = config['ACTION']
+
+    def __call__(self, request):
+        tracker = QueryTracker(self.threshold)
+        with tracker.track():
+            response = self.get_response(request)
+
+        problems = tracker.report()
+        if problems:
+            response['X-NPlusOne-Queries'] = str(len(problems))
+        handle_report(problems, f'{request.method} {request.path}', self.action)
+        return response
@@ -44,18 +44,23 @@ INSTALLED_APPS = [
     # Local apps
     'projects',
     'authentication',
+    'jobs',
+    'throttling',
 ]
 
+# Session, CSRF, auth, messages and clickjacking middleware are skipped on
+# /api/ and /auth/ (token authenticated), see project_management/middleware.py
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'project_management.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'project_management.middleware.CsrfViewMiddleware',
+    'project_management.middleware.AuthenticationMiddleware',
+    'project_management.middleware.MessageMiddleware',
+    'project_management.middleware.XFrameOptionsMiddleware',
+    'project_management.nplusone.NPlusOneMiddleware',
 ]
 
 ROOT_URLCONF = 'project_management.urls'
@@ -85,6 +90,142 @@ DATABASES = {
     )
 }
 
+# Cache - file based by default so all gunicorn workers share cache versions.
+# A shared backend (CACHE_BACKEND=django.core.cache.backends.redis.RedisCache)
+# is preferable once the instance runs on more than one machine.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', '/tmp/project_management_cache'),
+    }
+}
+# Django's default of 300 entries would cull the response cache constantly.
+# Only the file and local memory backends take these, the others pass
+# OPTIONS on to their client library.
+if CACHES['default']['BACKEND'].endswith(('.FileBasedCache', '.LocMemCache')):
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '20000')),
+        # A full cache drops 1/CULL_FREQUENCY of its entries
+        'CULL_FREQUENCY': int(os.environ.get('CACHE_CULL_FREQUENCY', '4')),
+    }
+
+# Per-user versioned response cache (see projects/cache.py)
+RESPONSE_CACHE = {
+    'ENABLED': os.environ.get('RESPONSE_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes'),
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '300')),
+    'PUBLIC_TIMEOUT': int(os.environ.get('RESPONSE_CACHE_PUBLIC_TIMEOUT', '60')),
+}
+
+# Queryset cache-aside layer (see project_management/querycache.py)
+QUERY_CACHE = {
+    'ENABLED': os.environ.get('QUERY_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes'),
+    'CACHE_ALIAS': 'default',
+    'MAX_ENTRIES': int(os.environ.get('QUERY_CACHE_MAX_ENTRIES', '1000')),
+    'MAX_ROWS': int(os.environ.get('QUERY_CACHE_MAX_ROWS', '1000')),
+}
+
+# Paginated list counts (see projects/pagination.py)
+COUNT_PAGINATION = {
+    'ESTIMATE_THRESHOLD': int(os.environ.get('COUNT_ESTIMATE_THRESHOLD', '10000')),
+    'TIMEOUT': int(os.environ.get('COUNT_CACHE_TIMEOUT', '300')),
+}
+
+# Background deletion of large projects (see projects/deletion.py)
+PROJECT_DELETION = {
+    'SYNC_THRESHOLD': int(os.environ.get('PROJECT_DELETION_SYNC_THRESHOLD', '1000')),
+    'BATCH_SIZE': int(os.environ.get('PROJECT_DELETION_BATCH_SIZE', '5000')),
+    'BACKGROUND': True,
+}
+
+# Archive tier for long inactive vacancies (see projects/archive.py)
+VACANCY_ARCHIVE = {
+    'RETENTION_DAYS': int(os.environ.get('VACANCY_ARCHIVE_RETENTION_DAYS', '180')),
+    'BATCH_SIZE': int(os.environ.get('VACANCY_ARCHIVE_BATCH_SIZE', '1000')),
+}
+
+# Incremental change feed for client sync (see projects/changes.py)
+CHANGE_FEED = {
+    'ENABLED': True,
+    'PAGE_SIZE': int(os.environ.get('CHANGE_FEED_PAGE_SIZE', '500')),
+    'MAX_PAGE_SIZE': 1000,
+    'RETENTION_DAYS': int(os.environ.get('CHANGE_FEED_RETENTION_DAYS', '30')),
+    'SETTLE_SECONDS': 0,
+}
+
+# Server-Sent Events hub (see projects/events.py)
+EVENT_STREAM = {
+    'BACKEND': os.environ.get('EVENT_STREAM_BACKEND', 'postgres'),
+    'HEARTBEAT': 15,
+    'POLL_INTERVAL': 60,
+    'MAX_DURATION': 3600,
+    'TICKET_MAX_AGE': int(os.environ.get('EVENT_STREAM_TICKET_MAX_AGE', '300')),
+}
+
+# Batch endpoint /api/batch/ (see project_management/batch.py)
+BATCH_REQUESTS = {
+    'MAX_REQUESTS': 50,
+    'MAX_WORKERS': int(os.environ.get('BATCH_MAX_WORKERS', '4')),
+}
+
+# Shared rate limiting of auth and expensive endpoints (see throttling/limiters.py)
+THROTTLING = {
+    'ENABLED': os.environ.get('THROTTLING_ENABLED', 'True').lower() in ('true', '1', 'yes'),
+    'RETENTION_HOURS': 24,
+    'FLUSH_SECONDS': 10,
+    'SCOPES': {
+        'login': {'ALGORITHM': 'sliding_window', 'RATE': os.environ.get('THROTTLE_LOGIN_RATE', '20/min'), 'KEY': 'ip'},
+        'login_account': {'ALGORITHM': 'sliding_window', 'RATE': os.environ.get('THROTTLE_LOGIN_ACCOUNT_RATE', '10/min'), 'KEY': 'username'},
+        'register': {'ALGORITHM': 'sliding_window', 'RATE': os.environ.get('THROTTLE_REGISTER_RATE', '10/hour'), 'KEY': 'ip'},
+    },
+}
+
+# Precomputed OpenAPI schema served by /api/schema/ (see project_management/schema.py)
+OPENAPI_SCHEMA = {
+    'DIRECTORY': BASE_DIR / 'openapi',
+    'LIVE': DEBUG,
+    'MAX_AGE': 300,
+}
+
+# Routes served without the browser middleware (see project_management/middleware.py)
+API_MIDDLEWARE = {
+    'LEAN_PREFIXES': ('/api/', '/auth/'),
+    'FULL_STACK_PREFIXES': ('/api/docs/', '/api/redoc/'),
+}
+
+# Search-box suggestion index (see projects/suggestions.py)
+SUGGESTIONS = {
+    'ENABLED': os.environ.get('SUGGESTIONS_ENABLED', 'True').lower() in ('true', '1', 'yes'),
+    'MAX_ENTRIES': int(os.environ.get('SUGGESTIONS_MAX_ENTRIES', '20000')),
+    'MAX_AGE': int(os.environ.get('SUGGESTIONS_MAX_AGE', '300')),
+}
+
+# Vacancy matching skill matrix (see projects/matching.py)
+MATCHING = {
+    'REFRESH_SECONDS': int(os.environ.get('MATCHING_REFRESH_SECONDS', '10')),
+    'MAX_AGE': int(os.environ.get('MATCHING_MAX_AGE', '3600')),
+    'COMPACT_RATIO': 0.1,
+    'MAX_CHANGES': 5000,
+}
+
+# Similar-projects index on disk (see projects/similarity.py)
+SIMILARITY = {
+    'DIRECTORY': os.environ.get('SIMILARITY_DIRECTORY', str(BASE_DIR / 'similarity')),
+    # The worker service does not share the web containers' files
+    'UPDATER': os.environ.get('SIMILARITY_UPDATER', 'web'),
+    'AUTO_UPDATE': os.environ.get('SIMILARITY_AUTO_UPDATE', 'True').lower() in ('true', '1', 'yes'),
+    'UPDATE_DELAY': int(os.environ.get('SIMILARITY_UPDATE_DELAY', '30')),
+    'RELOAD_SECONDS': 10,
+    'COMPACT_RATIO': 0.2,
+    'MAX_CHANGES': 5000,
+}
+
+# Database backed background jobs (see jobs/queue.py)
+JOBS = {
+    'LOCK_TIMEOUT': int(os.environ.get('JOBS_LOCK_TIMEOUT', '600')),
+    'RETRY_DELAY': int(os.environ.get('JOBS_RETRY_DELAY', '10')),
+}
+
 # Security settings for production
 if not DEBUG:
     # Основные настройки безопасности
@@ -142,7 +283,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'authentication.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -153,6 +294,10 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
+    # Proxies in front of the app (Railway's edge: 1, none: 0). Client IPs for
+    # rate limiting are taken from X-Forwarded-For accordingly. None would
+    # trust the whole header, which any client can spoof to dodge the limits
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '1')),
 }
 
 # Add browsable API only in debug mode
@@ -211,4 +356,11 @@ LOGGING = {
             'propagate': False,
         },
     },
-}
\ No newline at end of file
+}
+
+# N+1 query detector (see project_management/nplusone.py), disabled unless requested
+NPLUSONE_DETECTOR = {
+    'ENABLED': os.environ.get('NPLUSONE_ENABLED', 'False').lower() in ('true', '1', 'yes'),
+    'THRESHOLD': int(os.environ.get('NPLUSONE_THRESHOLD', '5')),
+    'ACTION': os.environ.get('NPLUSONE_ACTION', 'log'),
+}
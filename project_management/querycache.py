@@ -0,0 +1,280 @@
+"""
+Queryset-level cache-aside layer with table-versioned invalidation.
+
+Materialized queryset results are kept in a per-process LRU cache, keyed by
+the compiled SQL, its parameters and the generation numbers of every model
+the query reads from. Generations live in the shared Django cache and are
+incremented on post_save/post_delete and on bulk queryset operations, so a
+write anywhere makes every cached result touching that table unreachable.
+
+Configuration (settings.QUERY_CACHE):
+
+    QUERY_CACHE = {
+        'ENABLED': True,
+        'CACHE_ALIAS': 'default',   # where generation numbers are stored
+        'MAX_ENTRIES': 1000,        # LRU size per process
+        'MAX_ROWS': 1000,           # larger results are never cached
+    }
+
+Results are stored pickled, so every caller gets its own copies of the
+model instances and can never mutate what other views will read.
+
+Usage:
+
+    projects = cached_query(Project.objects.filter(owner=user))
+    total = cached_count(user.projects.all())
+
+Inside ``batch_scope()`` (used by the batch endpoint) results are also
+memoized per statement for the duration of the scope, without looking up
+generations again; callers reset the scope around writes.
+"""
+
+import contextvars
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'MAX_ENTRIES': 1000,
+    'MAX_ROWS': 1000,
+}
+
+GENERATION_KEY = 'model-generation:{label}'
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'QUERY_CACHE', {}))
+    return config
+
+
+class LRUCache:
+    """Thread-safe, size-limited mapping with least recently used eviction"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_results = LRUCache(get_config()['MAX_ENTRIES'])
+
+
+def get_stats():
+    return {'entries': len(_results), 'hits': _results.hits, 'misses': _results.misses}
+
+
+def _generation_cache():
+    return caches[get_config()['CACHE_ALIAS']]
+
+
+def _increment(label):
+    cache = _generation_cache()
+    key = GENERATION_KEY.format(label=label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Time based start value never collides with an evicted counter
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def bump_generation(model):
+    """
+    Invalidate every cached result reading from the model's table.
+
+    Bumped immediately (so the writer never reads its own stale data) and
+    again on commit (so results cached by concurrent readers while the
+    transaction was open are discarded as well).
+    """
+    label = model._meta.label_lower
+    _increment(label)
+    transaction.on_commit(lambda: _increment(label))
+
+
+def get_generations(labels):
+    cache = _generation_cache()
+    keys = {GENERATION_KEY.format(label=label): label for label in labels}
+    found = cache.get_many(keys)
+    generations = {}
+    for key, label in keys.items():
+        if key not in found:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            found[key] = cache.get(key)
+        generations[label] = found[key]
+    return generations
+
+
+def _models_for_query(queryset):
+    """Every model whose table takes part in the query (joins included)"""
+    tables = {
+        alias.table_name
+        for alias in queryset.query.alias_map.values()
+    } or {queryset.model._meta.db_table}
+    labels = {
+        model._meta.label_lower
+        for model in apps.get_models()
+        if model._meta.db_table in tables
+    }
+    labels.add(queryset.model._meta.label_lower)
+    return sorted(labels)
+
+
+def _statement_key(queryset, kind):
+    sql, params = queryset.query.sql_with_params()
+    return (kind, queryset.db, sql, tuple(params))
+
+
+def _build_key(queryset, kind, statement=None):
+    labels = _models_for_query(queryset)
+    generations = get_generations(labels)
+    return (statement or _statement_key(queryset, kind)) + (
+        tuple(generations[label] for label in labels),
+    )
+
+
+_batch_memo = contextvars.ContextVar('querycache_batch_memo', default=None)
+
+
+@contextmanager
+def batch_scope():
+    """Memoize cached_query/cached_count results until the block exits"""
+    token = _batch_memo.set({})
+    try:
+        yield
+    finally:
+        _batch_memo.reset(token)
+
+
+def reset_batch_scope():
+    """Forget the memoized results of the current scope (call after writes)"""
+    memo = _batch_memo.get()
+    if memo is not None:
+        memo.clear()
+
+
+def cached_query(queryset):
+    """
+    Return the materialized results of a queryset, shared across views.
+
+    The queryset is evaluated at most once per generation of the models it
+    reads; results with more than MAX_ROWS rows bypass the cache, as do
+    querysets with prefetch_related (prefetched tables are not versioned).
+    """
+    config = get_config()
+    if not config['ENABLED'] or queryset._prefetch_related_lookups:
+        return list(queryset)
+
+    statement = _statement_key(queryset, 'rows')
+    memo = _batch_memo.get()
+    if memo is not None and statement in memo:
+        return pickle.loads(memo[statement])
+
+    key = _build_key(queryset, 'rows', statement)
+    payload = _results.get(key)
+    if payload is not None:
+        result = pickle.loads(payload)
+    else:
+        result = list(queryset)
+        if len(result) > config['MAX_ROWS']:
+            return result
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        _results.set(key, payload)
+    if memo is not None:
+        memo[statement] = payload
+    return result
+
+
+def cached_count(queryset):
+    """Cached ``queryset.count()`` with the same invalidation rules"""
+    if not get_config()['ENABLED']:
+        return queryset.count()
+
+    statement = _statement_key(queryset, 'count')
+    memo = _batch_memo.get()
+    if memo is not None and statement in memo:
+        return memo[statement]
+
+    key = _build_key(queryset, 'count', statement)
+    count = _results.get(key)
+    if count is None:
+        count = queryset.count()
+        _results.set(key, count)
+    if memo is not None:
+        memo[statement] = count
+    return count
+
+
+class GenerationQuerySet(models.QuerySet):
+    """QuerySet that bumps the model generation on bulk operations"""
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        bump_generation(self.model)
+        return rows
+
+    def delete(self):
+        result = super().delete()
+        bump_generation(self.model)
+        return result
+
+    def bulk_create(self, objs, *args, **kwargs):
+        result = super().bulk_create(objs, *args, **kwargs)
+        bump_generation(self.model)
+        return result
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        bump_generation(self.model)
+        return rows
+
+    def _raw_delete(self, using):
+        rows = super()._raw_delete(using)
+        bump_generation(self.model)
+        return rows
+
+
+def _on_model_change(sender, **kwargs):
+    bump_generation(sender)
+
+
+def track_model_generations(*model_classes):
+    """Connect post_save/post_delete so these models bump their generation"""
+    for model in model_classes:
+        post_save.connect(_on_model_change, sender=model, dispatch_uid=f'querycache-save-{model._meta.label_lower}')
+        post_delete.connect(_on_model_change, sender=model, dispatch_uid=f'querycache-delete-{model._meta.label_lower}')
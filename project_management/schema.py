@@ -0,0 +1,178 @@
+"""
+Precomputed OpenAPI schema.
+
+drf-spectacular introspects every view and serializer to build the schema,
+which takes hundreds of milliseconds per request. Outside of DEBUG the
+schema is instead rendered once, by ``manage.py build_openapi_schema`` at
+image build time or lazily on the first request of a process, stored as
+YAML and JSON files and served from memory:
+
+- a strong ETag (content hash) per representation, so clients and probes
+  revalidate with ``304 Not Modified``;
+- a gzip copy compressed once, used when the client accepts it.
+
+``/api/docs/`` and ``/api/redoc/`` load the schema from this view as well.
+In DEBUG (LIVE) the schema is generated on every request, so changes to
+views and serializers show up immediately.
+
+Configuration (settings.OPENAPI_SCHEMA):
+
+    OPENAPI_SCHEMA = {
+        'DIRECTORY': BASE_DIR / 'openapi',   # where the schema files are stored
+        'LIVE': DEBUG,                       # generate on every request
+        'MAX_AGE': 300,                      # Cache-Control max-age in seconds
+    }
+"""
+
+import gzip
+import hashlib
+import logging
+import re
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.decorators.http import require_safe
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularAPIView
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'DIRECTORY': None,   # BASE_DIR / 'openapi'
+    'LIVE': None,        # DEBUG
+    'MAX_AGE': 300,
+}
+
+FORMATS = {
+    'yaml': ('application/vnd.oai.openapi; charset=utf-8', OpenApiYamlRenderer),
+    'json': ('application/vnd.oai.openapi+json; charset=utf-8', OpenApiJsonRenderer),
+}
+
+Document = namedtuple('Document', ['content', 'gzipped', 'etag', 'content_type'])
+
+_documents = {}
+_lock = threading.Lock()
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'OPENAPI_SCHEMA', {}))
+    if config['DIRECTORY'] is None:
+        config['DIRECTORY'] = Path(settings.BASE_DIR) / 'openapi'
+    if config['LIVE'] is None:
+        config['LIVE'] = settings.DEBUG
+    return config
+
+
+def schema_path(fmt, directory=None):
+    """File of a schema format, versioned by the API version"""
+    version = re.sub(r'[^\w.-]', '_', spectacular_settings.VERSION or '0')
+    return Path(directory or get_config()['DIRECTORY']) / f'schema-{version}.{fmt}'
+
+
+def render_schema():
+    """Generate the schema and render every format, {fmt: bytes}"""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+        urlconf=spectacular_settings.SERVE_URLCONF
+    )
+    schema = generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+    return {
+        fmt: renderer().render(schema, renderer_context={})
+        for fmt, (content_type, renderer) in FORMATS.items()
+    }
+
+
+def write_schema(directory=None, rendered=None):
+    """Store the rendered (by default: freshly generated) schema, returns the written paths"""
+    paths = []
+    for fmt, content in (rendered or render_schema()).items():
+        path = schema_path(fmt, directory)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written next to the target and renamed: readers never see half a file
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        tmp_path.write_bytes(content)
+        tmp_path.replace(path)
+        paths.append(path)
+    return paths
+
+
+def _document(fmt, content):
+    digest = hashlib.sha256(content).hexdigest()[:32]
+    return Document(
+        content=content,
+        gzipped=gzip.compress(content, compresslevel=9, mtime=0),
+        etag=f'"{digest}"',
+        content_type=FORMATS[fmt][0],
+    )
+
+
+def _load_documents():
+    paths = {fmt: schema_path(fmt) for fmt in FORMATS}
+    if all(path.exists() for path in paths.values()):
+        return {fmt: _document(fmt, path.read_bytes()) for fmt, path in paths.items()}
+
+    logger.info('No precomputed OpenAPI schema in %s, generating it', get_config()['DIRECTORY'])
+    rendered = render_schema()
+    try:
+        write_schema(rendered=rendered)
+    except OSError:
+        # Read-only file system: this process keeps its own copy
+        logger.warning('Could not store the OpenAPI schema', exc_info=True)
+    return {fmt: _document(fmt, content) for fmt, content in rendered.items()}
+
+
+def get_documents():
+    """Schema documents of this process, loaded (or generated) once"""
+    if not _documents:
+        with _lock:
+            if not _documents:
+                _documents.update(_load_documents())
+    return _documents
+
+
+def _requested_format(request):
+    fmt = request.GET.get('format', '').lower()
+    if fmt in FORMATS:
+        return fmt
+    return 'json' if 'json' in request.headers.get('Accept', '') else 'yaml'
+
+
+def _accepts_gzip(request):
+    return 'gzip' in request.headers.get('Accept-Encoding', '')
+
+
+_live_view = SpectacularAPIView.as_view()
+
+
+@require_safe
+def schema_view(request):
+    """
+    GET /api/schema/ - OpenAPI schema, YAML by default, JSON with
+    ``?format=json`` or ``Accept: application/vnd.oai.openapi+json``
+    """
+    config = get_config()
+    if config['LIVE']:
+        return _live_view(request)
+
+    document = get_documents()[_requested_format(request)]
+    gzipped = _accepts_gzip(request)
+    # Each encoding is a different representation with its own strong ETag
+    etag = f'{document.etag[:-1]}-gzip"' if gzipped else document.etag
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            document.gzipped if gzipped else document.content,
+            content_type=document.content_type
+        )
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+    response['ETag'] = etag
+    response['Cache-Control'] = f"public, max-age={config['MAX_AGE']}"
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    return response
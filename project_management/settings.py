@@ -44,17 +44,22 @@ else:
         # Local apps
         'projects',
         'authentication',
+        'jobs',
+        'throttling',
     ]
 
+    # Session, CSRF, auth, messages and clickjacking middleware are skipped on
+    # /api/ and /auth/ (token authenticated), see project_management/middleware.py
     MIDDLEWARE = [
         'corsheaders.middleware.CorsMiddleware',
         'django.middleware.security.SecurityMiddleware',
-        'django.contrib.sessions.middleware.SessionMiddleware',
+        'project_management.middleware.SessionMiddleware',
         'django.middleware.common.CommonMiddleware',
-        'django.middleware.csrf.CsrfViewMiddleware',
-        'django.contrib.auth.middleware.AuthenticationMiddleware',
-        'django.contrib.messages.middleware.MessageMiddleware',
-        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+        'project_management.middleware.CsrfViewMiddleware',
+        'project_management.middleware.AuthenticationMiddleware',
+        'project_management.middleware.MessageMiddleware',
+        'project_management.middleware.XFrameOptionsMiddleware',
+        'project_management.nplusone.NPlusOneMiddleware',
     ]
 
     ROOT_URLCONF = 'project_management.urls'
@@ -89,6 +94,137 @@ else:
         }
     }
 
+    # Cache (local memory by default, file/shared backends via environment)
+    CACHES = {
+        'default': {
+            'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+            'LOCATION': config('CACHE_LOCATION', default='project-management'),
+        }
+    }
+    # Size the file and local memory backends for the response cache (the
+    # others pass OPTIONS on to their client library)
+    if CACHES['default']['BACKEND'].endswith(('.FileBasedCache', '.LocMemCache')):
+        CACHES['default']['OPTIONS'] = {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=20000, cast=int),
+            'CULL_FREQUENCY': config('CACHE_CULL_FREQUENCY', default=4, cast=int),
+        }
+
+    # Per-user versioned response cache (see projects/cache.py)
+    RESPONSE_CACHE = {
+        'ENABLED': config('RESPONSE_CACHE_ENABLED', default=True, cast=bool),
+        'CACHE_ALIAS': 'default',
+        'TIMEOUT': config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int),
+        'PUBLIC_TIMEOUT': config('RESPONSE_CACHE_PUBLIC_TIMEOUT', default=60, cast=int),
+    }
+
+    # Queryset cache-aside layer (see project_management/querycache.py)
+    QUERY_CACHE = {
+        'ENABLED': config('QUERY_CACHE_ENABLED', default=True, cast=bool),
+        'CACHE_ALIAS': 'default',
+        'MAX_ENTRIES': config('QUERY_CACHE_MAX_ENTRIES', default=1000, cast=int),
+        'MAX_ROWS': config('QUERY_CACHE_MAX_ROWS', default=1000, cast=int),
+    }
+
+    # Paginated list counts (see projects/pagination.py)
+    COUNT_PAGINATION = {
+        'ESTIMATE_THRESHOLD': config('COUNT_ESTIMATE_THRESHOLD', default=10000, cast=int),
+        'TIMEOUT': config('COUNT_CACHE_TIMEOUT', default=300, cast=int),
+    }
+
+    # Background deletion of large projects (see projects/deletion.py)
+    PROJECT_DELETION = {
+        'SYNC_THRESHOLD': config('PROJECT_DELETION_SYNC_THRESHOLD', default=1000, cast=int),
+        'BATCH_SIZE': config('PROJECT_DELETION_BATCH_SIZE', default=5000, cast=int),
+        'BACKGROUND': True,
+    }
+
+    # Archive tier for long inactive vacancies (see projects/archive.py)
+    VACANCY_ARCHIVE = {
+        'RETENTION_DAYS': config('VACANCY_ARCHIVE_RETENTION_DAYS', default=180, cast=int),
+        'BATCH_SIZE': config('VACANCY_ARCHIVE_BATCH_SIZE', default=1000, cast=int),
+    }
+
+    # Incremental change feed for client sync (see projects/changes.py)
+    CHANGE_FEED = {
+        'ENABLED': True,
+        'PAGE_SIZE': config('CHANGE_FEED_PAGE_SIZE', default=500, cast=int),
+        'MAX_PAGE_SIZE': 1000,
+        'RETENTION_DAYS': config('CHANGE_FEED_RETENTION_DAYS', default=30, cast=int),
+        'SETTLE_SECONDS': 0,
+    }
+
+    # Server-Sent Events hub (see projects/events.py)
+    EVENT_STREAM = {
+        'BACKEND': config('EVENT_STREAM_BACKEND', default='memory'),
+        'HEARTBEAT': 15,
+        'POLL_INTERVAL': 60,
+        'MAX_DURATION': 3600,
+        'TICKET_MAX_AGE': config('EVENT_STREAM_TICKET_MAX_AGE', default=300, cast=int),
+    }
+
+    # Batch endpoint /api/batch/ (see project_management/batch.py)
+    BATCH_REQUESTS = {
+        'MAX_REQUESTS': 50,
+        'MAX_WORKERS': config('BATCH_MAX_WORKERS', default=4, cast=int),
+    }
+
+    # Shared rate limiting of auth and expensive endpoints (see throttling/limiters.py)
+    THROTTLING = {
+        'ENABLED': config('THROTTLING_ENABLED', default=True, cast=bool),
+        'RETENTION_HOURS': 24,
+        'FLUSH_SECONDS': 10,
+        'SCOPES': {
+            'login': {'ALGORITHM': 'sliding_window', 'RATE': config('THROTTLE_LOGIN_RATE', default='20/min'), 'KEY': 'ip'},
+            'login_account': {'ALGORITHM': 'sliding_window', 'RATE': config('THROTTLE_LOGIN_ACCOUNT_RATE', default='10/min'), 'KEY': 'username'},
+            'register': {'ALGORITHM': 'sliding_window', 'RATE': config('THROTTLE_REGISTER_RATE', default='10/hour'), 'KEY': 'ip'},
+        },
+    }
+
+    # Precomputed OpenAPI schema served by /api/schema/ (see project_management/schema.py)
+    OPENAPI_SCHEMA = {
+        'DIRECTORY': BASE_DIR / 'openapi',
+        'LIVE': config('OPENAPI_SCHEMA_LIVE', default=DEBUG, cast=bool),
+        'MAX_AGE': 300,
+    }
+
+    # Routes served without the browser middleware (see project_management/middleware.py)
+    API_MIDDLEWARE = {
+        'LEAN_PREFIXES': ('/api/', '/auth/'),
+        'FULL_STACK_PREFIXES': ('/api/docs/', '/api/redoc/'),
+    }
+
+    # Search-box suggestion index (see projects/suggestions.py)
+    SUGGESTIONS = {
+        'ENABLED': config('SUGGESTIONS_ENABLED', default=True, cast=bool),
+        'MAX_ENTRIES': config('SUGGESTIONS_MAX_ENTRIES', default=20000, cast=int),
+        'MAX_AGE': config('SUGGESTIONS_MAX_AGE', default=300, cast=int),
+    }
+
+    # Vacancy matching skill matrix (see projects/matching.py)
+    MATCHING = {
+        'REFRESH_SECONDS': config('MATCHING_REFRESH_SECONDS', default=10, cast=int),
+        'MAX_AGE': config('MATCHING_MAX_AGE', default=3600, cast=int),
+        'COMPACT_RATIO': 0.1,
+        'MAX_CHANGES': 5000,
+    }
+
+    # Similar-projects index on disk (see projects/similarity.py)
+    SIMILARITY = {
+        'DIRECTORY': config('SIMILARITY_DIRECTORY', default=str(BASE_DIR / 'similarity')),
+        'UPDATER': config('SIMILARITY_UPDATER', default='jobs'),
+        'AUTO_UPDATE': config('SIMILARITY_AUTO_UPDATE', default=True, cast=bool),
+        'UPDATE_DELAY': config('SIMILARITY_UPDATE_DELAY', default=30, cast=int),
+        'RELOAD_SECONDS': 10,
+        'COMPACT_RATIO': 0.2,
+        'MAX_CHANGES': 5000,
+    }
+
+    # Database backed background jobs (see jobs/queue.py)
+    JOBS = {
+        'LOCK_TIMEOUT': config('JOBS_LOCK_TIMEOUT', default=600, cast=int),
+        'RETRY_DELAY': config('JOBS_RETRY_DELAY', default=10, cast=int),
+    }
+
     # Password validation
     AUTH_PASSWORD_VALIDATORS = [
         {
@@ -121,14 +257,18 @@ else:
     # REST Framework settings
     REST_FRAMEWORK = {
         'DEFAULT_AUTHENTICATION_CLASSES': [
-            'rest_framework.authentication.TokenAuthentication',
+            'authentication.authentication.CachedTokenAuthentication',
         ],
         'DEFAULT_PERMISSION_CLASSES': [
             'rest_framework.permissions.IsAuthenticated',
         ],
         'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
         'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-        'PAGE_SIZE': 20
+        'PAGE_SIZE': 20,
+        # Proxies in front of the app (none: 0). Client IPs for rate limiting
+        # are taken from X-Forwarded-For accordingly. None would trust the
+        # whole header, which any client can spoof to dodge the limits
+        'NUM_PROXIES': config('NUM_PROXIES', default=1, cast=int),
     }
 
     # Spectacular settings for Swagger
@@ -145,4 +285,11 @@ else:
         "http://127.0.0.1:3000",
     ]
 
-    CORS_ALLOW_ALL_ORIGINS = DEBUG
\ No newline at end of file
+    CORS_ALLOW_ALL_ORIGINS = DEBUG
+
+    # N+1 query detector (see project_management/nplusone.py)
+    NPLUSONE_DETECTOR = {
+        'ENABLED': config('NPLUSONE_ENABLED', default=DEBUG, cast=bool),
+        'THRESHOLD': config('NPLUSONE_THRESHOLD', default=5, cast=int),
+        'ACTION': config('NPLUSONE_ACTION', default='log'),
+    }
@@ -2,8 +2,10 @@
 
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from drf_spectacular.views import SpectacularSwaggerView, SpectacularRedocView
 from . import views
+from .batch import BatchView
+from .schema import schema_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,11 +14,13 @@ urlpatterns = [
     path('', views.api_root, name='api-root'),
 
     # API endpoints
+    path('api/batch/', BatchView.as_view(), name='api-batch'),
     path('api/', include('projects.urls')),
+    path('api/', include('jobs.urls')),
     path('auth/', include('authentication.urls')),
 
     # API Documentation
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('api/schema/', schema_view, name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 ]
\ No newline at end of file
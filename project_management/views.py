@@ -12,6 +12,9 @@ def api_root(request):
             'api_schema': '/api/schema/',
             'admin': '/admin/',
             'projects': '/api/projects/',
+            'changes': '/api/changes/',
+            'batch': '/api/batch/',
+            'jobs': '/api/jobs/{id}/',
             'auth': '/auth/',
         },
         'status': 'API is working correctly! ✅'
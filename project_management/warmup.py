@@ -0,0 +1,179 @@
+"""
+Process warm-up: do the work of the first request before serving it.
+
+A fresh Django process resolves URL patterns, imports the lazily loaded
+parts of DRF, builds model metadata for serializers, loads translation
+catalogs, password hashers, the search-box suggestion index and the
+vacancy matching matrix only when a request needs them, so the first
+requests after a deploy or restart are slow. ``warm_up()`` does all of
+that up front; gunicorn.conf.py runs it once in the master process
+(preload_app) before the workers are forked, so they share the result
+copy-on-write, and ``warm_up_worker()`` opens each worker's database
+connection right after the fork.
+
+Both return a report {step: (count, milliseconds)} for the startup log,
+``python manage.py warm_up`` prints it.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+# Apps whose serializers are warmed up
+LOCAL_APPS = ('authentication', 'jobs', 'projects', 'project_management', 'throttling')
+
+
+def _walk_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            yield pattern
+
+
+def resolve_routes():
+    """Compile every URL pattern and build the reverse lookup tables"""
+    resolver = get_resolver()
+    count = 0
+    for pattern in _walk_patterns(resolver.url_patterns):
+        # Regexes are compiled lazily, on the first request that tries them
+        pattern.pattern.regex
+        count += 1
+    resolver.reverse_dict
+    return count
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def build_serializers():
+    """
+    Instantiate the fields of every local serializer.
+
+    DRF builds fields per serializer instance, but the model metadata,
+    field mappings and lazy imports they rely on are cached per process.
+    """
+    from rest_framework import serializers
+
+    count = 0
+    for serializer_class in set(_subclasses(serializers.Serializer)):
+        if not serializer_class.__module__.startswith(LOCAL_APPS):
+            continue
+        try:
+            serializer_class(context={}).fields
+        except Exception:
+            # Serializers needing a request or arguments warm up on first use
+            logger.debug('Could not warm up %s', serializer_class.__name__, exc_info=True)
+            continue
+        count += 1
+    return count
+
+
+def load_runtime_caches():
+    """Translation catalogs, password hashers and template engines"""
+    from django.contrib.auth.hashers import get_hashers
+    from django.template import engines
+    from django.utils import translation
+
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.deactivate()
+    hashers = get_hashers()
+    return len(hashers) + len(engines.all())
+
+
+def load_schema():
+    """Precomputed OpenAPI schema (see project_management/schema.py)"""
+    from .schema import get_config, get_documents
+
+    if get_config()['LIVE']:
+        return 0
+    return len(get_documents())
+
+
+def build_suggestions():
+    """Search-box prefix indexes (see projects/suggestions.py)"""
+    from projects.suggestions import build_indexes
+
+    return build_indexes()
+
+
+def build_matching():
+    """Vacancy matching skill matrix (see projects/matching.py)"""
+    from projects.matching import get_index
+
+    return len(get_index())
+
+
+def load_similarity():
+    """Memory-mapped similar-projects index (see projects/similarity.py)"""
+    from projects.similarity import get_index
+
+    index = get_index()
+    return len(index) if index is not None else 0
+
+
+STEPS = (
+    ('routes', resolve_routes),
+    ('serializers', build_serializers),
+    ('runtime caches', load_runtime_caches),
+    ('openapi schema', load_schema),
+    ('suggestion index', build_suggestions),
+    ('matching index', build_matching),
+    ('similarity index', load_similarity),
+)
+
+
+def _timed(function):
+    started = time.perf_counter()
+    count = function()
+    return count, round((time.perf_counter() - started) * 1000, 1)
+
+
+def warm_up():
+    """Run every warm-up step, returns the report"""
+    report = {}
+    for name, function in STEPS:
+        try:
+            report[name] = _timed(function)
+        except Exception:
+            logger.exception('Warm-up step %s failed', name)
+    # Connections must not be inherited by forked workers
+    connections.close_all()
+    return report
+
+
+def start_similarity_refresher():
+    """Thread updating the similar-projects index in this worker (see projects/similarity.py)"""
+    from projects.similarity import start_refresher
+
+    return int(start_refresher())
+
+
+def warm_up_worker():
+    """Open the database connection of a freshly forked worker and start its threads"""
+    def connect():
+        connections['default'].ensure_connection()
+        return 1
+
+    report = {}
+    try:
+        report['database connection'] = _timed(connect)
+    except Exception:
+        # The first request reconnects (and reports the error) itself
+        logger.warning('Could not connect to the database during worker warm-up', exc_info=True)
+    report['similarity refresher'] = _timed(start_similarity_refresher)
+    return report
+
+
+def format_report(report):
+    total = sum(ms for count, ms in report.values())
+    steps = ', '.join(f'{name} {count} ({ms} ms)' for name, (count, ms) in report.items())
+    return f'Warm-up finished in {total:.1f} ms: {steps}'
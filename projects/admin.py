@@ -1,12 +1,161 @@
 from django.contrib import admin
-from .models import Project, Vacancy
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.contrib.postgres.search import SearchQuery
+from django.db import connections
+
+from .archive import restore_vacancy
+from .models import (
+    ArchivedVacancy,
+    Project,
+    Technology,
+    TechnologyAlias,
+    Vacancy,
+    project_search_vector,
+    vacancy_search_vector
+)
+from .pagination import EstimatedCountPaginator, get_config, resolve_count
+from .technologies import clean_name, normalize_name, sync_project_technologies
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    Sidebar filter with a text input instead of a list of choices.
+
+    Used for foreign keys to large tables (e.g. users), where rendering
+    every related object into the sidebar is not an option.
+    """
+    template = 'admin/projects/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        # Required to show the filter, the input replaces the choices
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        yield {
+            'value': self.value() or '',
+            'query_parts': [
+                (key, value)
+                for key, value in changelist.get_filters_params().items()
+                if key != self.parameter_name
+            ],
+        }
+
+
+class OwnerUsernameFilter(InputFilter):
+    title = 'owner username'
+    parameter_name = 'owner_username'
+    lookup = 'owner__username'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.lookup: self.value().strip()})
+        return queryset
+
+
+class ProjectOwnerUsernameFilter(OwnerUsernameFilter):
+    title = 'project owner username'
+    lookup = 'project__owner__username'
+
+
+class KeysetFilter(admin.SimpleListFilter):
+    """
+    Keyset navigation: ``?before=<id>`` shows rows older than that id.
+
+    Combined with ordering by ``-id`` this replaces deep OFFSET pages, whose
+    cost grows with the page number, by an index range scan.
+    """
+    title = 'navigation'
+    parameter_name = 'before'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return self.value() is not None
+
+    def choices(self, changelist):
+        yield {
+            'selected': False,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name, PAGE_VAR]),
+            'display': 'Back to newest',
+        }
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().isdigit():
+            return queryset.filter(pk__lt=int(self.value()))
+        return queryset
+
+
+class KeysetChangeList(ChangeList):
+    """ChangeList that exposes a link to the next keyset page"""
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.keyset_next_url = None
+        if ORDER_VAR in self.params:
+            # Keyset navigation relies on the default "-id" ordering
+            return
+        results = list(self.result_list)
+        if len(results) >= self.list_per_page:
+            self.keyset_next_url = self.get_query_string(
+                {KeysetFilter.parameter_name: results[-1].pk},
+                remove=[PAGE_VAR]
+            )
+
+
+class LargeTableAdminMixin:
+    """
+    Admin settings for tables with millions of rows.
+
+    - no full (unfiltered) result count
+    - estimated filtered counts above COUNT_PAGINATION['ESTIMATE_THRESHOLD']
+    - keyset navigation through KeysetFilter (newest first by id)
+    - full-text search through the model's GIN indexed search vector
+    """
+    show_full_result_count = False
+    ordering = ('-id',)
+    search_vector = None
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        threshold = get_config()['ESTIMATE_THRESHOLD']
+        return EstimatedCountPaginator(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_resolver=lambda qs: resolve_count(qs, threshold)
+        )
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if (
+            not search_term
+            or self.search_vector is None
+            or connections[queryset.db].vendor != 'postgresql'
+        ):
+            return super().get_search_results(request, queryset, search_term)
+
+        # Same expression as the GIN index, so PostgreSQL can use it
+        queryset = queryset.alias(search=self.search_vector()).filter(
+            search=SearchQuery(search_term, config='english', search_type='websearch')
+        )
+        return queryset, False
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'owner', 'budget', 'deadline', 'technologies_count', 'created_at')
-    list_filter = ('created_at', 'deadline', 'owner')
-    search_fields = ('title', 'description', 'owner__username')
+    list_filter = ('created_at', 'deadline', OwnerUsernameFilter, KeysetFilter)
+    list_select_related = ('owner',)
+    search_fields = ('title', 'owner__username')
+    search_vector = staticmethod(project_search_vector)
+    autocomplete_fields = ('owner',)
     readonly_fields = ('created_at', 'updated_at', 'technologies_count', 'is_overdue')
 
     fieldsets = (
@@ -31,14 +180,27 @@ class ProjectAdmin(admin.ModelAdmin):
 
     technologies_count.short_description = 'Tech Count'
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change or 'technologies' in form.changed_data:
+            sync_project_technologies(obj)
+
 
 @admin.register(Vacancy)
-class VacancyAdmin(admin.ModelAdmin):
+class VacancyAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'project', 'employment_type', 'salary_range', 'is_active', 'created_at')
-    list_filter = ('employment_type', 'is_active', 'created_at', 'project__owner')
-    search_fields = ('title', 'description', 'project__title')
+    list_filter = ('employment_type', 'is_active', 'created_at', ProjectOwnerUsernameFilter, KeysetFilter)
+    # project.__str__ shows the owner's username
+    list_select_related = ('project__owner',)
+    search_fields = ('title', 'project__title')
+    search_vector = staticmethod(vacancy_search_vector)
+    autocomplete_fields = ('project',)
     readonly_fields = ('created_at', 'updated_at', 'salary_range')
 
+    def get_queryset(self, request):
+        # Vacancies of projects being deleted in the background are hidden
+        return super().get_queryset(request).filter(project__deletion_pending=False)
+
     fieldsets = (
         ('Basic Information', {
             'fields': ('title', 'project', 'employment_type', 'is_active')
@@ -53,4 +215,52 @@ class VacancyAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(ArchivedVacancy)
+class ArchivedVacancyAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('title', 'project', 'employment_type', 'salary_range', 'created_at', 'archived_at')
+    list_filter = ('employment_type', 'archived_at', ProjectOwnerUsernameFilter, KeysetFilter)
+    list_select_related = ('project__owner',)
+    search_fields = ('title', 'project__title')
+    actions = ('restore',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Restore selected vacancies (as inactive)')
+    def restore(self, request, queryset):
+        for archived in queryset:
+            restore_vacancy(archived)
+        self.message_user(request, f'Restored {len(queryset)} vacancy(ies)')
+
+
+class TechnologyAliasInline(admin.TabularInline):
+    model = TechnologyAlias
+    extra = 1
+
+
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    list_display = ('name', 'normalized', 'project_count', 'created_at')
+    search_fields = ('normalized',)
+    ordering = ('-project_count', 'name')
+    readonly_fields = ('normalized', 'project_count', 'created_at')
+    inlines = (TechnologyAliasInline,)
+
+    def save_model(self, request, obj, form, change):
+        obj.name = clean_name(obj.name)
+        obj.normalized = normalize_name(obj.name)
+        super().save_model(request, obj, form, change)
+
+    def save_formset(self, request, form, formset, change):
+        aliases = formset.save(commit=False)
+        for alias in aliases:
+            alias.normalized = normalize_name(alias.normalized)
+            alias.save()
+        for alias in formset.deleted_objects:
+            alias.delete()
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        from project_management.querycache import track_model_generations
+        from . import signals  # noqa: F401
+
+        track_model_generations(
+            self.get_model('Project'), self.get_model('Vacancy'), self.get_model('ArchivedVacancy')
+        )
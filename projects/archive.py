@@ -0,0 +1,216 @@
+"""
+Archive tier for vacancies.
+
+Deactivated vacancies used to stay in the Vacancy table forever, so lists,
+stats and indexes grew with history instead of with the working set.
+Vacancies inactive for longer than the retention period are moved to
+ArchivedVacancy in batches (run by the archive_vacancies command or the
+``projects.archive_vacancies`` job) and are read from there only on demand.
+
+Configuration (settings.VACANCY_ARCHIVE):
+
+    VACANCY_ARCHIVE = {
+        'RETENTION_DAYS': 180,   # inactive (not updated) for longer than this
+        'BATCH_SIZE': 1000,      # vacancies moved per transaction
+    }
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BooleanField, F, Value
+from django.utils import timezone
+
+from project_management.querycache import bump_generation
+
+from .cache import bump_owner_version
+from .changes import record_change, record_changes
+from .models import ArchivedVacancy, ChangeEvent, Project, Vacancy
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'RETENTION_DAYS': 180,
+    'BATCH_SIZE': 1000,
+}
+
+# Columns copied as is from Vacancy to ArchivedVacancy
+ARCHIVED_FIELDS = (
+    'title', 'description', 'requirements', 'salary_min', 'salary_max',
+    'employment_type', 'project_id', 'created_at', 'updated_at',
+)
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'VACANCY_ARCHIVE', {}))
+    return config
+
+
+def archivable_vacancies(retention_days=None):
+    """Inactive vacancies not updated within the retention period"""
+    if retention_days is None:
+        retention_days = get_config()['RETENTION_DAYS']
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    return Vacancy.objects.filter(is_active=False, updated_at__lt=cutoff)
+
+
+def _archive_batch(queryset, batch_size):
+    """Move one batch in a single transaction, returns (moved, owner ids)"""
+    table = connection.ops.quote_name(Vacancy._meta.db_table)
+    with transaction.atomic():
+        vacancies = list(
+            queryset.select_for_update(skip_locked=True)
+            .order_by('id')
+            .values('id', *ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not vacancies:
+            return 0, set()
+
+        ArchivedVacancy.objects.bulk_create(
+            [
+                ArchivedVacancy(
+                    original_id=vacancy['id'],
+                    **{field: vacancy[field] for field in ARCHIVED_FIELDS}
+                )
+                for vacancy in vacancies
+            ],
+            # A batch interrupted after the insert is simply archived again
+            ignore_conflicts=True
+        )
+        ids = [vacancy['id'] for vacancy in vacancies]
+        with connection.cursor() as cursor:
+            # Raw delete: nothing references vacancies, signals are not needed
+            cursor.execute(
+                f'DELETE FROM {table} WHERE id IN ({", ".join(["%s"] * len(ids))})', ids
+            )
+
+        project_ids = {vacancy['project_id'] for vacancy in vacancies}
+        project_owners = dict(
+            Project.all_objects.filter(pk__in=project_ids).values_list('id', 'owner_id')
+        )
+        # Archived vacancies leave the synced data set (see projects/changes.py)
+        record_changes(
+            (project_owners.get(vacancy['project_id']), ChangeEvent.TYPE_VACANCY, vacancy['id'],
+             ChangeEvent.ACTION_DELETE)
+            for vacancy in vacancies
+        )
+
+    return len(vacancies), set(project_owners.values())
+
+
+def archive_vacancies(retention_days=None, batch_size=None, limit=None):
+    """
+    Move archivable vacancies to the archive tier in batches.
+
+    Every batch is its own short transaction, so the job can be stopped and
+    resumed at any time. Returns the number of vacancies moved.
+    """
+    batch_size = batch_size or get_config()['BATCH_SIZE']
+    queryset = archivable_vacancies(retention_days)
+    moved = 0
+    owner_ids = set()
+
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        count, owners = _archive_batch(queryset, size)
+        if not count:
+            break
+        moved += count
+        owner_ids |= owners
+
+    if moved:
+        # Raw deletes bypass signals, invalidate caches explicitly
+        bump_generation(Vacancy)
+        bump_generation(ArchivedVacancy)
+        for owner_id in owner_ids:
+            bump_owner_version(owner_id)
+        logger.info('Archived %s vacancies of %s owners', moved, len(owner_ids))
+    return moved
+
+
+def restore_vacancy(archived):
+    """Move an archived vacancy back to the active table (as inactive), returns it"""
+    with transaction.atomic():
+        vacancy = Vacancy(
+            id=archived.original_id,
+            is_active=False,
+            **{field: getattr(archived, field) for field in ARCHIVED_FIELDS}
+        )
+        Vacancy.objects.bulk_create([vacancy])
+        # auto_now_add overwrote created_at; updated_at is left at "now" so the
+        # vacancy is not archived again right away
+        Vacancy.objects.filter(pk=vacancy.pk).update(created_at=archived.created_at)
+        vacancy.created_at = archived.created_at
+        # The delete signal invalidates the owner's cached responses
+        archived.delete()
+        record_change(archived.project.owner_id, ChangeEvent.TYPE_VACANCY, vacancy.pk)
+    return vacancy
+
+
+class BothTiers:
+    """
+    Current and archived vacancies listed as one (``?archived=true``).
+
+    Stands in for a queryset where the paginators need one: ``filter`` and
+    ``order_by`` apply to both tiers, slicing runs one UNION query of row
+    keys (``created_at``, the vacancy ``id`` in either tier and whether it
+    is ``archived``) and ``rows`` loads the instances of a page of keys.
+    """
+    ordered = True
+
+    def __init__(self, vacancies, archived, ordering=('-created_at', '-id')):
+        self.vacancies = vacancies
+        self.archived = archived
+        self.ordering = tuple(ordering)
+
+    def filter(self, *args, **kwargs):
+        return BothTiers(
+            self.vacancies.filter(*args, **kwargs), self.archived.filter(*args, **kwargs), self.ordering
+        )
+
+    def order_by(self, *ordering):
+        return BothTiers(self.vacancies, self.archived, ordering or self.ordering)
+
+    def count(self):
+        return self.vacancies.count() + self.archived.count()
+
+    def _keys(self):
+        current = self.vacancies.order_by().values(
+            'created_at', key=F('id'), archived=Value(False, output_field=BooleanField())
+        )
+        archived = self.archived.order_by().values(
+            'created_at', key=F('original_id'), archived=Value(True, output_field=BooleanField())
+        )
+        ordering = [field.replace('id', 'key') if field.lstrip('-') == 'id' else field for field in self.ordering]
+        return current.union(archived, all=True).order_by(*ordering)
+
+    def __getitem__(self, index):
+        keys = self._keys()[index]
+        return [self._key(row) for row in keys] if isinstance(index, slice) else self._key(keys)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    @staticmethod
+    def _key(row):
+        return {'created_at': row['created_at'], 'id': row['key'], 'archived': bool(row['archived'])}
+
+    def rows(self, keys):
+        """Vacancy and ArchivedVacancy instances for a page of keys, in order"""
+        ids = {False: [], True: []}
+        for key in keys:
+            ids[key['archived']].append(key['id'])
+        found = {(False, vacancy.pk): vacancy for vacancy in self.vacancies.filter(pk__in=ids[False])}
+        found.update(
+            ((True, vacancy.original_id), vacancy)
+            for vacancy in self.archived.filter(original_id__in=ids[True])
+        )
+        return [found[(key['archived'], key['id'])] for key in keys if (key['archived'], key['id']) in found]
+
+    def iterator(self, chunk_size=2000):
+        """Every row, current vacancies first (for streaming)"""
+        yield from self.vacancies.iterator(chunk_size=chunk_size)
+        yield from self.archived.iterator(chunk_size=chunk_size)
@@ -0,0 +1,156 @@
+"""
+Per-user versioned response cache.
+
+Every owner has a data version number stored in the cache. Cache keys
+include the current version, so bumping it on any Project/Vacancy write
+makes all previous entries of that owner unreachable at once (they simply
+expire) without scanning or deleting keys.
+
+Configuration (settings.RESPONSE_CACHE):
+
+    RESPONSE_CACHE = {
+        'ENABLED': True,
+        'CACHE_ALIAS': 'default',   # any alias from settings.CACHES
+        'TIMEOUT': 300,             # seconds
+        'PUBLIC_TIMEOUT': 60,       # anonymous feeds, shared by everyone
+    }
+"""
+
+import hashlib
+import time
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from rest_framework.response import Response
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+    'PUBLIC_TIMEOUT': 60,
+}
+
+VERSION_KEY = 'owner-version:{owner_id}'
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'RESPONSE_CACHE', {}))
+    return config
+
+
+def get_cache():
+    return caches[get_config()['CACHE_ALIAS']]
+
+
+def get_owner_version(owner_id):
+    """Current data version of an owner, initialized on first use"""
+    cache = get_cache()
+    key = VERSION_KEY.format(owner_id=owner_id)
+    version = cache.get(key)
+    if version is None:
+        # A time based start value never collides with versions of an evicted key
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def _bump(owner_id):
+    cache = get_cache()
+    key = VERSION_KEY.format(owner_id=owner_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def bump_owner_version(owner_id):
+    """
+    Invalidate every cached response of an owner once the current
+    transaction commits: bumped earlier, a concurrent read could still
+    cache the old rows under the new version
+    """
+    transaction.on_commit(partial(_bump, owner_id))
+
+
+def _request_digest(request):
+    query = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+    )
+    raw = f'{request.get_host()}|{request.path}|{query}'
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def build_cache_key(request, owner_id):
+    """Key made of user, route, query parameters and the owner's data version"""
+    return f'response:{owner_id}:{get_owner_version(owner_id)}:{_request_digest(request)}'
+
+
+def cached_response(view_method):
+    """
+    Cache successful GET responses of a viewset method per user.
+
+    Only the serialized data is cached, so content negotiation still
+    happens on every request.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        config = get_config()
+        if not config['ENABLED'] or request.method != 'GET' or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+
+        cache = get_cache()
+        key = build_cache_key(request, request.user.pk)
+        cached = cache.get(key)
+        if cached is not None:
+            data, status_code = cached
+            return Response(data, status=status_code, headers={'X-Cache': 'HIT'})
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200 and not getattr(response, 'streaming', False):
+            cache.set(key, (response.data, response.status_code), timeout=config['TIMEOUT'])
+        response['X-Cache'] = 'MISS'
+        return response
+
+    return wrapper
+
+
+def cached_public_response(view_method):
+    """
+    Cache successful GET responses shared by all (anonymous) clients.
+
+    Public data is not versioned per owner: entries simply expire after
+    PUBLIC_TIMEOUT seconds, and the same max-age is advertised to
+    downstream HTTP caches and CDNs.
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        config = get_config()
+        if not config['ENABLED'] or request.method != 'GET':
+            return view_method(self, request, *args, **kwargs)
+
+        cache = get_cache()
+        key = f'public-response:{_request_digest(request)}'
+        cached = cache.get(key)
+        if cached is not None:
+            data, status_code = cached
+            response = Response(data, status=status_code, headers={'X-Cache': 'HIT'})
+        else:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, (response.data, response.status_code), timeout=config['PUBLIC_TIMEOUT'])
+            response['X-Cache'] = 'MISS'
+
+        if response.status_code == 200:
+            patch_cache_control(response, public=True, max_age=config['PUBLIC_TIMEOUT'])
+        return response
+
+    return wrapper
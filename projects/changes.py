@@ -0,0 +1,245 @@
+"""
+Incremental change feed for client synchronisation.
+
+Every project/vacancy write appends a ChangeEvent (from the model signals,
+or explicitly for raw batch operations). Clients keep the id of the last
+event they saw and ask for everything after it, so sync traffic is
+proportional to the number of changes instead of the size of the data.
+
+- Deleting a project produces a single project tombstone: clients drop the
+  project's vacancies together with it.
+- Archived vacancies (see projects/archive.py) leave the active data set
+  and are reported as vacancy tombstones.
+- Events older than RETENTION_DAYS are pruned; clients whose token points
+  before the pruned range get 410 Gone and must download the lists again.
+
+Ids are allocated when an event is inserted but only become visible when
+its transaction commits, so a reader could move past an id that commits
+later and lose that event for good. On PostgreSQL a transaction appending
+events therefore holds an advisory lock from its first event until it
+commits: appending transactions commit one at a time, in id order, and
+every visible id is final. SQLite serializes writers by itself. Keep
+transactions short after their first event, later appenders wait for
+them. On other databases SETTLE_SECONDS holds back the events inserted
+within that many seconds and everything after them, which only guesses
+how long a transaction may take to commit.
+
+Configuration (settings.CHANGE_FEED):
+
+    CHANGE_FEED = {
+        'ENABLED': True,
+        'PAGE_SIZE': 500,
+        'MAX_PAGE_SIZE': 1000,
+        'RETENTION_DAYS': 30,
+        'SETTLE_SECONDS': 0,    # without the sequence lock: hold back younger events
+    }
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .events import publish
+from .models import ChangeEvent, ChangeFeedWatermark, Project, Vacancy
+from .serializers import ProjectSerializer, VacancySerializer
+
+DEFAULTS = {
+    'ENABLED': True,
+    'PAGE_SIZE': 500,
+    'MAX_PAGE_SIZE': 1000,
+    'RETENTION_DAYS': 30,
+    'SETTLE_SECONDS': 0,
+}
+
+# Primary key of the ChangeFeedWatermark row
+WATERMARK_ID = 1
+# PostgreSQL advisory lock taken by transactions appending events
+SEQUENCE_LOCK_ID = 0x63686e67
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'CHANGE_FEED', {}))
+    return config
+
+
+def _lock_sequence():
+    """Hold the sequence lock until the transaction ends (PostgreSQL only)"""
+    connection = connections[router.db_for_write(ChangeEvent)]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [SEQUENCE_LOCK_ID])
+
+
+def record_change(owner_id, object_type, object_id, action=ChangeEvent.ACTION_UPSERT):
+    """Append a change event for an owner"""
+    if owner_id is None or not get_config()['ENABLED']:
+        return
+    # Outside a transaction as well: the lock must cover the commit
+    with transaction.atomic():
+        _lock_sequence()
+        ChangeEvent.objects.create(
+            owner_id=owner_id, object_type=object_type, object_id=object_id, action=action
+        )
+    publish(owner_id)
+
+
+def record_changes(events):
+    """Append many (owner_id, object_type, object_id, action) events at once"""
+    if not get_config()['ENABLED']:
+        return
+    with transaction.atomic():
+        _lock_sequence()
+        created = ChangeEvent.objects.bulk_create([
+            ChangeEvent(owner_id=owner_id, object_type=object_type, object_id=object_id, action=action)
+            for owner_id, object_type, object_id, action in events
+            if owner_id is not None
+        ])
+    for owner_id in {event.owner_id for event in created}:
+        publish(owner_id)
+
+
+def latest_sequence(owner_id):
+    """Id of the owner's newest event, the token to start syncing from"""
+    latest = ChangeEvent.objects.filter(owner_id=owner_id).aggregate(seq=Max('id'))['seq'] or 0
+    # Ids are global, a token past the pruned range is valid for every owner
+    return max(latest, pruned_through())
+
+
+def sequence_for_timestamp(owner_id, timestamp):
+    """Token that returns every event created at or after ``timestamp``"""
+    first = (
+        ChangeEvent.objects
+        .filter(owner_id=owner_id, created_at__gte=timestamp)
+        .order_by('id')
+        .values_list('id', flat=True)
+        .first()
+    )
+    return first - 1 if first is not None else latest_sequence(owner_id)
+
+
+def pruned_through():
+    """Highest event id removed by prune_changes (0 if nothing was pruned)"""
+    return (
+        ChangeFeedWatermark.objects.filter(pk=WATERMARK_ID)
+        .values_list('pruned_through', flat=True).first()
+    ) or 0
+
+
+def _advance_pruned_through(sequence):
+    ChangeFeedWatermark.objects.get_or_create(pk=WATERMARK_ID)
+    ChangeFeedWatermark.objects.filter(
+        pk=WATERMARK_ID, pruned_through__lt=sequence
+    ).update(pruned_through=sequence)
+
+
+def settled_sequence():
+    """
+    Highest id up to which the feed is final, the start cursor of indexes
+    following it: every event with a lower or equal id is visible now or
+    never will be
+    """
+    ids = ChangeEvent.objects.order_by('id').values_list('id', flat=True)
+    settle = get_config()['SETTLE_SECONDS']
+    if settle:
+        # Held back from the first unsettled event on, whatever comes after it
+        unsettled = ids.filter(created_at__gt=timezone.now() - timedelta(seconds=settle)).first()
+        if unsettled is not None:
+            return unsettled - 1
+    return ids.last() or 0
+
+
+def settled(queryset):
+    """Restrict a ChangeEvent queryset to the final part of the feed"""
+    if not get_config()['SETTLE_SECONDS']:
+        return queryset
+    return queryset.filter(id__lte=settled_sequence())
+
+
+def get_changes(owner_id, since, limit):
+    """
+    Events of an owner after ``since``, collapsed to the latest per object.
+
+    Returns (events, next_since, has_more). Events are read through the
+    (owner, id) index, and only from the final part of the feed, so
+    ``next_since`` never skips an event that commits later.
+    """
+    page = list(
+        settled(ChangeEvent.objects.filter(owner_id=owner_id, id__gt=since))
+        .order_by('id')[:limit + 1]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+    next_since = page[-1].pk if page else since
+
+    latest = {}
+    for event in page:
+        latest[(event.object_type, event.object_id)] = event
+    events = sorted(latest.values(), key=lambda event: event.pk)
+    return events, next_since, has_more
+
+
+def _load_objects(owner, events):
+    """Current serialized state of the upserted objects, keyed by (type, id)"""
+    ids = {ChangeEvent.TYPE_PROJECT: [], ChangeEvent.TYPE_VACANCY: []}
+    for event in events:
+        if event.action == ChangeEvent.ACTION_UPSERT:
+            ids[event.object_type].append(event.object_id)
+
+    data = {}
+    if ids[ChangeEvent.TYPE_PROJECT]:
+        projects = Project.objects.filter(
+            owner=owner, pk__in=ids[ChangeEvent.TYPE_PROJECT]
+        ).with_deadline_info().with_vacancies_count().select_related('owner')
+        for project in projects:
+            data[(ChangeEvent.TYPE_PROJECT, project.pk)] = ProjectSerializer(project).data
+    if ids[ChangeEvent.TYPE_VACANCY]:
+        vacancies = Vacancy.objects.filter(
+            project__owner=owner,
+            project__deletion_pending=False,
+            pk__in=ids[ChangeEvent.TYPE_VACANCY]
+        ).select_related('project')
+        for vacancy in vacancies:
+            data[(ChangeEvent.TYPE_VACANCY, vacancy.pk)] = VacancySerializer(vacancy).data
+    return data
+
+
+def serialize_changes(owner, events):
+    """Change items (seq, type, id, action, data) for the events of an owner"""
+    data = _load_objects(owner, events)
+    changes = []
+    for event in events:
+        item = data.get((event.object_type, event.object_id))
+        # Objects gone by now are reported as deleted
+        action = ChangeEvent.ACTION_UPSERT if item is not None else ChangeEvent.ACTION_DELETE
+        changes.append({
+            'seq': event.pk,
+            'type': event.object_type,
+            'id': event.object_id,
+            'action': action,
+            'data': item
+        })
+    return changes
+
+
+def prune_changes(retention_days=None, batch_size=10000):
+    """Delete events older than the retention period, returns their count"""
+    if retention_days is None:
+        retention_days = get_config()['RETENTION_DAYS']
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    queryset = ChangeEvent.objects.filter(created_at__lt=cutoff).order_by('id')
+
+    pruned = 0
+    while True:
+        ids = list(queryset.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        # The watermark moves with the deletion, never before or after it
+        with transaction.atomic():
+            ChangeEvent.objects.filter(id__in=ids).delete()
+            _advance_pruned_through(ids[-1])
+        pruned += len(ids)
+    return pruned
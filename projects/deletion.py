@@ -0,0 +1,198 @@
+"""
+Chunked cascade deletion of projects.
+
+Deleting a project through the ORM makes Django's collector load every
+related vacancy into memory inside the request. Large projects are instead
+marked as pending deletion (which hides them from all querysets through the
+default manager) and their vacancies are removed in bounded raw DELETE
+batches by a background job (see jobs/ and projects/tasks.py). Users are
+deleted the same way: their projects are purged by a job that removes
+the user row last.
+
+Configuration (settings.PROJECT_DELETION):
+
+    PROJECT_DELETION = {
+        'SYNC_THRESHOLD': 1000,   # projects with fewer vacancies are deleted inline
+        'BATCH_SIZE': 5000,       # vacancies removed per DELETE statement
+        'BACKGROUND': True,       # False: purge pending projects only via purge_deleted_projects
+    }
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from rest_framework.authtoken.models import Token
+
+from jobs.queue import enqueue
+from project_management.querycache import bump_generation
+
+from .cache import bump_owner_version, get_cache
+from .changes import record_change
+from .models import ArchivedVacancy, ChangeEvent, Project, Vacancy
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SYNC_THRESHOLD': 1000,
+    'BATCH_SIZE': 5000,
+    'BACKGROUND': True,
+}
+
+PROGRESS_KEY = 'project-deletion:{project_id}'
+PROGRESS_TIMEOUT = 60 * 60
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PROJECT_DELETION', {}))
+    return config
+
+
+def get_progress(project_id):
+    """Deletion progress of a project, or None if unknown/finished long ago"""
+    return get_cache().get(PROGRESS_KEY.format(project_id=project_id))
+
+
+def _set_progress(project_id, **progress):
+    get_cache().set(PROGRESS_KEY.format(project_id=project_id), progress, timeout=PROGRESS_TIMEOUT)
+
+
+def delete_project(project, owner=None):
+    """
+    Delete a project, inline for small projects and in the background otherwise.
+
+    Returns None if the project is already gone, otherwise the scheduled
+    purge Job (or True when BACKGROUND is off); the project is hidden from
+    now on either way.
+    """
+    config = get_config()
+    threshold = config['SYNC_THRESHOLD']
+    related_rows = sum(
+        model.objects.filter(project_id=project.pk).order_by()[:threshold + 1].count()
+        for model in (Vacancy, ArchivedVacancy)
+    )
+    if related_rows <= threshold:
+        project.delete()
+        return None
+
+    with transaction.atomic():
+        mark_pending(project)
+        if not config['BACKGROUND']:
+            return True
+        return enqueue('projects.purge_project', project.pk, owner=owner)
+
+
+def mark_pending(project):
+    """Hide the project immediately, the data is removed by purge_project"""
+    Project.all_objects.filter(pk=project.pk).update(deletion_pending=True)
+    bump_owner_version(project.owner_id)
+    # Clients drop the project (and its vacancies) now, not after the purge
+    record_change(project.owner_id, ChangeEvent.TYPE_PROJECT, project.pk, ChangeEvent.ACTION_DELETE)
+    total = (
+        Vacancy.objects.filter(project_id=project.pk).count()
+        + ArchivedVacancy.objects.filter(project_id=project.pk).count()
+    )
+    _set_progress(project.pk, owner_id=project.owner_id, status='pending', deleted=0, total=total)
+
+
+def purge_project(project_id, batch_size=None):
+    """
+    Remove a pending project and its vacancies in bounded batches.
+
+    Each batch is a separate short transaction, so locks are held briefly
+    and the work can be resumed after an interruption.
+    """
+    batch_size = batch_size or get_config()['BATCH_SIZE']
+    project = Project.all_objects.filter(pk=project_id, deletion_pending=True).first()
+    if project is None:
+        return 0
+
+    progress = get_progress(project_id) or {}
+    total = progress.get('total')
+    deleted = 0
+
+    # Archived vacancies cascade from the project as well, purge both tiers
+    for model in (Vacancy, ArchivedVacancy):
+        table = connection.ops.quote_name(model._meta.db_table)
+        sql = (
+            f'DELETE FROM {table} WHERE id IN '
+            f'(SELECT id FROM {table} WHERE project_id = %s LIMIT %s)'
+        )
+        while True:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, [project_id, batch_size])
+                    rows = cursor.rowcount
+            if rows <= 0:
+                break
+            deleted += rows
+            _set_progress(
+                project_id, owner_id=project.owner_id, status='deleting', deleted=deleted, total=total
+            )
+
+    # Raw deletes bypass signals, invalidate caches explicitly
+    bump_generation(Vacancy)
+    bump_generation(ArchivedVacancy)
+    project.delete()
+    bump_owner_version(project.owner_id)
+    _set_progress(project_id, owner_id=project.owner_id, status='deleted', deleted=deleted, total=total)
+    logger.info('Purged project %s with %s vacancies', project_id, deleted)
+    return deleted
+
+
+def purge_pending_projects(batch_size=None):
+    """Purge every project marked as pending deletion, returns their count"""
+    project_ids = list(
+        Project.all_objects.filter(deletion_pending=True).order_by('id').values_list('id', flat=True)
+    )
+    for project_id in project_ids:
+        purge_project(project_id, batch_size=batch_size)
+    return len(project_ids)
+
+
+def delete_user(user, owner=None):
+    """
+    Delete a user without cascading through all their vacancies in one go.
+
+    Users with few vacancies are deleted inline. Otherwise the user is
+    deactivated, their tokens are revoked and their projects hidden, and a
+    background job purges the projects batch by batch and deletes the user
+    row at the end.
+
+    Returns None when the user is deleted already, otherwise the scheduled
+    purge Job (or True when BACKGROUND is off and the purge ran inline).
+    """
+    config = get_config()
+    threshold = config['SYNC_THRESHOLD']
+    related_rows = sum(
+        model.objects.filter(project__owner_id=user.pk).order_by()[:threshold + 1].count()
+        for model in (Vacancy, ArchivedVacancy)
+    )
+    if related_rows <= threshold:
+        purge_user(user.pk)
+        return None
+
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        Token.objects.filter(user_id=user.pk).delete()
+        Project.all_objects.filter(owner_id=user.pk).update(deletion_pending=True)
+        bump_owner_version(user.pk)
+        if not config['BACKGROUND']:
+            purge_user(user.pk)
+            return True
+        return enqueue('projects.purge_user', user.pk, owner=owner)
+
+
+def purge_user(user_id, batch_size=None):
+    """
+    Purge every project of a user, then delete the user row (with tokens
+    and the now empty cascade). Returns the number of deleted vacancies.
+    """
+    Project.all_objects.filter(owner_id=user_id).update(deletion_pending=True)
+    project_ids = list(Project.all_objects.filter(owner_id=user_id).order_by('id').values_list('id', flat=True))
+    deleted = sum(purge_project(project_id, batch_size=batch_size) for project_id in project_ids)
+    User.objects.filter(pk=user_id).delete()
+    logger.info('Purged user %s with %s projects', user_id, len(project_ids))
+    return deleted
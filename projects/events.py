@@ -0,0 +1,175 @@
+"""
+Publish/subscribe hub for live change notifications (Server-Sent Events).
+
+The change log (projects/changes.py) stays the source of truth: the hub
+only wakes up the streams of an owner when new ChangeEvents were committed,
+and each stream then reads them from the log. That keeps ordering, gives
+``Last-Event-ID`` resumption for free and makes a lost notification cost
+latency (until the next poll) instead of data.
+
+Backends:
+
+- ``memory``: notifications stay inside the process. Enough for a single
+  ASGI worker; with several workers, streams catch up on POLL_INTERVAL.
+- ``postgres``: notifications go through ``pg_notify`` and every process
+  runs one LISTEN connection, so all workers see all writes.
+
+Configuration (settings.EVENT_STREAM):
+
+    EVENT_STREAM = {
+        'BACKEND': 'memory',          # or 'postgres'
+        'CHANNEL': 'project_changes',  # LISTEN/NOTIFY channel
+        'HEARTBEAT': 15,              # seconds between keep-alive comments
+        'POLL_INTERVAL': 60,          # seconds between fallback log checks
+        'MAX_DURATION': 3600,         # seconds before a stream is closed (client reconnects)
+        'TICKET_MAX_AGE': 300,        # seconds a stream ticket is valid (see projects/streams.py)
+    }
+"""
+
+import asyncio
+import logging
+import select
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'memory',
+    'CHANNEL': 'project_changes',
+    'HEARTBEAT': 15,
+    'POLL_INTERVAL': 60,
+    'MAX_DURATION': 3600,
+    'TICKET_MAX_AGE': 300,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'EVENT_STREAM', {}))
+    return config
+
+
+class Subscription:
+    """Wake-up flag of one stream, set from any thread"""
+
+    def __init__(self, owner_id):
+        self.owner_id = owner_id
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def notify(self):
+        self.loop.call_soon_threadsafe(self.event.set)
+
+    async def wait(self, timeout):
+        """True if notified within ``timeout`` seconds"""
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self.event.clear()
+        return True
+
+
+class Hub:
+    """Process-local registry of subscriptions per owner"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, owner_id):
+        subscription = Subscription(owner_id)
+        with self._lock:
+            self._subscriptions[owner_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.owner_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.owner_id]
+
+    def dispatch(self, owner_id):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(owner_id, ()))
+        for subscription in subscriptions:
+            subscription.notify()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+hub = Hub()
+
+
+class PostgresListener(threading.Thread):
+    """
+    One LISTEN connection per process, forwarding notifications to the hub.
+
+    Uses its own psycopg2 connection (not Django's, which is per thread and
+    may be inside a transaction).
+    """
+
+    def __init__(self, channel):
+        super().__init__(name='event-stream-listener', daemon=True)
+        self.channel = channel
+
+    def run(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        while True:
+            try:
+                conn = psycopg2.connect(**connections['default'].get_connection_params())
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        if notification.payload.isdigit():
+                            hub.dispatch(int(notification.payload))
+            except Exception:
+                logger.exception('Event stream listener failed, reconnecting')
+                threading.Event().wait(5)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def ensure_listener():
+    """Start the LISTEN thread of this process (postgres backend only)"""
+    global _listener
+    config = get_config()
+    if config['BACKEND'] != 'postgres':
+        return
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = PostgresListener(config['CHANNEL'])
+            _listener.start()
+
+
+def _publish(owner_id):
+    config = get_config()
+    if config['BACKEND'] == 'postgres':
+        # Delivered to the listeners of all processes, this one included
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [config['CHANNEL'], str(owner_id)])
+    else:
+        hub.dispatch(owner_id)
+
+
+def publish(owner_id):
+    """Wake up the owner's streams once the current transaction commits"""
+    transaction.on_commit(lambda: _publish(owner_id))
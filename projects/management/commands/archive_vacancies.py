@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import enqueue
+from projects.archive import archivable_vacancies, archive_vacancies, get_config
+
+
+class Command(BaseCommand):
+    help = 'Move vacancies inactive for longer than the retention period to the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help=f'Retention period in days (default: {get_config()["RETENTION_DAYS"]})'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Number of vacancies moved per transaction'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Stop after moving this many vacancies'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report how many vacancies would be archived'
+        )
+        parser.add_argument(
+            '--background', action='store_true',
+            help='Queue a background job instead of archiving now'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable_vacancies(options['days']).count()
+            self.stdout.write(f'📦 {count} vacancy(ies) would be archived')
+            return
+
+        if options['background']:
+            job = enqueue('projects.archive_vacancies', retention_days=options['days'])
+            self.stdout.write(self.style.SUCCESS(f'⚙️ Queued archive job {job.pk}'))
+            return
+
+        moved = archive_vacancies(
+            retention_days=options['days'],
+            batch_size=options['batch_size'],
+            limit=options['limit']
+        )
+        self.stdout.write(self.style.SUCCESS(f'📦 Archived {moved} vacancy(ies)'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from projects.technologies import backfill_technologies
+
+
+class Command(BaseCommand):
+    help = 'Link existing projects to the technology catalog and recompute usage counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of projects processed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        def progress(processed, created):
+            self.stdout.write(f'⏳ {processed} project(s) processed, {created} link(s) created')
+
+        processed, created = backfill_technologies(batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f'🏷️ Linked {processed} project(s) to the technology catalog ({created} new link(s))'
+        ))
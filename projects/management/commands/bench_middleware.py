@@ -0,0 +1,90 @@
+import time
+from types import ModuleType
+
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import path
+
+from project_management.middleware import get_config
+
+# Middleware of the stock Django project template, what every route ran before
+STOCK_BROWSER_MIDDLEWARE = {
+    'project_management.middleware.SessionMiddleware': 'django.contrib.sessions.middleware.SessionMiddleware',
+    'project_management.middleware.CsrfViewMiddleware': 'django.middleware.csrf.CsrfViewMiddleware',
+    'project_management.middleware.AuthenticationMiddleware': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'project_management.middleware.MessageMiddleware': 'django.contrib.messages.middleware.MessageMiddleware',
+    'project_management.middleware.XFrameOptionsMiddleware': 'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+
+
+def _empty_view(request, **kwargs):
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+def _benchmark_urlconf():
+    urlconf = ModuleType('bench_middleware_urls')
+    urlconf.urlpatterns = [path('<path:rest>', _empty_view)]
+    return urlconf
+
+
+def _load_handler(middleware):
+    with override_settings(MIDDLEWARE=middleware):
+        handler = BaseHandler()
+        handler.load_middleware()
+    return handler
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request middleware overhead of API routes, stock vs lean stack'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per round')
+        parser.add_argument('--rounds', type=int, default=5, help='Alternating rounds, the best one counts')
+        parser.add_argument('--path', default='/api/projects/', help='Request path to measure')
+
+    def _measure(self, handler, request_path, count):
+        factory = RequestFactory()
+        urlconf = _benchmark_urlconf()
+        requests = []
+        for _ in range(count):
+            request = factory.get(request_path, HTTP_ORIGIN='http://localhost:3000')
+            # Empty view: only the middleware chain is measured
+            request.urlconf = urlconf
+            requests.append(request)
+
+        started = time.perf_counter()
+        for request in requests:
+            handler.get_response(request)
+        return (time.perf_counter() - started) / count * 1_000_000
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+
+        lean_middleware = list(settings.MIDDLEWARE)
+        stock_middleware = [STOCK_BROWSER_MIDDLEWARE.get(name, name) for name in lean_middleware]
+        count, request_path = options['requests'], options['path']
+        handlers = {
+            'stock': _load_handler(stock_middleware),
+            'lean': _load_handler(lean_middleware),
+        }
+
+        results = {name: [] for name in handlers}
+        for _ in range(options['rounds']):
+            for name, handler in handlers.items():
+                results[name].append(self._measure(handler, request_path, count))
+        stock, lean = min(results['stock']), min(results['lean'])
+
+        self.stdout.write(f'⏱️  {request_path}, best of {options["rounds"]} x {count} requests, empty view')
+        self.stdout.write(f'   stock middleware: {stock:8.1f} µs/request')
+        self.stdout.write(f'   lean middleware:  {lean:8.1f} µs/request')
+        lean_prefixes = tuple(get_config()['LEAN_PREFIXES'])
+        full_stack_prefixes = tuple(get_config()['FULL_STACK_PREFIXES'])
+        if not request_path.startswith(lean_prefixes) or request_path.startswith(full_stack_prefixes):
+            self.stdout.write('   (this path runs the full stack, both should be equal)')
+            return
+        saved = stock - lean
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Saved {saved:.1f} µs/request ({saved / stock:.0%} of the request overhead)'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from project_management.schema import write_schema
+
+
+class Command(BaseCommand):
+    help = 'Render the OpenAPI schema to files served by /api/schema/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directory', default=None,
+            help='Output directory (default: OPENAPI_SCHEMA["DIRECTORY"])'
+        )
+
+    def handle(self, *args, **options):
+        for path in write_schema(directory=options['directory']):
+            self.stdout.write(self.style.SUCCESS(f'📄 Wrote {path} ({path.stat().st_size} bytes)'))
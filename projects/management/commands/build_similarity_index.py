@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import enqueue
+from projects.similarity import UPDATE_TASK, get_config, update_index
+
+
+class Command(BaseCommand):
+    help = 'Build the similar-projects index, or apply the project changes since the last build'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Rebuild from all projects instead of applying the changes'
+        )
+        parser.add_argument(
+            '--background', action='store_true',
+            help='Queue a background job instead of building now'
+        )
+
+    def handle(self, *args, **options):
+        if options['background']:
+            job = enqueue(UPDATE_TASK, full=options['full'])
+            self.stdout.write(self.style.SUCCESS(f'⚙️ Queued similarity index job {job.pk}'))
+            return
+
+        result = update_index(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'🧭 {result["mode"].capitalize()} update: {result["projects"]} project(s) indexed '
+            f'in {get_config()["DIRECTORY"]}'
+        ))
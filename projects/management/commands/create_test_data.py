@@ -1,13 +1,118 @@
-from django.core.management.base import BaseCommand
+import io
+import random
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
 from projects.models import Project, Vacancy
-from decimal import Decimal
-from datetime import date, timedelta
+from projects.technologies import link_projects, recount_technologies, sync_project_technologies
+
+
+# Technology stacks with relative weights, used to build realistic project stacks
+TECH_STACKS = [
+    (['Python', 'Django', 'PostgreSQL', 'Redis', 'Celery'], 30),
+    (['Python', 'FastAPI', 'PostgreSQL', 'Docker'], 15),
+    (['JavaScript', 'React', 'Node.js', 'MongoDB'], 20),
+    (['TypeScript', 'Angular', 'NestJS', 'PostgreSQL'], 8),
+    (['React Native', 'TypeScript', 'Firebase'], 7),
+    (['Java', 'Spring Boot', 'Kafka', 'PostgreSQL'], 10),
+    (['Go', 'gRPC', 'Kubernetes', 'PostgreSQL'], 5),
+    (['Python', 'Apache Spark', 'Kafka', 'Elasticsearch'], 5),
+]
+EXTRA_TECHNOLOGIES = [
+    'AWS', 'GCP', 'Azure', 'Terraform', 'GraphQL', 'RabbitMQ', 'Nginx',
+    'Sentry', 'Grafana', 'Vue.js', 'Tailwind CSS', 'Pandas', 'NumPy',
+]
+
+PROJECT_KINDS = [
+    'E-commerce Platform', 'CRM System', 'Mobile Banking App', 'Analytics Dashboard',
+    'Booking Service', 'Learning Platform', 'Logistics Tracker', 'HR Portal',
+    'Marketplace', 'IoT Monitoring', 'Payment Gateway', 'Social Network',
+]
+PROJECT_ADJECTIVES = ['Modern', 'Scalable', 'Internal', 'Cloud', 'Next-gen', 'Lightweight', 'Secure']
+
+ROLES = [
+    'Backend Developer', 'Frontend Developer', 'Full Stack Developer', 'DevOps Engineer',
+    'Data Engineer', 'QA Engineer', 'Mobile Developer', 'UI/UX Designer', 'Project Manager',
+]
+LEVELS = [('Junior', 0.6), ('Middle', 1.0), ('Senior', 1.5), ('Lead', 1.9)]
+
+# (employment type, weight, base yearly salary)
+EMPLOYMENT_TYPES = [
+    ('full-time', 60, 110000),
+    ('part-time', 12, 55000),
+    ('contract', 14, 120000),
+    ('freelance', 9, 90000),
+    ('internship', 5, 35000),
+]
+
+# Synthetic deadlines and timestamps are relative to this date, so a seed
+# produces the same rows whenever the command runs
+SYNTHETIC_BASE_DATE = date(2025, 1, 1)
+# Users joined up to two years before the base date; their projects and
+# vacancies are created between that and the base date
+SYNTHETIC_HISTORY = timedelta(days=2 * 365)
+
+VACANCY_COLUMNS = (
+    'title', 'description', 'requirements', 'salary_min', 'salary_max',
+    'employment_type', 'project_id', 'created_at', 'updated_at', 'is_active',
+)
+
 
 class Command(BaseCommand):
     help = 'Create test data for projects and vacancies'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=0,
+            help='Number of synthetic users to generate (0 = only the small sample dataset)'
+        )
+        parser.add_argument(
+            '--projects-per-user', type=int, default=5,
+            help='Average number of projects per synthetic user'
+        )
+        parser.add_argument(
+            '--vacancies-per-project', type=int, default=10,
+            help='Average number of vacancies per synthetic project'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=42,
+            help='Random seed, the same seed always produces the same data'
+        )
+        parser.add_argument(
+            '--base-date', type=date.fromisoformat, default=SYNTHETIC_BASE_DATE,
+            help='Date (YYYY-MM-DD) synthetic deadlines and creation times are relative to'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of rows inserted per batch'
+        )
+        parser.add_argument(
+            '--username-prefix', default='loaduser',
+            help='Prefix for synthetic usernames'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Use bulk_create for vacancies even on PostgreSQL (instead of COPY)'
+        )
+        parser.add_argument(
+            '--skip-sample', action='store_true',
+            help='Do not create the small hand-written sample dataset'
+        )
+
     def handle(self, *args, **options):
+        if not options['skip_sample']:
+            self.create_sample_data()
+
+        if options['users'] > 0:
+            self.create_synthetic_data(options)
+
+    def create_sample_data(self):
         # Create test users
         users = []
         for i in range(1, 4):
@@ -60,6 +165,7 @@ class Command(BaseCommand):
                 defaults=project_data
             )
             if created:
+                sync_project_technologies(project)
                 self.stdout.write(f'✅ Created project: {project.title}')
             projects.append(project)
 
@@ -116,4 +222,224 @@ class Command(BaseCommand):
             self.style.SUCCESS('🎉 Test data created successfully!')
         )
         self.stdout.write(f'📊 Projects created: {len(projects)}')
-        self.stdout.write(f'👥 Vacancies created: {len(vacancies_data)}')
\ No newline at end of file
+        self.stdout.write(f'👥 Vacancies created: {len(vacancies_data)}')
+
+    def create_synthetic_data(self, options):
+        """
+        Generate a large, deterministic dataset with batched inserts.
+
+        Users are processed in batches: each batch of users is inserted,
+        then their projects, then the vacancies of those projects, so memory
+        usage stays bounded regardless of the total volume.
+        """
+        rng = random.Random(options['seed'])
+        batch_size = max(options['batch_size'], 1)
+        use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+        prefix = options['username_prefix']
+        today = options['base_date']
+        now = datetime.combine(today, datetime.min.time(), tzinfo=dt_timezone.utc)
+        # Hashing is expensive, all synthetic users share one precomputed hash
+        password = make_password('testpass123')
+
+        stack_choices = [stack for stack, _ in TECH_STACKS]
+        stack_weights = [weight for _, weight in TECH_STACKS]
+        type_weights = [weight for _, weight, _ in EMPLOYMENT_TYPES]
+
+        totals = {'users': 0, 'projects': 0, 'vacancies': 0}
+        started = time.monotonic()
+        user_batch = max(batch_size // max(options['projects_per_user'], 1), 1)
+
+        for start in range(0, options['users'], user_batch):
+            stop = min(start + user_batch, options['users'])
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(
+                        username=f'{prefix}{i}',
+                        email=f'{prefix}{i}@example.com',
+                        first_name=f'Load{i}',
+                        last_name='User',
+                        password=password,
+                        date_joined=self._between(rng, now - SYNTHETIC_HISTORY, now),
+                    )
+                    for i in range(start, stop)
+                ], batch_size=batch_size)
+
+                projects = []
+                for user in users:
+                    for _ in range(self._spread(rng, options['projects_per_user'])):
+                        projects.append(
+                            self._build_project(rng, user, today, now, stack_choices, stack_weights)
+                        )
+                projects = self._bulk_create_projects(projects, batch_size)
+                link_projects(projects)
+
+                vacancy_rows = (
+                    self._build_vacancy_row(rng, project, now, type_weights)
+                    for project in projects
+                    for _ in range(self._spread(rng, options['vacancies_per_project']))
+                )
+                if use_copy:
+                    created = self._copy_vacancies(vacancy_rows, batch_size)
+                else:
+                    created = self._bulk_create_vacancies(vacancy_rows, batch_size)
+
+            totals['users'] += len(users)
+            totals['projects'] += len(projects)
+            totals['vacancies'] += created
+            self.stdout.write(
+                f'⏳ {totals["users"]}/{options["users"]} users, '
+                f'{totals["projects"]} projects, {totals["vacancies"]} vacancies '
+                f'({time.monotonic() - started:.1f}s)'
+            )
+
+        recount_technologies()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'🎉 Synthetic data created in {time.monotonic() - started:.1f}s '
+                f'(seed={options["seed"]}, {"COPY" if use_copy else "bulk_create"})'
+            )
+        )
+        self.stdout.write(f'👤 Users: {totals["users"]}')
+        self.stdout.write(f'📊 Projects: {totals["projects"]}')
+        self.stdout.write(f'👥 Vacancies: {totals["vacancies"]}')
+
+    @staticmethod
+    def _spread(rng, average):
+        """Random count around the average (0..2*average), keeping the mean"""
+        if average <= 0:
+            return 0
+        return rng.randint(0, 2 * average)
+
+    @staticmethod
+    def _between(rng, start, end):
+        """Random datetime in [start, end], to the minute"""
+        return start + timedelta(minutes=rng.randint(0, int((end - start).total_seconds() // 60)))
+
+    @classmethod
+    def _build_project(cls, rng, user, today, now, stack_choices, stack_weights):
+        technologies = list(rng.choices(stack_choices, weights=stack_weights)[0])
+        technologies += rng.sample(EXTRA_TECHNOLOGIES, rng.randint(0, 3))
+
+        budget = None
+        if rng.random() < 0.85:
+            budget = Decimal(round(rng.lognormvariate(11, 0.8), -2) or 100).quantize(Decimal('0.01'))
+            budget = min(budget, Decimal('99999999.99'))
+
+        deadline = None
+        if rng.random() < 0.8:
+            # Roughly 15% of deadlines are already in the past
+            deadline = today + timedelta(days=rng.randint(-60, 365))
+
+        kind = rng.choice(PROJECT_KINDS)
+        created_at = cls._between(rng, user.date_joined, now)
+        return Project(
+            title=f'{rng.choice(PROJECT_ADJECTIVES)} {kind}',
+            description=f'{kind} built with {", ".join(technologies[:3])}',
+            technologies=technologies,
+            budget=budget,
+            deadline=deadline,
+            owner=user,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+    @classmethod
+    def _build_vacancy_row(cls, rng, project, now, type_weights):
+        employment_type, _, base_salary = rng.choices(EMPLOYMENT_TYPES, weights=type_weights)[0]
+        level, multiplier = rng.choice(LEVELS)
+        role = rng.choice(ROLES)
+        skills = rng.sample(project.technologies, min(len(project.technologies), 3))
+
+        salary_min = salary_max = None
+        roll = rng.random()
+        if roll < 0.9:
+            low = round(base_salary * multiplier * rng.uniform(0.8, 1.2), -3)
+            salary_min = Decimal(max(low, 1000)).quantize(Decimal('0.01'))
+            salary_max = (salary_min * Decimal(str(round(rng.uniform(1.1, 1.6), 2)))).quantize(Decimal('0.01'))
+            if roll < 0.1:
+                salary_max = None
+            elif roll > 0.8:
+                salary_min = None
+
+        created_at = cls._between(rng, project.created_at, now)
+        return (
+            f'{level} {role}',
+            f'{level} {role} for {project.title}',
+            f'{", ".join(skills)}, {rng.randint(0, 8)}+ years experience',
+            salary_min,
+            salary_max,
+            employment_type,
+            project.pk,
+            created_at,
+            created_at,
+            rng.random() < 0.8,
+        )
+
+    @staticmethod
+    def _batches(rows, batch_size):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _restore_timestamps(model, objects, timestamps, batch_size):
+        """
+        bulk_create stamps auto_now(_add) fields with the current time,
+        write the generated ones back
+        """
+        for obj, (created_at, updated_at) in zip(objects, timestamps):
+            obj.created_at, obj.updated_at = created_at, updated_at
+        model.objects.bulk_update(objects, ['created_at', 'updated_at'], batch_size=batch_size)
+
+    def _bulk_create_projects(self, projects, batch_size):
+        timestamps = [(project.created_at, project.updated_at) for project in projects]
+        projects = Project.objects.bulk_create(projects, batch_size=batch_size)
+        self._restore_timestamps(Project, projects, timestamps, batch_size)
+        return projects
+
+    def _bulk_create_vacancies(self, rows, batch_size):
+        created = 0
+        for batch in self._batches(rows, batch_size):
+            values = [dict(zip(VACANCY_COLUMNS, row)) for row in batch]
+            vacancies = Vacancy.objects.bulk_create(
+                [Vacancy(**fields) for fields in values],
+                batch_size=batch_size
+            )
+            self._restore_timestamps(
+                Vacancy, vacancies,
+                [(fields['created_at'], fields['updated_at']) for fields in values],
+                batch_size
+            )
+            created += len(batch)
+        return created
+
+    def _copy_vacancies(self, rows, batch_size):
+        """Stream vacancy rows with PostgreSQL COPY (text format)"""
+        created = 0
+        table = connection.ops.quote_name(Vacancy._meta.db_table)
+        sql = f'COPY {table} ({", ".join(VACANCY_COLUMNS)}) FROM STDIN'
+        with connection.cursor() as cursor:
+            for batch in self._batches(rows, batch_size):
+                buffer = io.StringIO()
+                for row in batch:
+                    buffer.write('\t'.join(self._copy_value(value) for value in row))
+                    buffer.write('\n')
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                created += len(batch)
+        return created
+
+    @staticmethod
+    def _copy_value(value):
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
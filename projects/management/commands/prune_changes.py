@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from projects.changes import prune_changes
+
+
+class Command(BaseCommand):
+    help = 'Delete change feed events older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Retention period in days (default: CHANGE_FEED["RETENTION_DAYS"])'
+        )
+
+    def handle(self, *args, **options):
+        pruned = prune_changes(retention_days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f'🧹 Pruned {pruned} change event(s)'))
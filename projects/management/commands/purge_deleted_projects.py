@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from projects.deletion import purge_pending_projects
+
+
+class Command(BaseCommand):
+    help = 'Delete projects pending deletion and their vacancies in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Number of vacancies removed per DELETE statement'
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_pending_projects(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'🗑️ Purged {purged} project(s) pending deletion')
+        )
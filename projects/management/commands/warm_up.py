@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from project_management.warmup import warm_up, warm_up_worker
+
+
+class Command(BaseCommand):
+    help = 'Run the worker warm-up steps and report how long each one takes'
+
+    def handle(self, *args, **options):
+        report = {**warm_up(), **warm_up_worker()}
+        for name, (count, ms) in report.items():
+            self.stdout.write(f'🔥 {name}: {count} in {ms} ms')
+        total = sum(ms for count, ms in report.values())
+        self.stdout.write(self.style.SUCCESS(f'✅ Warm-up finished in {total:.1f} ms'))
@@ -0,0 +1,495 @@
+"""
+Vacancy matching: rank active vacancies for a candidate's skill list.
+
+Every active vacancy is a row of a sparse skill matrix. Its terms are the
+technologies of its project (weight 1.0) and the words of its
+requirements (REQUIREMENT_WEIGHT); technology names and aliases found in
+the requirements, including multi-word ones, count as the technology.
+The matrix is kept in NumPy arrays only, no Python object per vacancy:
+row-wise (CSR, the terms of each row) and column-wise (CSC: per term, the
+rows containing it and their weights), so scoring a candidate is one sparse
+matrix-vector product: the columns of the candidate's skills, weighted by
+their inverse document frequency, summed per row with ``bincount``. The
+score is the weighted share of the candidate's skills a vacancy asks for
+(0 to 1). Salary and employment type filters are boolean masks over the
+same rows, and the best rows are picked with ``argpartition``.
+
+Each process keeps one index. The gunicorn warm-up builds it before the
+workers are forked (see project_management/warmup.py), so they share its
+arrays copy-on-write; without the warm-up the first request builds it.
+It is refreshed incrementally:
+
+- at most every REFRESH_SECONDS, the vacancy and project events of the
+  change feed (see changes.py) since the last refresh are read and the
+  affected vacancies reloaded;
+- a changed vacancy's old row is masked out and its new version goes to a
+  small delta matrix, scored the same way;
+- once the delta and the masked rows outgrow COMPACT_RATIO of the rows,
+  the matrix is recompiled from its arrays, without a query;
+- every MAX_AGE seconds, or when the change feed cannot be followed
+  (pruned, more than MAX_CHANGES pending events), the index is rebuilt
+  from the database in a background thread, while requests keep being
+  answered from the current one.
+
+Configuration (settings.MATCHING):
+
+    MATCHING = {
+        'REFRESH_SECONDS': 10,
+        'MAX_AGE': 3600,
+        'COMPACT_RATIO': 0.1,
+        'MAX_CHANGES': 5000,
+    }
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from array import array
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+
+from .changes import get_config as get_change_feed_config, pruned_through, settled, settled_sequence
+from .models import ChangeEvent, Technology, TechnologyAlias, Vacancy
+from .technologies import clean_name, normalize_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'REFRESH_SECONDS': 10,
+    'MAX_AGE': 3600,
+    'COMPACT_RATIO': 0.1,
+    'MAX_CHANGES': 5000,
+}
+
+MATCH_LIMIT = 10
+MATCH_MAX_LIMIT = 50
+MAX_SKILLS = 50
+
+REQUIREMENT_WEIGHT = 0.5
+# Longest technology names (in words) looked up in requirement texts
+MAX_NGRAM = 3
+
+# Words with inner dots/dashes and +/# kept: node.js, c++, c#, ci-cd
+TOKEN_RE = re.compile(r'[\w+#]+(?:[.\-][\w+#]+)*')
+
+EMPLOYMENT_CODES = {value: code for code, (value, label) in enumerate(Vacancy.EMPLOYMENT_CHOICES)}
+UNKNOWN_EMPLOYMENT = -1
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'MATCHING', {}))
+    return config
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.casefold())
+
+
+def load_catalog():
+    """{normalized technology name or alias: canonical normalized name}"""
+    catalog = {key: key for key in Technology.objects.values_list('normalized', flat=True)}
+    catalog.update(TechnologyAlias.objects.values_list('normalized', 'technology__normalized'))
+    return catalog
+
+
+def row_terms(requirements, technologies, catalog):
+    """{term: weight} of a vacancy"""
+    terms = {}
+    tokens = tokenize(requirements or '')
+    for token in tokens:
+        terms[token] = REQUIREMENT_WEIGHT
+    for size in range(1, MAX_NGRAM + 1):
+        for start in range(len(tokens) - size + 1):
+            canonical = catalog.get(' '.join(tokens[start:start + size]))
+            if canonical:
+                terms[canonical] = REQUIREMENT_WEIGHT
+    for name in technologies or []:
+        if isinstance(name, str):
+            key = normalize_name(name)
+            if key:
+                terms[catalog.get(key, key)] = 1.0
+    return terms
+
+
+def candidate_terms(skills, catalog):
+    """{term: skill as given} of a candidate's skill list"""
+    terms = {}
+    for skill in skills:
+        key = normalize_name(skill)
+        if key in catalog:
+            terms.setdefault(catalog[key], clean_name(skill))
+        else:
+            # Unknown phrases match word by word
+            for token in tokenize(key):
+                terms.setdefault(catalog.get(token, token), clean_name(skill))
+    return terms
+
+
+def load_rows(queryset, catalog):
+    """(vacancy id, project id, salary min, salary max, employment code, {term: weight}) of the matchable vacancies"""
+    rows = queryset.filter(is_active=True, project__deletion_pending=False).order_by('id').values_list(
+        'id', 'project_id', 'salary_min', 'salary_max', 'employment_type', 'requirements', 'project__technologies'
+    )
+    for vacancy_id, project_id, salary_min, salary_max, employment_type, requirements, technologies in rows.iterator(
+        chunk_size=2000
+    ):
+        yield (
+            vacancy_id,
+            project_id,
+            math.nan if salary_min is None else float(salary_min),
+            math.nan if salary_max is None else float(salary_max),
+            EMPLOYMENT_CODES.get(employment_type, UNKNOWN_EMPLOYMENT),
+            row_terms(requirements, technologies, catalog)
+        )
+
+
+# Row arrays of a SkillMatrix (lengths: terms per row; cols, weights: the terms, row after row)
+MATRIX_ARRAYS = {
+    'vacancy_ids': np.int64,
+    'project_ids': np.int64,
+    'salary_min': np.float64,
+    'salary_max': np.float64,
+    'employment': np.int8,
+    'lengths': np.int64,
+    'cols': np.int64,
+    'weights': np.float32,
+}
+
+
+def _numpy(values, dtype):
+    """Copy of a flat ``array.array`` as a NumPy array"""
+    return np.frombuffer(values, dtype=dtype).copy() if len(values) else np.empty(0, dtype=dtype)
+
+
+class RowBuilder:
+    """
+    Collects vacancy rows into flat typed arrays, with their terms mapped to
+    the columns shared by the matrices of an index
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.values = {
+            'vacancy_ids': array('q'),
+            'project_ids': array('q'),
+            'salary_min': array('d'),
+            'salary_max': array('d'),
+            'employment': array('b'),
+            'lengths': array('q'),
+            'cols': array('q'),
+            'weights': array('f'),
+        }
+        self.parts = []
+
+    def add(self, vacancy_id, project_id, salary_min, salary_max, employment, terms):
+        values = self.values
+        values['vacancy_ids'].append(vacancy_id)
+        values['project_ids'].append(project_id)
+        values['salary_min'].append(salary_min)
+        values['salary_max'].append(salary_max)
+        values['employment'].append(employment)
+        values['lengths'].append(len(terms))
+        for term, weight in terms.items():
+            values['cols'].append(self.columns.setdefault(term, len(self.columns)))
+            values['weights'].append(weight)
+
+    def extend(self, matrix, positions):
+        """Take over compiled rows of another matrix"""
+        self.parts.append(matrix.select(positions))
+
+    def compile(self):
+        own = {name: _numpy(values, MATRIX_ARRAYS[name]) for name, values in self.values.items()}
+        arrays = {name: np.concatenate([part[name] for part in self.parts] + [own[name]]) for name in MATRIX_ARRAYS}
+        return SkillMatrix(arrays, len(self.columns))
+
+
+class SkillMatrix:
+    """
+    Rows compiled to NumPy arrays, sorted by vacancy id: the row attributes,
+    the terms of every row (CSR, for matched skills and compaction) and the
+    same weights per term (CSC, for scoring). Nothing is kept per row as a
+    Python object.
+
+    Only the ``alive`` mask changes after compiling: rows of changed or
+    removed vacancies are masked out.
+    """
+
+    def __init__(self, arrays, n_columns):
+        order = np.argsort(arrays['vacancy_ids'], kind='stable')
+        if np.any(order != np.arange(len(order))):
+            arrays = _select(arrays, _row_ptr(arrays['lengths']), order)
+        for name, values in arrays.items():
+            setattr(self, name, values)
+        self.size = len(self.vacancy_ids)
+        self.row_ptr = _row_ptr(self.lengths)
+        self.alive = np.ones(self.size, dtype=bool)
+        self.dead = 0
+
+        entry_rows = np.repeat(np.arange(self.size, dtype=np.int32), self.lengths)
+        by_column = np.argsort(self.cols, kind='stable')
+        self.row_index = entry_rows[by_column]
+        self.col_weights = self.weights[by_column]
+        self.col_ptr = np.searchsorted(self.cols[by_column], np.arange(n_columns + 1))
+
+    def position(self, vacancy_id):
+        position = int(np.searchsorted(self.vacancy_ids, vacancy_id))
+        if position < self.size and self.vacancy_ids[position] == vacancy_id:
+            return position
+        return None
+
+    def row_cols(self, position):
+        return self.cols[self.row_ptr[position]:self.row_ptr[position + 1]]
+
+    def kill(self, vacancy_id):
+        """Mask out a vacancy's row, returns its term columns (None when not alive here)"""
+        position = self.position(vacancy_id)
+        if position is None or not self.alive[position]:
+            return None
+        self.alive[position] = False
+        self.dead += 1
+        return self.row_cols(position)
+
+    def select(self, positions):
+        return _select({name: getattr(self, name) for name in MATRIX_ARRAYS}, self.row_ptr, positions)
+
+    def scores(self, col_weights):
+        """Sparse matrix-vector product with {column: weight}, None without any overlap"""
+        positions, weights = [], []
+        for col, weight in col_weights.items():
+            if col >= len(self.col_ptr) - 1:
+                # Term added after this matrix was compiled
+                continue
+            start, end = self.col_ptr[col], self.col_ptr[col + 1]
+            positions.append(self.row_index[start:end])
+            weights.append(self.col_weights[start:end] * weight)
+        if not positions:
+            return None
+        return np.bincount(np.concatenate(positions), weights=np.concatenate(weights), minlength=self.size)
+
+    def mask(self, employment_codes=None, salary_min=None, salary_max=None):
+        """Rows passing the filters, same salary overlap rules as the public feed"""
+        mask = self.alive.copy()
+        if employment_codes:
+            mask &= np.isin(self.employment, employment_codes)
+        if salary_min is not None or salary_max is not None:
+            mask &= ~(np.isnan(self.salary_min) & np.isnan(self.salary_max))
+        # Comparisons with NaN (no salary bound) are False, so those rows stay
+        if salary_min is not None:
+            mask &= ~(self.salary_max < salary_min)
+        if salary_max is not None:
+            mask &= ~(self.salary_min > salary_max)
+        return mask
+
+    def top(self, col_weights, limit, **filters):
+        """[(score, vacancy id, position)] of the best ``limit`` rows"""
+        scores = self.scores(col_weights)
+        if scores is None:
+            return []
+        candidates = np.flatnonzero(self.mask(**filters) & (scores > 0))
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        return [(float(scores[position]), int(self.vacancy_ids[position]), position) for position in candidates]
+
+
+def _row_ptr(lengths):
+    return np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+
+
+def _select(arrays, row_ptr, positions):
+    """Row arrays of the rows at ``positions``, their terms gathered without a Python loop"""
+    positions = np.asarray(positions, dtype=np.int64)
+    lengths = arrays['lengths'][positions]
+    starts = np.repeat(row_ptr[positions] - (np.cumsum(lengths) - lengths), lengths)
+    entries = starts + np.arange(int(lengths.sum()), dtype=np.int64)
+    return {
+        name: values[entries] if name in ('cols', 'weights') else values[positions]
+        for name, values in arrays.items()
+    }
+
+
+class MatchIndex:
+    """Rows of all matchable vacancies: a compiled base matrix plus a delta"""
+
+    def __init__(self, builder, catalog, cursor):
+        self.catalog = catalog
+        self.cursor = cursor
+        self.columns = builder.columns
+        self.base = builder.compile()
+        self.delta = RowBuilder(self.columns).compile()
+        # Rows containing each term, indexed by column
+        self.document_frequency = np.bincount(self.base.cols, minlength=len(self.columns))
+        self.built_at = self.refreshed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.base.size - self.base.dead + self.delta.size - self.delta.dead
+
+    def project_vacancies(self, project_ids):
+        """Ids of the indexed vacancies of the projects"""
+        project_ids = list(project_ids)
+        return [
+            int(vacancy_id)
+            for matrix in (self.base, self.delta)
+            for vacancy_id in matrix.vacancy_ids[matrix.alive & np.isin(matrix.project_ids, project_ids)]
+        ]
+
+    def apply(self, changes, compact_ratio):
+        """Apply {vacancy id: row values of load_rows, or None when it is no longer matchable}"""
+        with self._lock:
+            frequency = self.document_frequency
+            for vacancy_id in changes:
+                for matrix in (self.base, self.delta):
+                    cols = matrix.kill(vacancy_id)
+                    if cols is not None:
+                        np.subtract.at(frequency, cols, 1)
+
+            builder = RowBuilder(self.columns)
+            builder.extend(self.delta, np.flatnonzero(self.delta.alive))
+            added = [vacancy_id for vacancy_id, values in changes.items() if values is not None]
+            for vacancy_id in added:
+                builder.add(vacancy_id, *changes[vacancy_id])
+            delta = builder.compile()
+            if len(frequency) < len(self.columns):
+                frequency = np.concatenate([frequency, np.zeros(len(self.columns) - len(frequency), dtype=frequency.dtype)])
+            np.add.at(frequency, delta.cols[np.repeat(np.isin(delta.vacancy_ids, added), delta.lengths)], 1)
+            self.document_frequency = frequency
+            self.delta = delta
+
+            if delta.size + self.base.dead > compact_ratio * max(len(self), 1):
+                # Recompiled from the arrays, without a query
+                builder = RowBuilder(self.columns)
+                builder.extend(self.base, np.flatnonzero(self.base.alive))
+                builder.extend(delta, np.arange(delta.size))
+                self.base, self.delta = builder.compile(), RowBuilder(self.columns).compile()
+
+    def match(self, skills, employment_types=None, salary_min=None, salary_max=None, limit=MATCH_LIMIT):
+        """[(vacancy id, score, matched skills)], best first"""
+        terms = candidate_terms(skills, self.catalog)
+        if not terms:
+            return []
+        base, delta, frequency = self.base, self.delta, self.document_frequency
+        total = len(self)
+        cols = {term: self.columns.get(term) for term in terms}
+        idf = {
+            term: math.log(1 + total / max(int(frequency[col]) if col is not None and col < len(frequency) else 0, 1))
+            for term, col in cols.items()
+        }
+        norm = sum(idf.values())
+        col_weights = {cols[term]: weight for term, weight in idf.items() if cols[term] is not None}
+        filters = {
+            'employment_codes': [EMPLOYMENT_CODES.get(value, UNKNOWN_EMPLOYMENT) for value in employment_types or []],
+            'salary_min': salary_min,
+            'salary_max': salary_max,
+        }
+
+        best = {}
+        for matrix in (base, delta):
+            for score, vacancy_id, position in matrix.top(col_weights, limit, **filters):
+                best[vacancy_id] = (score, matrix, position)
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], -item[0]))[:limit]
+        results = []
+        for vacancy_id, (score, matrix, position) in ranked:
+            row_cols = set(matrix.row_cols(position).tolist())
+            skills = [skill for term, skill in terms.items() if cols[term] in row_cols]
+            results.append((vacancy_id, round(score / norm, 4), skills))
+        return results
+
+
+def build_index():
+    """Load every matchable vacancy from the database"""
+    cursor = settled_sequence()
+    catalog = load_catalog()
+    builder = RowBuilder({})
+    for values in load_rows(Vacancy.objects.all(), catalog):
+        builder.add(*values)
+    return MatchIndex(builder, catalog, cursor)
+
+
+def refresh_index(index, config):
+    """
+    Apply the change feed events since the index' cursor.
+
+    Returns False when the events cannot be followed and the index has to
+    be rebuilt instead.
+    """
+    if not get_change_feed_config()['ENABLED'] or pruned_through() > index.cursor:
+        return False
+    events = list(
+        settled(ChangeEvent.objects.filter(id__gt=index.cursor))
+        .order_by('id').values_list('id', 'object_type', 'object_id')[:config['MAX_CHANGES'] + 1]
+    )
+    if len(events) > config['MAX_CHANGES']:
+        return False
+    if events:
+        vacancy_ids = {object_id for seq, object_type, object_id in events if object_type == ChangeEvent.TYPE_VACANCY}
+        project_ids = {object_id for seq, object_type, object_id in events if object_type == ChangeEvent.TYPE_PROJECT}
+        # Every affected vacancy is reloaded, the ones not found are gone
+        changes = dict.fromkeys(vacancy_ids)
+        if project_ids:
+            changes.update(dict.fromkeys(index.project_vacancies(project_ids)))
+        changes.update(
+            (values[0], values[1:]) for values in load_rows(
+                Vacancy.objects.filter(Q(pk__in=vacancy_ids) | Q(project_id__in=project_ids)), index.catalog
+            )
+        )
+        index.apply(changes, config['COMPACT_RATIO'])
+        index.cursor = events[-1][0]
+    index.refreshed_at = time.monotonic()
+    return True
+
+
+_index = None
+_index_lock = threading.Lock()
+_rebuilding = False
+
+
+def _rebuild():
+    """Replace the process index with a fresh one, off the request path"""
+    global _index, _rebuilding
+    try:
+        _index = build_index()
+    except Exception:
+        logger.exception('Could not rebuild the matching index')
+    finally:
+        _rebuilding = False
+        # This thread's connections only
+        connections.close_all()
+
+
+def get_index():
+    """
+    The process index, built on first use (or by the warm-up) and
+    refreshed when due; rebuilds run in a background thread while the
+    current index keeps answering
+    """
+    global _index, _rebuilding
+    index = _index
+    config = get_config()
+    now = time.monotonic()
+    if index is not None and now - index.refreshed_at < config['REFRESH_SECONDS']:
+        return index
+    # One thread refreshes, the others keep answering from the current state
+    if not _index_lock.acquire(blocking=index is None):
+        return index
+    try:
+        if _index is None:
+            _index = build_index()
+        elif _index is index and not _rebuilding:
+            if now - index.built_at >= config['MAX_AGE'] or not refresh_index(index, config):
+                _rebuilding = True
+                index.refreshed_at = now
+                threading.Thread(target=_rebuild, name='matching-rebuild', daemon=True).start()
+        return _index
+    finally:
+        _index_lock.release()
+
+
+def match_vacancies(skills, employment_types=None, salary_min=None, salary_max=None, limit=MATCH_LIMIT):
+    """[(vacancy id, score, matched skills)] of the best matching active vacancies"""
+    limit = max(1, min(limit, MATCH_MAX_LIMIT))
+    return get_index().match(skills[:MAX_SKILLS], employment_types, salary_min, salary_max, limit)
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_project_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='deletion_pending',
+            field=models.BooleanField(default=False, help_text='Set while the project and its vacancies are deleted in the background', verbose_name='Deletion Pending'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('deletion_pending', True)), fields=['id'], name='project_pending_deletion_idx'),
+        ),
+    ]
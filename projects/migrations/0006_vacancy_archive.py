@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_project_deletion_pending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedVacancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(help_text='Primary key the vacancy had in the active table', unique=True, verbose_name='Original ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Vacancy Title')),
+                ('description', models.TextField(verbose_name='Job Description')),
+                ('requirements', models.TextField(verbose_name='Requirements')),
+                ('salary_min', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Minimum Salary')),
+                ('salary_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Maximum Salary')),
+                ('employment_type', models.CharField(choices=[('full-time', 'Full Time'), ('part-time', 'Part Time'), ('contract', 'Contract'), ('freelance', 'Freelance'), ('internship', 'Internship')], max_length=50, verbose_name='Employment Type')),
+                ('created_at', models.DateTimeField(verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(verbose_name='Updated At')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archived At')),
+            ],
+            options={
+                'verbose_name': 'Archived Vacancy',
+                'verbose_name_plural': 'Archived Vacancies',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['updated_at'], name='vacancy_inactive_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedvacancy',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_vacancies', to='projects.project', verbose_name='Project'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedvacancy',
+            index=models.Index(fields=['project', '-created_at'], name='archived_vacancy_project_idx'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:51
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_change_events'),
+    ]
+
+    operations = [
+        # gin_trgm_ops for technology_normalized_trgm (existing links are
+        # created with manage.py backfill_technologies)
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='ProjectTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'verbose_name': 'Project Technology',
+                'verbose_name_plural': 'Project Technologies',
+            },
+        ),
+        migrations.CreateModel(
+            name='Technology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Display name', max_length=100, verbose_name='Name')),
+                ('normalized', models.CharField(max_length=100, unique=True, verbose_name='Normalized Name')),
+                ('project_count', models.PositiveIntegerField(default=0, help_text='Number of projects using the technology (autocomplete ranking)', verbose_name='Projects')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Technology',
+                'verbose_name_plural': 'Technologies',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TechnologyAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('normalized', models.CharField(max_length=100, unique=True, verbose_name='Normalized Alias')),
+                ('technology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='projects.technology', verbose_name='Technology')),
+            ],
+            options={
+                'verbose_name': 'Technology Alias',
+                'verbose_name_plural': 'Technology Aliases',
+                'ordering': ['normalized'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='technology',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['normalized'], name='technology_normalized_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddField(
+            model_name='projecttechnology',
+            name='project',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='technology_links', to='projects.project', verbose_name='Project'),
+        ),
+        migrations.AddField(
+            model_name='projecttechnology',
+            name='technology',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='project_links', to='projects.technology', verbose_name='Technology'),
+        ),
+        migrations.AddIndex(
+            model_name='projecttechnology',
+            index=models.Index(fields=['technology', 'project'], name='project_technology_tech_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='projecttechnology',
+            constraint=models.UniqueConstraint(fields=('project', 'technology'), name='project_technology_unique'),
+        ),
+    ]
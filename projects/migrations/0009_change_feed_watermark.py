@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_technology_catalog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeFeedWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pruned_through', models.BigIntegerField(default=0, verbose_name='Pruned Through')),
+            ],
+            options={
+                'verbose_name': 'Change Feed Watermark',
+                'verbose_name_plural': 'Change Feed Watermarks',
+            },
+        ),
+    ]
@@ -1,8 +1,84 @@
 from django.db import models
+from django.db.models import (
+    BooleanField, Case, Count, DurationField, ExpressionWrapper, F, IntegerField, OuterRef, Q,
+    Subquery, Value, When
+)
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.utils import timezone
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
+from project_management.querycache import GenerationQuerySet
+
+
+def vacancy_search_vector():
+    """
+    Full-text search document of a vacancy.
+
+    The same expression backs the GIN index in Vacancy.Meta, queries must use
+    it unchanged for PostgreSQL to pick the index.
+    """
+    return SearchVector('title', 'requirements', config='english')
+
+
+def project_search_vector():
+    """Full-text search document of a project (backs the GIN index in Project.Meta)"""
+    return SearchVector('title', 'description', config='english')
+
+
+class ProjectQuerySet(GenerationQuerySet):
+    """QuerySet with database-side deadline calculations"""
+
+    def with_deadline_info(self):
+        """
+        Annotate ``overdue`` and ``time_until_deadline`` (a timedelta).
+
+        Both are computed by the database against today's date, so they can
+        be filtered and ordered on without loading every project.
+        """
+        today = timezone.now().date()
+        return self.annotate(
+            overdue=Case(
+                When(deadline__lt=today, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField()
+            ),
+            time_until_deadline=ExpressionWrapper(
+                F('deadline') - Value(today),
+                output_field=DurationField()
+            )
+        )
+
+    def with_vacancies_count(self):
+        """
+        Annotate ``vacancies_count`` with a correlated subquery, so the
+        serializers never load the vacancies just to count them
+        """
+        counts = (
+            Vacancy.objects.filter(project_id=OuterRef('pk'))
+            .order_by().values('project_id').annotate(total=Count('*')).values('total')
+        )
+        return self.annotate(
+            vacancies_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+        )
+
+    def overdue(self, value=True):
+        """Projects whose deadline has passed (or not, with value=False)"""
+        today = timezone.now().date()
+        if value:
+            return self.filter(deadline__lt=today)
+        return self.filter(Q(deadline__isnull=True) | Q(deadline__gte=today))
+
+
+class ProjectManager(models.Manager.from_queryset(ProjectQuerySet)):
+    """Default manager: projects pending deletion are hidden everywhere"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deletion_pending=False)
+
 
 class Project(models.Model):
     """
@@ -61,10 +137,33 @@ class Project(models.Model):
         help_text="JSON field for storing additional information"
     )
 
+    deletion_pending = models.BooleanField(
+        default=False,
+        verbose_name="Deletion Pending",
+        help_text="Set while the project and its vacancies are deleted in the background"
+    )
+
+    objects = ProjectManager()
+    # Includes projects pending deletion, used by the deletion code
+    all_objects = ProjectQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Project"
         verbose_name_plural = "Projects"
         ordering = ['-created_at']  # Latest projects first
+        indexes = [
+            # Deadline filtering and ordering within an owner's projects
+            models.Index(fields=['owner', 'deadline'], name='project_owner_deadline_idx'),
+            # Technology containment lookups (technologies__contains=[...])
+            GinIndex(fields=['technologies'], opclasses=['jsonb_path_ops'], name='project_technologies_gin'),
+            GinIndex(project_search_vector(), name='project_search_idx'),
+            # Background purge of projects pending deletion
+            models.Index(
+                fields=['id'],
+                condition=models.Q(deletion_pending=True),
+                name='project_pending_deletion_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.owner.username})"
@@ -148,10 +247,37 @@ class Vacancy(models.Model):
         help_text="Whether the vacancy is visible in search"
     )
 
+    objects = GenerationQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Vacancy"
         verbose_name_plural = "Vacancies"
         ordering = ['-created_at']
+        indexes = [
+            # Public vacancy feed: keyset pagination over active vacancies
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='vacancy_active_feed_idx'
+            ),
+            models.Index(
+                fields=['employment_type', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='vacancy_active_type_idx'
+            ),
+            models.Index(
+                fields=['salary_min', 'salary_max'],
+                condition=models.Q(is_active=True),
+                name='vacancy_active_salary_idx'
+            ),
+            GinIndex(vacancy_search_vector(), name='vacancy_search_idx'),
+            # Archival candidates (see projects/archive.py)
+            models.Index(
+                fields=['updated_at'],
+                condition=models.Q(is_active=False),
+                name='vacancy_inactive_updated_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.project.title}"
@@ -165,4 +291,230 @@ class Vacancy(models.Model):
             return f"from {self.salary_min}"
         elif self.salary_max:
             return f"up to {self.salary_max}"
-        return "Negotiable"
\ No newline at end of file
+        return "Negotiable"
+
+
+class ArchivedVacancy(models.Model):
+    """
+    Cold storage of vacancies that have been inactive for a long time.
+
+    Rows are moved here in batches by projects/archive.py so the Vacancy
+    table (and its indexes) only holds the working set.
+    """
+    original_id = models.BigIntegerField(
+        unique=True,
+        verbose_name="Original ID",
+        help_text="Primary key the vacancy had in the active table"
+    )
+    title = models.CharField(max_length=200, verbose_name="Vacancy Title")
+    description = models.TextField(verbose_name="Job Description")
+    requirements = models.TextField(verbose_name="Requirements")
+    salary_min = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name="Minimum Salary"
+    )
+    salary_max = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name="Maximum Salary"
+    )
+    employment_type = models.CharField(
+        max_length=50,
+        choices=Vacancy.EMPLOYMENT_CHOICES,
+        verbose_name="Employment Type"
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='archived_vacancies',
+        verbose_name="Project"
+    )
+    created_at = models.DateTimeField(verbose_name="Created At")
+    updated_at = models.DateTimeField(verbose_name="Updated At")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Archived At")
+
+    objects = GenerationQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Archived Vacancy"
+        verbose_name_plural = "Archived Vacancies"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', '-created_at'], name='archived_vacancy_project_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+    # Archived vacancies are never visible in search
+    is_active = False
+
+    salary_range = Vacancy.salary_range
+
+
+class ChangeEvent(models.Model):
+    """
+    Append-only log of project/vacancy changes per owner.
+
+    The auto-incrementing id is the monotonic sequence clients sync from
+    (see projects/changes.py); deletions are kept as tombstone events.
+    """
+    TYPE_PROJECT = 'project'
+    TYPE_VACANCY = 'vacancy'
+    TYPE_CHOICES = [
+        (TYPE_PROJECT, 'Project'),
+        (TYPE_VACANCY, 'Vacancy'),
+    ]
+
+    ACTION_UPSERT = 'upsert'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = [
+        (ACTION_UPSERT, 'Created or updated'),
+        (ACTION_DELETE, 'Deleted'),
+    ]
+
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,  # covered by change_owner_seq_idx
+        verbose_name="Owner"
+    )
+    object_type = models.CharField(max_length=20, choices=TYPE_CHOICES, verbose_name="Object Type")
+    object_id = models.BigIntegerField(verbose_name="Object ID")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, verbose_name="Action")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+
+    class Meta:
+        verbose_name = "Change Event"
+        verbose_name_plural = "Change Events"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['owner', 'id'], name='change_owner_seq_idx'),
+            models.Index(fields=['created_at'], name='change_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} {self.object_type} {self.object_id}"
+
+
+class ChangeFeedWatermark(models.Model):
+    """
+    Single row with the highest change event id removed by pruning.
+
+    Clients (and the indexes following the feed) holding an older sequence
+    have missed events and must start over.
+    """
+    pruned_through = models.BigIntegerField(default=0, verbose_name="Pruned Through")
+
+    class Meta:
+        verbose_name = "Change Feed Watermark"
+        verbose_name_plural = "Change Feed Watermarks"
+
+    def __str__(self):
+        return f"Pruned through #{self.pruned_through}"
+
+
+class Technology(models.Model):
+    """
+    Catalog entry of a technology, shared by all projects.
+
+    ``normalized`` is the canonical key (case folded, whitespace collapsed,
+    see projects/technologies.py) so "Django", "django " and "DJango" are
+    one technology; other spellings are mapped with TechnologyAlias.
+    """
+    name = models.CharField(
+        max_length=100,
+        verbose_name="Name",
+        help_text="Display name"
+    )
+    normalized = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Normalized Name"
+    )
+    project_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Projects",
+        help_text="Number of projects using the technology (autocomplete ranking)"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Created At"
+    )
+
+    class Meta:
+        verbose_name = "Technology"
+        verbose_name_plural = "Technologies"
+        ordering = ['name']
+        indexes = [
+            # Infix and fuzzy autocomplete (LIKE '%...%'); prefix lookups use
+            # the varchar_pattern_ops index PostgreSQL gets for the unique column
+            GinIndex(fields=['normalized'], opclasses=['gin_trgm_ops'], name='technology_normalized_trgm'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class TechnologyAlias(models.Model):
+    """Alternative spelling of a technology, e.g. "js" for JavaScript"""
+    technology = models.ForeignKey(
+        Technology,
+        on_delete=models.CASCADE,
+        related_name='aliases',
+        verbose_name="Technology"
+    )
+    normalized = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Normalized Alias"
+    )
+
+    class Meta:
+        verbose_name = "Technology Alias"
+        verbose_name_plural = "Technology Aliases"
+        ordering = ['normalized']
+
+    def __str__(self):
+        return f"{self.normalized} -> {self.technology.name}"
+
+
+class ProjectTechnology(models.Model):
+    """
+    Link between a project and a catalog technology, kept in sync with
+    Project.technologies (see projects/technologies.py)
+    """
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='technology_links',
+        db_index=False,  # covered by project_technology_unique
+        verbose_name="Project"
+    )
+    technology = models.ForeignKey(
+        Technology,
+        on_delete=models.CASCADE,
+        related_name='project_links',
+        db_index=False,  # covered by project_technology_tech_idx
+        verbose_name="Technology"
+    )
+
+    class Meta:
+        verbose_name = "Project Technology"
+        verbose_name_plural = "Project Technologies"
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'technology'], name='project_technology_unique'),
+        ]
+        indexes = [
+            # Projects (and their vacancies) using a technology
+            models.Index(fields=['technology', 'project'], name='project_technology_tech_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} uses {self.technology_id}"
@@ -0,0 +1,215 @@
+"""
+Pagination classes for project and vacancy lists.
+
+Configuration (settings.COUNT_PAGINATION):
+
+    COUNT_PAGINATION = {
+        'ESTIMATE_THRESHOLD': 10000,  # above this many rows the count is estimated
+        'TIMEOUT': 300,               # seconds a count stays cached
+    }
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from .cache import get_cache, get_owner_version
+
+DEFAULTS = {
+    'ESTIMATE_THRESHOLD': 10000,
+    'TIMEOUT': 300,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'COUNT_PAGINATION', {}))
+    return config
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate for a queryset, or None if unavailable.
+
+    Unfiltered tables use pg_class.reltuples, anything else the row
+    estimate of the top plan node from EXPLAIN.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 for tables that were never analyzed
+            if row and row[0] >= 0:
+                return row[0]
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+def resolve_count(queryset, threshold):
+    """
+    Return ``(count, is_exact)`` for a queryset.
+
+    A bounded ``COUNT(*)`` over at most ``threshold + 1`` rows tells whether
+    the result is small; only larger results fall back to planner estimates.
+    """
+    # Lists standing in for a queryset (see archive.BothTiers) are counted exactly
+    if not threshold or not isinstance(queryset, QuerySet):
+        return queryset.count(), True
+
+    bounded = queryset.order_by()[:threshold + 1].count()
+    if bounded <= threshold:
+        return bounded, True
+
+    estimate = estimate_count(queryset)
+    if estimate is None:
+        return queryset.count(), True
+    # The estimate can never be lower than what we have already seen
+    return max(estimate, bounded), False
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator whose count comes from a resolver and may be an estimate.
+
+    With an estimated count every page number is accepted and slicing does
+    not depend on the count, so a low estimate never hides real rows.
+    """
+
+    def __init__(self, object_list, per_page, count_resolver=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_resolver = count_resolver
+        self.count_is_exact = True
+
+    @cached_property
+    def count(self):
+        if self.count_resolver is None:
+            return super().count
+        count, self.count_is_exact = self.count_resolver(self.object_list)
+        return count
+
+    def validate_number(self, number):
+        # Resolving the count first tells whether it is exact
+        if self.count is not None and self.count_is_exact:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+        objects = list(self.object_list[bottom:bottom + self.per_page])
+        if not objects and number > 1:
+            raise EmptyPage('That page contains no results')
+        return self._get_page(objects, number, self)
+
+
+class CachedCountPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination with cached and, for large results, estimated counts.
+
+    Counts are cached per user and filter set under the owner's data version
+    (see projects/cache.py), so any write by the owner invalidates them. The
+    response reports whether ``count`` is exact.
+    """
+    ignored_query_params = ('page', 'page_size', 'format')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self._count_cache_key = self._build_count_key(request)
+        return super().paginate_queryset(queryset, request, view)
+
+    @property
+    def django_paginator_class(self):
+        return partial(EstimatedCountPaginator, count_resolver=self._cached_count)
+
+    def _build_count_key(self, request):
+        if not request.user.is_authenticated:
+            return None
+        params = sorted(
+            (key, value)
+            for key in request.query_params
+            if key not in self.ignored_query_params
+            for value in request.query_params.getlist(key)
+        )
+        digest = hashlib.md5(f'{request.path}|{params}'.encode('utf-8')).hexdigest()
+        owner_id = request.user.pk
+        return f'count:{owner_id}:{get_owner_version(owner_id)}:{digest}'
+
+    def _cached_count(self, queryset):
+        config = get_config()
+        cache = get_cache()
+        key = self._count_cache_key
+        if key is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = resolve_count(queryset, config['ESTIMATE_THRESHOLD'])
+        if key is not None:
+            cache.set(key, result, timeout=config['TIMEOUT'])
+        return result
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count),
+            ('count_is_exact', self.page.paginator.count_is_exact),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_exact'] = {
+            'type': 'boolean',
+            'example': True,
+        }
+        return response_schema
+
+
+class VacancyCursorPagination(CursorPagination):
+    """
+    Keyset pagination over vacancies, newest first.
+
+    DRF's cursor encodes the ``created_at`` of the last row shown, pages
+    are fetched with ``WHERE created_at < position`` on the
+    (created_at, id) index. An OFFSET only skips the rows sharing that
+    exact timestamp, so deep pages cost about the same as the first one
+    and no COUNT(*) is ever issued. ``id`` just makes the order stable.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PublicVacancyCursorPagination(VacancyCursorPagination):
+    """Keyset pagination for the public vacancy feed"""
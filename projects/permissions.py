@@ -0,0 +1,88 @@
+"""
+Row-level permissions evaluated by the database.
+
+Instead of loading an object and comparing ``obj.owner == request.user``
+(a User fetch, or a project + user fetch for vacancies), access rules are
+expressed as Q filters:
+
+- ``filter_queryset()`` restricts a viewset queryset to the rows the user
+  may read and annotates ``user_can_write`` from the write rules;
+- ``has_object_permission()`` only reads that annotation, so object checks
+  never issue a query.
+
+Ownership is compared on the ``owner_id`` column (``project__owner_id`` for
+vacancies, whose queryset already joins the project). Shared access, e.g.
+for collaborators, is added by returning more Q objects from
+``shared_read_rules``/``shared_write_rules`` in a subclass:
+
+    class TeamProjectAccess(ProjectAccess):
+        def shared_read_rules(self, user):
+            return [Q(metadata__collaborators__contains=[user.pk])]
+
+Cached responses are keyed by the requesting user but invalidated through
+the owner's data version (projects/cache.py): shared rules should come with
+a matching invalidation.
+"""
+
+from functools import reduce
+from operator import or_
+
+from django.db.models import BooleanField, Case, Q, Value, When
+from rest_framework import permissions
+
+WRITE_ANNOTATION = 'user_can_write'
+
+
+class QuerysetAccessPermission(permissions.BasePermission):
+    """Base class: permission whose rules are queryset filters"""
+    # Lookup from the model to the owning user's id
+    owner_lookup = 'owner_id'
+    message = 'You do not have permission to modify this object.'
+
+    def owner_rule(self, user):
+        return Q(**{self.owner_lookup: user.pk})
+
+    def shared_read_rules(self, user):
+        return []
+
+    def shared_write_rules(self, user):
+        return []
+
+    def read_filter(self, user):
+        return reduce(or_, [self.owner_rule(user), *self.shared_read_rules(user)])
+
+    def write_filter(self, user):
+        return reduce(or_, [self.owner_rule(user), *self.shared_write_rules(user)])
+
+    def filter_queryset(self, user, queryset):
+        """Rows readable by ``user``, annotated with their write access"""
+        if not user.is_authenticated:
+            return queryset.none()
+        queryset = queryset.filter(self.read_filter(user))
+        if self.shared_write_rules(user) or self.shared_read_rules(user):
+            write_access = Case(
+                When(self.write_filter(user), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField()
+            )
+        else:
+            # Every readable row is owned: no CASE expression needed
+            write_access = Value(True, output_field=BooleanField())
+        return queryset.annotate(**{WRITE_ANNOTATION: write_access})
+
+    def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS:
+            # Only readable rows can be looked up in the filtered queryset
+            return True
+        return getattr(obj, WRITE_ANNOTATION, False)
+
+
+class ProjectAccess(QuerysetAccessPermission):
+    """Projects: the owner reads and writes"""
+    owner_lookup = 'owner_id'
+
+
+class VacancyAccess(QuerysetAccessPermission):
+    """Vacancies (active and archived): access follows the project's owner"""
+    owner_lookup = 'project__owner_id'
+    message = 'You can only modify vacancies of your own projects.'
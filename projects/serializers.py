@@ -1,16 +1,32 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Project, Vacancy
+from django.db import transaction
+from .models import ArchivedVacancy, Project, Technology, Vacancy
+from .permissions import WRITE_ANNOTATION, ProjectAccess
+from .technologies import NAME_MAX_LENGTH, canonical_names, sync_project_technologies
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class IncludedVacanciesMixin:
+    """
+    Adds a ``vacancies`` list when the view prefetched them into
+    ``included_vacancies`` (?include=vacancies)
+    """
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if hasattr(instance, 'included_vacancies'):
+            data['vacancies'] = VacancySerializer(instance.included_vacancies, many=True).data
+        return data
+
+
+class ProjectSerializer(IncludedVacanciesMixin, serializers.ModelSerializer):
     """
     Serializer for Project model with full CRUD support
     """
     owner = serializers.StringRelatedField(read_only=True)
     owner_id = serializers.IntegerField(source='owner.id', read_only=True)
     technologies_count = serializers.ReadOnlyField()
-    is_overdue = serializers.ReadOnlyField()
+    is_overdue = serializers.SerializerMethodField()
 
     # Nested field to show vacancy count
     vacancies_count = serializers.SerializerMethodField()
@@ -35,9 +51,14 @@ class ProjectSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'owner', 'owner_id', 'created_at', 'updated_at']
 
-    def get_vacancies_count(self, obj):
-        """Get the number of vacancies for this project"""
-        return obj.vacancies.count()
+    def get_vacancies_count(self, obj) -> int:
+        """Prefer the database annotation (see ProjectQuerySet.with_vacancies_count)"""
+        count = getattr(obj, 'vacancies_count', None)
+        return obj.vacancies.count() if count is None else count
+
+    def get_is_overdue(self, obj) -> bool:
+        """Prefer the database annotation (see ProjectQuerySet.with_deadline_info)"""
+        return getattr(obj, 'overdue', obj.is_overdue)
 
     def validate_technologies(self, value):
         """Validate technologies field"""
@@ -50,8 +71,13 @@ class ProjectSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("All technologies must be strings.")
             if len(tech.strip()) == 0:
                 raise serializers.ValidationError("Technology names cannot be empty.")
+            if len(tech.strip()) > NAME_MAX_LENGTH:
+                raise serializers.ValidationError(
+                    f"Technology names cannot be longer than {NAME_MAX_LENGTH} characters."
+                )
 
-        return [tech.strip() for tech in value if tech.strip()]
+        # One entry per technology, spelled as in the catalog (see projects/technologies.py)
+        return canonical_names(value)
 
     def validate_budget(self, value):
         """Validate budget field"""
@@ -70,15 +96,27 @@ class ProjectSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """Create a new project with the current user as owner"""
         validated_data['owner'] = self.context['request'].user
-        return super().create(validated_data)
+        with transaction.atomic():
+            project = super().create(validated_data)
+            sync_project_technologies(project)
+        return project
+
+    def update(self, instance, validated_data):
+        """Update a project, keeping its catalog links in sync"""
+        with transaction.atomic():
+            project = super().update(instance, validated_data)
+            if 'technologies' in validated_data:
+                sync_project_technologies(project)
+        return project
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(IncludedVacanciesMixin, serializers.ModelSerializer):
     """
     Lightweight serializer for project lists (better performance)
     """
     owner = serializers.StringRelatedField(read_only=True)
     technologies_count = serializers.ReadOnlyField()
+    is_overdue = serializers.SerializerMethodField()
     vacancies_count = serializers.SerializerMethodField()
 
     class Meta:
@@ -90,14 +128,69 @@ class ProjectListSerializer(serializers.ModelSerializer):
             'technologies_count',
             'budget',
             'deadline',
+            'is_overdue',
             'owner',
             'vacancies_count',
             'created_at',
             'updated_at'
         ]
 
-    def get_vacancies_count(self, obj):
-        return obj.vacancies.count()
+    def get_vacancies_count(self, obj) -> int:
+        count = getattr(obj, 'vacancies_count', None)
+        return obj.vacancies.count() if count is None else count
+
+    def get_is_overdue(self, obj) -> bool:
+        return getattr(obj, 'overdue', obj.is_overdue)
+
+
+class SimilarProjectSerializer(serializers.Serializer):
+    """
+    Project ranked by text similarity
+    """
+    score = serializers.FloatField(read_only=True, help_text='Cosine similarity (0-1)')
+    project = ProjectListSerializer(read_only=True)
+
+
+class SimilarProjectsSerializer(serializers.Serializer):
+    """
+    Most similar projects first (schema of /api/projects/{id}/similar/)
+    """
+    results = SimilarProjectSerializer(many=True, read_only=True)
+
+
+class TechnologySerializer(serializers.ModelSerializer):
+    """
+    Catalog technology (autocomplete suggestions)
+    """
+
+    class Meta:
+        model = Technology
+        fields = ['id', 'name', 'project_count']
+        read_only_fields = fields
+
+
+class SuggestionSerializer(serializers.Serializer):
+    """
+    Search-box suggestion with its frequency
+    """
+    text = serializers.CharField(read_only=True)
+    count = serializers.IntegerField(read_only=True)
+
+
+class SuggestionsSerializer(serializers.Serializer):
+    """
+    Suggestions per kind, most frequent first (schema of /api/public/suggestions/)
+    """
+    titles = SuggestionSerializer(many=True, read_only=True, required=False)
+    technologies = SuggestionSerializer(many=True, read_only=True, required=False)
+
+
+class EventTicketSerializer(serializers.Serializer):
+    """
+    Stream ticket for /api/events/?ticket= (schema of /api/events/ticket/)
+    """
+    ticket = serializers.CharField(read_only=True)
+    expires_in = serializers.IntegerField(read_only=True, help_text='Seconds the ticket can be used')
 
 
 class VacancySerializer(serializers.ModelSerializer):
@@ -126,6 +219,18 @@ class VacancySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'project_title', 'created_at', 'updated_at']
 
+    def validate_project(self, value):
+        """Vacancies can only be moved to projects the user may modify"""
+        request = self.context.get('request')
+        if request is None or (self.instance is not None and self.instance.project_id == value.pk):
+            return value
+        writable = ProjectAccess().filter_queryset(
+            request.user, Project.objects.filter(pk=value.pk)
+        ).filter(**{WRITE_ANNOTATION: True})
+        if not writable.exists():
+            raise serializers.ValidationError("You can only use your own projects.")
+        return value
+
     def validate_salary_min(self, value):
         """Validate minimum salary"""
         if value is not None and value <= 0:
@@ -152,6 +257,93 @@ class VacancySerializer(serializers.ModelSerializer):
         return data
 
 
+class ArchivedVacancySerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for the archive tier, shaped like VacancySerializer
+    """
+    id = serializers.IntegerField(source='original_id', read_only=True)
+    project_title = serializers.CharField(source='project.title', read_only=True)
+    salary_range = serializers.ReadOnlyField()
+    is_active = serializers.ReadOnlyField()
+
+    class Meta:
+        model = ArchivedVacancy
+        fields = [
+            'id',
+            'title',
+            'description',
+            'requirements',
+            'salary_min',
+            'salary_max',
+            'salary_range',
+            'employment_type',
+            'project',
+            'project_title',
+            'is_active',
+            'created_at',
+            'updated_at',
+            'archived_at'
+        ]
+        read_only_fields = fields
+
+
+class BothTiersVacancySerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer for lists of current and archived vacancies
+    (?archived=true), every row flagged with ``archived``
+    """
+
+    def to_representation(self, instance):
+        archived = isinstance(instance, ArchivedVacancy)
+        serializer_class = ArchivedVacancySerializer if archived else VacancySerializer
+        data = serializer_class(instance, context=self.context).data
+        data['archived'] = archived
+        return data
+
+
+class PublicVacancySerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for the public vacancy feed (no owner data)
+    """
+    project_title = serializers.CharField(source='project.title', read_only=True)
+    technologies = serializers.ListField(source='project.technologies', read_only=True)
+    salary_range = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Vacancy
+        fields = [
+            'id',
+            'title',
+            'description',
+            'requirements',
+            'salary_min',
+            'salary_max',
+            'salary_range',
+            'employment_type',
+            'project',
+            'project_title',
+            'technologies',
+            'created_at'
+        ]
+        read_only_fields = fields
+
+
+class VacancyMatchSerializer(serializers.Serializer):
+    """
+    Vacancy ranked for a candidate's skills
+    """
+    score = serializers.FloatField(read_only=True, help_text='Weighted share of the skills the vacancy asks for (0-1)')
+    matched_skills = serializers.ListField(child=serializers.CharField(), read_only=True)
+    vacancy = PublicVacancySerializer(read_only=True)
+
+
+class VacancyMatchesSerializer(serializers.Serializer):
+    """
+    Best matching vacancies first (schema of /api/public/vacancies/match/)
+    """
+    results = VacancyMatchSerializer(many=True, read_only=True)
+
+
 class VacancyCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating vacancies within a project context
@@ -0,0 +1,69 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_owner_version
+from .changes import record_change
+from .models import ArchivedVacancy, ChangeEvent, Project, Vacancy
+from .similarity import schedule_update
+from .suggestions import record_terms, remember_terms
+from .technologies import release_project_technologies
+
+
+def get_vacancy_owner_id(vacancy):
+    """Owner of the vacancy's project, without a query when the project is loaded"""
+    if type(vacancy).project.is_cached(vacancy):
+        return vacancy.project.owner_id
+    return Project.all_objects.filter(pk=vacancy.project_id).values_list('owner_id', flat=True).first()
+
+
+def _action(signal):
+    return ChangeEvent.ACTION_DELETE if signal is post_delete else ChangeEvent.ACTION_UPSERT
+
+
+@receiver([post_save, post_delete], sender=Project)
+def invalidate_project_owner_cache(sender, instance, signal, **kwargs):
+    """Bump the owner's data version and log the change on any project write"""
+    bump_owner_version(instance.owner_id)
+    record_change(instance.owner_id, ChangeEvent.TYPE_PROJECT, instance.pk, _action(signal))
+
+
+@receiver([post_save, post_delete], sender=Project)
+def update_similarity_index(sender, instance, **kwargs):
+    """Queue the similar-projects index update (it reads the change feed)"""
+    schedule_update()
+
+
+@receiver(pre_delete, sender=Project)
+def release_technologies(sender, instance, **kwargs):
+    """Keep the catalog's usage counts right when a project goes away"""
+    release_project_technologies(instance)
+
+
+@receiver([post_save, post_delete], sender=Vacancy)
+@receiver([post_save, post_delete], sender=ArchivedVacancy)
+def invalidate_vacancy_owner_cache(sender, instance, signal, origin=None, **kwargs):
+    """Bump the project owner's data version on any vacancy write"""
+    if isinstance(origin, Project):
+        # Cascade from a project delete, the project handler covers it
+        return
+    owner_id = get_vacancy_owner_id(instance)
+    if owner_id is None:
+        return
+    bump_owner_version(owner_id)
+    if sender is Vacancy:
+        # The archive tier is not part of the synced data set
+        record_change(owner_id, ChangeEvent.TYPE_VACANCY, instance.pk, _action(signal))
+
+
+@receiver(pre_save, sender=Project)
+@receiver(pre_save, sender=Vacancy)
+def remember_suggestion_terms(sender, instance, update_fields=None, **kwargs):
+    """Keep the stored title/technologies to diff them after the save"""
+    remember_terms(instance, update_fields)
+
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=Vacancy)
+def update_suggestion_index(sender, instance, signal, created=False, **kwargs):
+    """Keep this process' search-box suggestions current"""
+    record_terms(instance, created=created, deleted=signal is post_delete)
@@ -0,0 +1,518 @@
+"""
+Similar projects: cosine neighbours over precomputed TF-IDF vectors.
+
+Projects are vectorized from their title, description and technologies
+with hashed features (crc32 of the term modulo N_FEATURES, so there is no
+vocabulary to store or keep in sync), sublinear term frequencies and the
+inverse document frequencies of the last full build. Vectors are L2
+normalized, so their dot product is the cosine similarity.
+
+The index is built by a background job and stored on disk as plain
+``.npy`` arrays in CSR layout (project_ids, owner_ids, indptr, indices,
+data), rows sorted by owner and id. Web workers memory-map the files, so
+they share the pages through the OS page cache and loading a new index
+parses nothing. Projects are only visible to their owner, so neighbours
+are searched in the owner's contiguous row range: one vectorized sparse
+dot product over those rows.
+
+A full build reads the projects twice, in chunks: once for the document
+frequencies, then again in segment order to vectorize and append the rows
+to the array files. Memory stays bounded by a chunk, not by the table.
+
+Incremental updates read the project events of the change feed since the
+index cursor and write a small delta segment with the changed projects,
+whose ids mask their rows in the base segment. When the delta outgrows
+COMPACT_RATIO of the base, or the change feed cannot be followed, the
+whole index is rebuilt instead. ``DIRECTORY/CURRENT`` names the live
+segments and is replaced atomically; workers look at it every
+RELOAD_SECONDS. UPDATER decides who writes the updates:
+
+- ``jobs``: project writes queue a ``projects.update_similarity_index``
+  job (delayed by UPDATE_DELAY, so a burst of writes makes one job).
+  DIRECTORY must be shared by the web and job workers (same machine or
+  volume), and ``python manage.py build_similarity_index --background``
+  queues the first build.
+- ``web``: every gunicorn worker runs a thread that brings the index up to
+  date every UPDATE_DELAY seconds (the directory lock lets one of them
+  write at a time), building it in the background when there is none
+  yet. DIRECTORY only has to be shared by the workers of one container;
+  on a persistent volume, a restart only applies the changes since the
+  last build instead of rebuilding.
+
+Until the first build, the similar-projects endpoint answers 503.
+
+Configuration (settings.SIMILARITY):
+
+    SIMILARITY = {
+        'DIRECTORY': BASE_DIR / 'similarity',
+        'UPDATER': 'jobs',      # or 'web'
+        'AUTO_UPDATE': True,    # update the index after project writes
+        'UPDATE_DELAY': 30,     # seconds between updates
+        'RELOAD_SECONDS': 10,
+        'COMPACT_RATIO': 0.2,
+        'MAX_CHANGES': 5000,    # more pending events trigger a full build
+    }
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .changes import get_config as get_change_feed_config, pruned_through, settled, settled_sequence
+from .matching import tokenize
+from .models import ChangeEvent, Project
+from .technologies import normalize_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'UPDATER': 'jobs',
+    'AUTO_UPDATE': True,
+    'UPDATE_DELAY': 30,
+    'RELOAD_SECONDS': 10,
+    'COMPACT_RATIO': 0.2,
+    'MAX_CHANGES': 5000,
+}
+
+UPDATE_TASK = 'projects.update_similarity_index'
+
+SIMILAR_LIMIT = 10
+SIMILAR_MAX_LIMIT = 50
+
+N_FEATURES = 2 ** 18
+TITLE_WEIGHT = 2.0
+TECHNOLOGY_WEIGHT = 3.0
+MIN_TOKEN_LENGTH = 2
+
+CURRENT = 'CURRENT'
+SEGMENT_ARRAYS = {
+    'project_ids': np.int64,
+    'owner_ids': np.int64,
+    'indptr': np.int64,
+    'indices': np.int32,
+    'data': np.float32,
+}
+# Projects vectorized and written at a time by a full build
+BUILD_CHUNK_SIZE = 2000
+
+
+def get_config():
+    config = {**DEFAULTS, 'DIRECTORY': Path(settings.BASE_DIR) / 'similarity'}
+    config.update(getattr(settings, 'SIMILARITY', {}))
+    config['DIRECTORY'] = Path(config['DIRECTORY'])
+    return config
+
+
+def _feature(term):
+    return zlib.crc32(term.encode()) % N_FEATURES
+
+
+def project_features(title, description, technologies):
+    """{feature: weighted term count} of a project"""
+    counts = Counter()
+    for text, weight in ((title, TITLE_WEIGHT), (description, 1.0)):
+        for token in tokenize(text or ''):
+            if len(token) >= MIN_TOKEN_LENGTH:
+                counts[_feature(token)] += weight
+    for name in technologies or []:
+        key = normalize_name(name) if isinstance(name, str) else ''
+        if key:
+            # Whole names, so "react native" is not just "react" and "native"
+            counts[_feature(f'technology:{key}')] += TECHNOLOGY_WEIGHT
+    return counts
+
+
+def vectorize(features, idf):
+    """(indices, data) of the L2 normalized TF-IDF vector, indices sorted"""
+    indices = np.array(sorted(features), dtype=np.int32)
+    counts = np.array([features[feature] for feature in indices.tolist()], dtype=np.float64)
+    data = (1 + np.log(counts)) * idf[indices] if len(indices) else counts
+    norm = np.linalg.norm(data)
+    if norm:
+        data /= norm
+    return indices, data.astype(np.float32)
+
+
+class Segment:
+    """CSR rows of a segment directory, memory-mapped"""
+
+    def __init__(self, path, mmap_mode='r'):
+        self.path = path
+        for name in SEGMENT_ARRAYS:
+            setattr(self, name, np.load(path / f'{name}.npy', mmap_mode=mmap_mode))
+
+    def __len__(self):
+        return len(self.project_ids)
+
+    def rows(self):
+        """[(owner id, project id, indices, data)], for rewriting the segment"""
+        return [
+            (
+                int(self.owner_ids[position]), int(self.project_ids[position]),
+                np.array(self.indices[self.indptr[position]:self.indptr[position + 1]]),
+                np.array(self.data[self.indptr[position]:self.indptr[position + 1]])
+            )
+            for position in range(len(self))
+        ]
+
+    def neighbours(self, owner_id, indices, data, exclude):
+        """(project ids, cosine scores) of the owner's rows sharing a feature with the vector"""
+        lo, hi = np.searchsorted(self.owner_ids, owner_id, 'left'), np.searchsorted(self.owner_ids, owner_id, 'right')
+        if lo == hi:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        start, end = self.indptr[lo], self.indptr[hi]
+
+        # Sparse dot products: gather the query weight of every stored feature,
+        # then sum the non-zero products per row
+        dense = np.zeros(N_FEATURES, dtype=np.float32)
+        dense[indices] = data
+        products = dense[self.indices[start:end]]
+        products *= self.data[start:end]
+        hits = np.flatnonzero(products)
+        rows = np.searchsorted(self.indptr[lo:hi + 1], hits + start, 'right') - 1
+        scores = np.bincount(rows, weights=products[hits], minlength=hi - lo)
+        project_ids = np.asarray(self.project_ids[lo:hi])
+        keep = (scores > 0) & ~np.isin(project_ids, exclude)
+        return project_ids[keep], scores[keep]
+
+
+class SegmentWriter:
+    """
+    Appends [(owner id, project id, indices, data)] rows, already in
+    (owner id, project id) order, to the arrays of a new segment directory
+    """
+
+    def __init__(self, path):
+        self.path = path
+        path.mkdir(parents=True)
+        self._files = {name: open(path / f'{name}.raw', 'wb') for name in SEGMENT_ARRAYS}
+        self.rows = 0
+        self._values = 0
+        np.zeros(1, dtype=np.int64).tofile(self._files['indptr'])
+
+    def write(self, rows):
+        if not rows:
+            return
+        lengths = np.array([len(row[2]) for row in rows], dtype=np.int64)
+        arrays = {
+            'project_ids': [row[1] for row in rows],
+            'owner_ids': [row[0] for row in rows],
+            'indptr': self._values + np.cumsum(lengths),
+            'indices': np.concatenate([row[2] for row in rows]),
+            'data': np.concatenate([row[3] for row in rows]),
+        }
+        for name, array in arrays.items():
+            np.asarray(array, dtype=SEGMENT_ARRAYS[name]).tofile(self._files[name])
+        self.rows += len(rows)
+        self._values += int(lengths.sum())
+
+    def close(self, **extra):
+        """Turn the raw files into .npy arrays and save the ``extra`` ones"""
+        for name, raw_file in self._files.items():
+            raw_file.close()
+            raw = self.path / f'{name}.raw'
+            dtype = np.dtype(SEGMENT_ARRAYS[name])
+            with open(self.path / f'{name}.npy', 'wb') as target, open(raw, 'rb') as source:
+                header = {
+                    'descr': np.lib.format.dtype_to_descr(dtype),
+                    'fortran_order': False,
+                    'shape': (raw.stat().st_size // dtype.itemsize,),
+                }
+                np.lib.format.write_array_header_1_0(target, header)
+                shutil.copyfileobj(source, target)
+            raw.unlink()
+        for name, array in extra.items():
+            np.save(self.path / f'{name}.npy', array)
+
+
+def _write_segment(directory, name, rows, **extra):
+    """Write [(owner id, project id, indices, data)] as a segment directory"""
+    writer = SegmentWriter(directory / name)
+    writer.write(sorted(rows, key=lambda row: (row[0], row[1])))
+    writer.close(**extra)
+
+
+def _segment_name(kind):
+    return f'{kind}-{time.time_ns()}'
+
+
+def read_current(directory):
+    """Live segments and cursor, None before the first build"""
+    try:
+        return json.loads((directory / CURRENT).read_text())
+    except FileNotFoundError:
+        return None
+
+
+def _publish(directory, current):
+    """Switch CURRENT to new segments and remove the replaced ones"""
+    temporary = directory / f'{CURRENT}.tmp'
+    temporary.write_text(json.dumps(current))
+    os.replace(temporary, directory / CURRENT)
+    # Workers still mapping removed files keep reading them until they reload
+    live = {current['base'], current['delta']}
+    for entry in directory.iterdir():
+        if entry.is_dir() and entry.name not in live:
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+@contextmanager
+def _directory_lock(directory):
+    """Exclusive lock of the index directory, across processes"""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / '.lock', 'w') as lock_file:
+        if os.name == 'nt':
+            import msvcrt
+
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after 10 seconds, keep waiting
+                    continue
+            try:
+                yield
+            finally:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+
+        import fcntl
+
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _project_rows(queryset):
+    return queryset.values_list('id', 'owner_id', 'title', 'description', 'technologies').iterator(
+        chunk_size=BUILD_CHUNK_SIZE
+    )
+
+
+def _build(directory):
+    cursor = settled_sequence()
+    # First pass: document frequencies only, the features are not kept
+    documents = 0
+    document_frequency = np.zeros(N_FEATURES, dtype=np.int64)
+    for project_id, owner_id, title, description, technologies in _project_rows(Project.objects.order_by()):
+        counts = project_features(title, description, technologies)
+        if counts:
+            document_frequency[list(counts)] += 1
+        documents += 1
+
+    # Smoothed, so features of new projects (document frequency 0) stay finite
+    idf = (np.log((1 + documents) / (1 + document_frequency)) + 1).astype(np.float32)
+    # Second pass in segment order, vectorized and written a chunk at a time
+    base = _segment_name('base')
+    writer = SegmentWriter(directory / base)
+    chunk = []
+    for project_id, owner_id, title, description, technologies in _project_rows(
+        Project.objects.order_by('owner_id', 'id')
+    ):
+        chunk.append((owner_id, project_id, *vectorize(project_features(title, description, technologies), idf)))
+        if len(chunk) >= BUILD_CHUNK_SIZE:
+            writer.write(chunk)
+            chunk = []
+    writer.write(chunk)
+    writer.close(idf=idf)
+    _publish(directory, {
+        'base': base,
+        'delta': None,
+        'cursor': cursor,
+        'base_rows': writer.rows,
+        'delta_rows': 0,
+        'built_at': timezone.now().isoformat(),
+    })
+    return {'mode': 'full', 'projects': writer.rows}
+
+
+def _apply_changes(directory, current, config):
+    """Write a new delta segment, None when a full build is needed instead"""
+    if not get_change_feed_config()['ENABLED'] or pruned_through() > current['cursor']:
+        return None
+    events = list(
+        settled(ChangeEvent.objects.filter(object_type=ChangeEvent.TYPE_PROJECT, id__gt=current['cursor']))
+        .order_by('id').values_list('id', 'object_id')[:config['MAX_CHANGES'] + 1]
+    )
+    if len(events) > config['MAX_CHANGES']:
+        return None
+    if not events:
+        return {'mode': 'incremental', 'projects': 0}
+
+    changed = {object_id for seq, object_id in events}
+    rows, tombstones = {}, set(changed)
+    if current['delta']:
+        delta_path = directory / current['delta']
+        tombstones.update(np.load(delta_path / 'tombstones.npy').tolist())
+        rows = {row[1]: row for row in Segment(delta_path, mmap_mode=None).rows() if row[1] not in changed}
+    idf = np.load(directory / current['base'] / 'idf.npy')
+    for project_id, owner_id, title, description, technologies in _project_rows(Project.objects.filter(pk__in=changed)):
+        rows[project_id] = (owner_id, project_id, *vectorize(project_features(title, description, technologies), idf))
+
+    if len(rows) + len(tombstones) > config['COMPACT_RATIO'] * max(current['base_rows'], 1):
+        return None
+    delta = _segment_name('delta')
+    _write_segment(directory, delta, rows.values(), tombstones=np.array(sorted(tombstones), dtype=np.int64))
+    _publish(directory, {**current, 'delta': delta, 'cursor': events[-1][0], 'delta_rows': len(rows)})
+    return {'mode': 'incremental', 'projects': len(changed)}
+
+
+def update_index(full=False):
+    """
+    Bring the on-disk index up to date: apply the project changes since the
+    last run, or rebuild it (first run, ``full``, or too many changes).
+
+    Returns {'mode': 'full' or 'incremental', 'projects': count}.
+    """
+    config = get_config()
+    directory = config['DIRECTORY']
+    # One writer at a time, concurrent jobs wait and then find nothing left to do
+    with _directory_lock(directory):
+        current = read_current(directory)
+        result = None
+        if current is not None and not full:
+            result = _apply_changes(directory, current, config)
+        return result or _build(directory)
+
+
+def _enqueue_update():
+    from jobs.models import Job
+    from jobs.queue import enqueue
+
+    if Job.objects.filter(name=UPDATE_TASK, status=Job.STATUS_QUEUED).exists():
+        # The queued job has not started yet, it will pick this change up
+        return
+    enqueue(UPDATE_TASK, delay=timedelta(seconds=get_config()['UPDATE_DELAY']))
+
+
+def schedule_update():
+    """Queue an index update once the current transaction commits"""
+    config = get_config()
+    # Web workers poll the change feed themselves
+    if config['UPDATER'] == 'jobs' and config['AUTO_UPDATE'] and (config['DIRECTORY'] / CURRENT).exists():
+        transaction.on_commit(_enqueue_update)
+
+
+_refresher = None
+
+
+def _refresh(interval):
+    while True:
+        try:
+            update_index()
+        except Exception:
+            logger.exception('Could not update the similarity index')
+        finally:
+            # This thread's connections only
+            connections.close_all()
+        time.sleep(interval)
+
+
+def start_refresher():
+    """
+    Start the thread keeping the index up to date in this process
+    (``'UPDATER': 'web'``), returns whether it was started
+    """
+    global _refresher
+    config = get_config()
+    if config['UPDATER'] != 'web' or not config['AUTO_UPDATE']:
+        return False
+    # Threads do not survive a fork, a worker starts its own
+    if _refresher is not None and _refresher.is_alive():
+        return False
+    _refresher = threading.Thread(
+        target=_refresh, args=(config['UPDATE_DELAY'],), name='similarity-refresher', daemon=True
+    )
+    _refresher.start()
+    return True
+
+
+class SimilarityIndex:
+    """Live base and delta segments of the on-disk index"""
+
+    def __init__(self, directory, current):
+        self.current = current
+        self.base = Segment(directory / current['base'])
+        self.idf = np.load(directory / current['base'] / 'idf.npy', mmap_mode='r')
+        self.delta = None
+        self.tombstones = np.empty(0, dtype=np.int64)
+        if current['delta']:
+            self.delta = Segment(directory / current['delta'])
+            self.tombstones = np.load(directory / current['delta'] / 'tombstones.npy')
+
+    def __len__(self):
+        return len(self.base) + (len(self.delta) if self.delta else 0) - len(self.tombstones)
+
+    def similar(self, project, limit=SIMILAR_LIMIT):
+        """[(project id, cosine similarity)] of the owner's most similar projects"""
+        # Vectorized from the instance, so unsaved edits and new projects work too
+        indices, data = vectorize(
+            project_features(project.title, project.description, project.technologies), self.idf
+        )
+        if not len(indices):
+            return []
+        ids, scores = self.base.neighbours(
+            project.owner_id, indices, data, np.append(self.tombstones, project.pk)
+        )
+        if self.delta is not None:
+            delta_ids, delta_scores = self.delta.neighbours(project.owner_id, indices, data, [project.pk])
+            ids, scores = np.concatenate([ids, delta_ids]), np.concatenate([scores, delta_scores])
+        if len(ids) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            ids, scores = ids[best], scores[best]
+        order = np.lexsort((-ids, -scores))
+        return [(int(ids[position]), round(float(scores[position]), 4)) for position in order]
+
+
+_index = None
+_checked_at = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """The live index of this process, None before the first build"""
+    global _index, _checked_at
+    config = get_config()
+    now = time.monotonic()
+    if _checked_at is not None and now - _checked_at < config['RELOAD_SECONDS']:
+        return _index
+    if not _index_lock.acquire(blocking=_checked_at is None):
+        return _index
+    try:
+        _checked_at = now
+        current = read_current(config['DIRECTORY'])
+        if current is None:
+            _index = None
+        elif _index is None or _index.current != current:
+            try:
+                _index = SimilarityIndex(config['DIRECTORY'], current)
+            except (OSError, ValueError):
+                # Replaced while loading, the next check loads the newer one
+                logger.warning('Could not load the similarity index %s', current, exc_info=True)
+        return _index
+    finally:
+        _index_lock.release()
+
+
+def similar_projects(project, limit=SIMILAR_LIMIT):
+    """[(project id, cosine similarity)], None when no index has been built"""
+    index = get_index()
+    if index is None:
+        return None
+    return index.similar(project, max(1, min(limit, SIMILAR_MAX_LIMIT)))
@@ -0,0 +1,197 @@
+"""
+Server-Sent Events stream of the caller's project and vacancy changes.
+
+Async view, served through project_management/asgi.py: an idle stream is
+a parked coroutine waiting on the hub (projects/events.py), not a thread,
+so one process holds thousands of them. Events carry the change log
+sequence as their id, so a reconnecting EventSource resumes with
+``Last-Event-ID`` without losing or repeating changes.
+
+Browsers' EventSource cannot send an Authorization header. Instead of the
+API token (which would end up in access logs), it passes a stream ticket
+in the URL: signed, only valid for this endpoint, expiring after
+TICKET_MAX_AGE seconds and revoked with the token it was issued for.
+"""
+
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare, salted_hmac
+from drf_spectacular.utils import extend_schema
+from rest_framework import exceptions, permissions
+from rest_framework.authtoken.models import Token
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from authentication.authentication import CachedTokenAuthentication
+from project_management.querycache import cached_query
+
+from .changes import (
+    get_changes,
+    get_config as get_change_feed_config,
+    latest_sequence,
+    pruned_through,
+    serialize_changes
+)
+from .events import ensure_listener, get_config, hub
+from .serializers import EventTicketSerializer
+
+# Changes read from the log per query while catching up
+BATCH_SIZE = 200
+
+
+TICKET_SALT = 'projects.streams.ticket'
+
+
+def _token_digest(key):
+    return salted_hmac(TICKET_SALT, key).hexdigest()[:32]
+
+
+def issue_ticket(token):
+    """Signed stream ticket for the user of an API token"""
+    return signing.dumps({'user': token.user_id, 'token': _token_digest(token.key)}, salt=TICKET_SALT)
+
+
+def check_ticket(ticket):
+    """User of a valid stream ticket, AuthenticationFailed otherwise"""
+    try:
+        payload = signing.loads(ticket, salt=TICKET_SALT, max_age=get_config()['TICKET_MAX_AGE'])
+    except signing.SignatureExpired:
+        raise exceptions.AuthenticationFailed('Stream ticket expired.')
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed('Invalid stream ticket.')
+
+    tokens = cached_query(Token.objects.select_related('user').filter(user_id=payload['user']))
+    # Logging out or regenerating the token revokes its tickets
+    if not tokens or not constant_time_compare(_token_digest(tokens[0].key), payload['token']):
+        raise exceptions.AuthenticationFailed('Invalid stream ticket.')
+    user = tokens[0].user
+    if not user.is_active or not CachedTokenAuthentication.is_still_active(user):
+        raise exceptions.AuthenticationFailed('User inactive or deleted.')
+    return user
+
+
+def _authenticate(request):
+    """User of the Authorization header or of the ?ticket= stream ticket"""
+    header = request.headers.get('Authorization', '').split()
+    if len(header) == 2 and header[0].lower() == 'token':
+        user, _ = CachedTokenAuthentication().authenticate_credentials(header[1])
+        return user
+    ticket = request.GET.get('ticket')
+    if not ticket:
+        raise exceptions.NotAuthenticated()
+    return check_ticket(ticket)
+
+
+class EventTicketView(APIView):
+    """POST /api/events/ticket/ - stream ticket for EventSource clients"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="Get an event stream ticket",
+        description=(
+            "Short-lived ticket to open /api/events/?ticket=<ticket> from a browser "
+            "EventSource, which cannot send the Authorization header. Request a new "
+            "ticket when the stream has to be reopened after the ticket expired."
+        ),
+        request=None,
+        responses={200: EventTicketSerializer},
+        tags=['Changes']
+    )
+    def post(self, request):
+        token = request.auth if isinstance(request.auth, Token) else Token.objects.filter(user=request.user).first()
+        if token is None:
+            raise exceptions.PermissionDenied('Stream tickets are issued for token authenticated users.')
+        return Response({'ticket': issue_ticket(token), 'expires_in': get_config()['TICKET_MAX_AGE']})
+
+
+def _read_changes(user, since):
+    try:
+        events, next_since, has_more = get_changes(user.pk, since, BATCH_SIZE)
+        return serialize_changes(user, events), next_since, has_more
+    finally:
+        close_old_connections()
+
+
+def _format(item):
+    data = json.dumps(item, default=str)
+    return f"id: {item['seq']}\nevent: {item['type']}.{item['action']}\ndata: {data}\n\n"
+
+
+async def _stream(user, since):
+    config = get_config()
+    settle = get_change_feed_config()['SETTLE_SECONDS']
+    subscription = hub.subscribe(user.pk)
+    await sync_to_async(ensure_listener)()
+    started = last_poll = time.monotonic()
+    try:
+        yield 'retry: 3000\n\n'
+        pending, notified = True, False
+        while True:
+            if pending:
+                if notified:
+                    # Let the change log settle (see changes.get_changes)
+                    await asyncio.sleep(settle)
+                has_more = True
+                while has_more:
+                    changes, since, has_more = await sync_to_async(
+                        _read_changes, thread_sensitive=False
+                    )(user, since)
+                    for item in changes:
+                        yield _format(item)
+                last_poll = time.monotonic()
+
+            if config['MAX_DURATION'] and time.monotonic() - started > config['MAX_DURATION']:
+                # The client reconnects with Last-Event-ID, this bounds abandoned streams
+                return
+
+            notified = await subscription.wait(config['HEARTBEAT'])
+            pending = notified or time.monotonic() - last_poll >= config['POLL_INTERVAL']
+            if not pending:
+                yield ': keep-alive\n\n'
+    finally:
+        hub.unsubscribe(subscription)
+
+
+async def event_stream(request):
+    """
+    GET /api/events/ - live create/update/delete events of the user's data
+
+    Each event is a change feed item (see /api/changes/) named
+    ``<type>.<action>``, e.g. ``vacancy.upsert`` or ``project.delete``.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI an open stream would block a whole worker
+        return JsonResponse({'detail': 'Event streams require the ASGI server.'}, status=501)
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+    try:
+        user = await sync_to_async(_authenticate)(request)
+    except exceptions.APIException as exc:
+        return JsonResponse({'detail': str(exc.detail)}, status=exc.status_code)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    if last_event_id:
+        if not last_event_id.isdigit():
+            return JsonResponse({'detail': 'Last-Event-ID must be a sequence number.'}, status=400)
+        since = int(last_event_id)
+        if since < await sync_to_async(pruned_through)():
+            return JsonResponse(
+                {'detail': 'Changes since this event are no longer available, download the lists again.'},
+                status=410
+            )
+    else:
+        since = await sync_to_async(latest_sequence, thread_sensitive=False)(user.pk)
+
+    response = StreamingHttpResponse(_stream(user, since), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Disable proxy buffering (nginx), events must be delivered immediately
+    response['X-Accel-Buffering'] = 'no'
+    return response
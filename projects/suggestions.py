@@ -0,0 +1,274 @@
+"""
+In-memory prefix index for search-box suggestions.
+
+Typing ahead sends a request per keystroke. Instead of a ``LIKE 'abc%'``
+query each time, every process keeps two small indexes in memory: the
+distinct titles of active vacancies and the catalog's technology names,
+each with its frequency (active vacancies with the title, projects using
+the technology). An index is a sorted array of normalized keys, so the
+entries starting with a prefix are one ``bisect`` range, and the most
+frequent ``limit`` of them are returned.
+
+- The indexes are built once per process (gunicorn builds them in the
+  master before forking, see project_management/warmup.py) with one
+  grouped query each.
+- Vacancy and project writes of the process update them incrementally
+  (see signals.py) once the transaction commits. Writes of other workers
+  and bulk queryset operations show up after the next rebuild, at most
+  ``MAX_AGE`` seconds later.
+- Memory is bounded: each index keeps at most ``MAX_ENTRIES`` keys (the
+  most frequent ones) and ignores new keys once full, until it is rebuilt.
+
+With ``ENABLED`` off no index is kept and every suggestion is queried.
+
+Configuration (settings.SUGGESTIONS):
+
+    SUGGESTIONS = {
+        'ENABLED': True,
+        'MAX_ENTRIES': 20000,   # keys per index
+        'MAX_AGE': 300,         # seconds before an index is rebuilt
+    }
+"""
+
+import bisect
+import heapq
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Project, Technology, Vacancy
+from .technologies import clean_name, normalize_name
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 20000,
+    'MAX_AGE': 300,
+}
+
+SUGGESTION_LIMIT = 10
+SUGGESTION_MAX_LIMIT = 50
+# Answers for prefixes matching more keys than this are memoized
+MEMO_MIN_MATCHES = 500
+
+KIND_TITLE = 'title'
+KIND_TECHNOLOGY = 'technology'
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'SUGGESTIONS', {}))
+    return config
+
+
+class PrefixIndex:
+    """
+    Sorted array of normalized keys with display text and frequency.
+
+    Reads take no lock: mutations replace the key list instead of changing
+    it in place, so a reader always sees a consistent snapshot.
+    """
+
+    def __init__(self, counts, max_entries):
+        """``counts`` maps display text to frequency"""
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        entries = {}
+        for text, count in counts.items():
+            key = normalize_name(text)
+            if key and count > 0:
+                entry = entries.setdefault(key, [clean_name(text), 0])
+                entry[1] += count
+        if len(entries) > max_entries:
+            kept = heapq.nlargest(max_entries, entries.items(), key=lambda item: item[1][1])
+            entries = dict(kept)
+        self._entries = entries
+        self._keys = sorted(entries)
+        self._memo = {}
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, prefix, limit):
+        """[(text, count)] of the ``limit`` most frequent keys starting with ``prefix``"""
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        keys, entries, memo = self._keys, self._entries, self._memo
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + '\U0010ffff', start)
+        # Short prefixes span most of the index, their answers are memoized
+        memoize = end - start > MEMO_MIN_MATCHES
+        if memoize and (prefix, limit) in memo:
+            return memo[(prefix, limit)]
+
+        # Copy the entries first, writers may change them meanwhile
+        matches = [entry[:] for entry in map(entries.get, keys[start:end]) if entry and entry[1] > 0]
+        result = [
+            (text, count) for text, count
+            in heapq.nsmallest(limit, matches, key=lambda entry: (-entry[1], entry[0]))
+        ]
+        if memoize:
+            memo[(prefix, limit)] = result
+        return result
+
+    def adjust(self, text, delta):
+        """Change the frequency of ``text``, adding or dropping its key"""
+        key = normalize_name(text)
+        if not key or not delta:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if delta < 0 or len(self._keys) >= self.max_entries:
+                    return
+                self._entries[key] = [clean_name(text), delta]
+                keys = list(self._keys)
+                bisect.insort(keys, key)
+                self._keys = keys
+            else:
+                entry[1] += delta
+                if entry[1] <= 0:
+                    keys = list(self._keys)
+                    del keys[bisect.bisect_left(keys, key)]
+                    self._keys = keys
+                    del self._entries[key]
+            self._memo = {}
+
+
+def _title_counts():
+    rows = (
+        Vacancy.objects.filter(is_active=True, project__deletion_pending=False)
+        .values('title').annotate(total=Count('id')).order_by()
+    )
+    return {row['title']: row['total'] for row in rows}
+
+
+def _technology_counts():
+    rows = Technology.objects.filter(project_count__gt=0).values_list('name', 'project_count')
+    return dict(rows)
+
+
+LOADERS = {
+    KIND_TITLE: _title_counts,
+    KIND_TECHNOLOGY: _technology_counts,
+}
+
+_indexes = {}
+_build_lock = threading.Lock()
+
+
+def _query(kind, prefix, limit):
+    key = normalize_name(prefix)
+    if not key:
+        return []
+    if kind == KIND_TITLE:
+        rows = (
+            Vacancy.objects.filter(is_active=True, project__deletion_pending=False, title__istartswith=key)
+            .values('title').annotate(total=Count('id')).order_by('-total', 'title')[:limit]
+        )
+        return [(row['title'], row['total']) for row in rows]
+    rows = (
+        Technology.objects.filter(normalized__startswith=key, project_count__gt=0)
+        .order_by('-project_count', 'name').values_list('name', 'project_count')[:limit]
+    )
+    return list(rows)
+
+
+def build_indexes():
+    """(Re)build every index of this process, returns the number of keys"""
+    if not get_config()['ENABLED']:
+        return 0
+    max_entries = get_config()['MAX_ENTRIES']
+    for kind, loader in LOADERS.items():
+        _indexes[kind] = PrefixIndex(loader(), max_entries)
+    return sum(len(index) for index in _indexes.values())
+
+
+def get_index(kind):
+    """The process index of ``kind``, built on first use and when expired"""
+    index = _indexes.get(kind)
+    if index is not None and time.monotonic() - index.built_at < get_config()['MAX_AGE']:
+        return index
+    # One thread rebuilds, the others keep answering from the old index
+    if not _build_lock.acquire(blocking=index is None):
+        return index
+    try:
+        current = _indexes.get(kind)
+        if current is index:
+            current = _indexes[kind] = PrefixIndex(LOADERS[kind](), get_config()['MAX_ENTRIES'])
+        return current
+    finally:
+        _build_lock.release()
+
+
+def suggest(prefix, kinds=(KIND_TITLE, KIND_TECHNOLOGY), limit=SUGGESTION_LIMIT):
+    """{kind: [(text, count)]} for a search box prefix"""
+    limit = max(1, min(limit, SUGGESTION_MAX_LIMIT))
+    if not get_config()['ENABLED']:
+        return {kind: _query(kind, prefix, limit) for kind in kinds}
+    return {kind: get_index(kind).search(prefix, limit) for kind in kinds}
+
+
+def adjust(kind, changes):
+    """Apply {text: delta} to a built index"""
+    index = _indexes.get(kind)
+    if index is None:
+        return
+    for text, delta in changes.items():
+        index.adjust(text, delta)
+
+
+# Index fed by each model and the fields its terms come from
+TRACKED = {
+    Vacancy: (KIND_TITLE, ('title', 'is_active')),
+    Project: (KIND_TECHNOLOGY, ('technologies',)),
+}
+
+
+def _terms(instance):
+    """{key: text} the instance contributes to its index"""
+    if isinstance(instance, Vacancy):
+        texts = [instance.title] if instance.is_active else []
+    else:
+        texts = [name for name in instance.technologies or [] if isinstance(name, str)]
+    return {normalize_name(text): text for text in texts}
+
+
+def is_tracking():
+    """Whether writes of this process have indexes to update"""
+    return bool(_indexes) and get_config()['ENABLED']
+
+
+def remember_terms(instance, update_fields=None):
+    """pre_save: keep the stored terms of an instance about to be updated"""
+    if not is_tracking() or instance._state.adding or instance.pk is None:
+        return
+    fields = TRACKED[type(instance)][1]
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return
+    stored = type(instance)._base_manager.filter(pk=instance.pk).only(*fields).first()
+    instance._suggestion_terms = _terms(stored) if stored else {}
+
+
+def record_terms(instance, created=False, deleted=False):
+    """post_save/post_delete: update the index once the transaction commits"""
+    if not is_tracking():
+        return
+    if created:
+        before, after = {}, _terms(instance)
+    elif deleted:
+        before, after = _terms(instance), {}
+    elif '_suggestion_terms' in instance.__dict__:
+        before, after = instance.__dict__.pop('_suggestion_terms'), _terms(instance)
+    else:
+        # Saved without the tracked fields
+        return
+    changes = {after[key]: 1 for key in after.keys() - before.keys()}
+    changes.update({before[key]: -1 for key in before.keys() - after.keys()})
+    if changes:
+        transaction.on_commit(partial(adjust, TRACKED[type(instance)][0], changes))
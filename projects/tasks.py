@@ -0,0 +1,42 @@
+from jobs.registry import task
+
+from .archive import archive_vacancies
+from .changes import prune_changes
+from .deletion import purge_pending_projects, purge_project, purge_user
+from .similarity import UPDATE_TASK, update_index
+
+
+@task('projects.purge_project')
+def purge_project_task(project_id):
+    """Delete a project pending deletion and its vacancies in batches"""
+    return {'deleted_vacancies': purge_project(project_id)}
+
+
+@task('projects.purge_user')
+def purge_user_task(user_id):
+    """Delete a user after purging their projects in batches"""
+    return {'deleted_vacancies': purge_user(user_id)}
+
+
+@task('projects.purge_pending_projects')
+def purge_pending_projects_task():
+    """Finish every interrupted project deletion"""
+    return {'purged_projects': purge_pending_projects()}
+
+
+@task('projects.archive_vacancies')
+def archive_vacancies_task(retention_days=None):
+    """Move long inactive vacancies to the archive tier"""
+    return {'archived_vacancies': archive_vacancies(retention_days=retention_days)}
+
+
+@task('projects.prune_changes')
+def prune_changes_task(retention_days=None):
+    """Remove change feed events older than the retention period"""
+    return {'pruned_events': prune_changes(retention_days=retention_days)}
+
+
+@task(UPDATE_TASK)
+def update_similarity_index_task(full=False):
+    """Apply project changes to the similar-projects index, or rebuild it"""
+    return update_index(full=full)
@@ -0,0 +1,220 @@
+"""
+Normalized technology catalog.
+
+Project.technologies stays a JSON list of names (the API format). The
+catalog gives every spelling one canonical Technology ("Django", "django "
+and "DJango" are the same entry; TechnologyAlias maps other names such as
+"js" to "JavaScript"), and ProjectTechnology links projects to it, so
+technology queries use an index instead of scanning JSON:
+
+- ProjectSerializer canonicalizes submitted names and calls
+  sync_project_technologies() after saving;
+- ``manage.py backfill_technologies`` links existing projects in batches;
+- ``/api/technologies/?prefix=`` autocompletes from the catalog, with the
+  prefix (varchar_pattern_ops) index and a trigram index for infix matches.
+
+Technology.project_count ranks suggestions. It is adjusted by the sync
+functions and recomputed by the backfill command.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Project, ProjectTechnology, Technology, TechnologyAlias
+
+NAME_MAX_LENGTH = Technology._meta.get_field('normalized').max_length
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+# Shorter terms only match prefixes: infix matches of 1-2 characters are noise
+INFIX_MIN_LENGTH = 3
+
+
+def clean_name(name):
+    """Display form of a name: surrounding and repeated whitespace removed"""
+    return ' '.join(str(name).split())
+
+
+def normalize_name(name):
+    """Canonical key of a name: cleaned and case folded"""
+    return clean_name(name).casefold()
+
+
+def lookup_technologies(names):
+    """Existing catalog entries of ``names``, {normalized: Technology}"""
+    keys = {normalize_name(name) for name in names} - {''}
+    if not keys:
+        return {}
+    found = {
+        alias.normalized: alias.technology
+        for alias in TechnologyAlias.objects.filter(normalized__in=keys).select_related('technology')
+    }
+    found.update({
+        technology.normalized: technology
+        for technology in Technology.objects.filter(normalized__in=keys - set(found))
+    })
+    return found
+
+
+def get_or_create_technologies(names):
+    """Catalog entries of ``names``, created for unknown names"""
+    cleaned = {}
+    for name in names:
+        key = normalize_name(name)
+        if key and len(key) <= NAME_MAX_LENGTH:
+            cleaned.setdefault(key, clean_name(name))
+
+    found = lookup_technologies(cleaned.values())
+    missing = [key for key in cleaned if key not in found]
+    if missing:
+        # Concurrent writers may create the same names, the unique key decides
+        Technology.objects.bulk_create(
+            [Technology(name=cleaned[key], normalized=key) for key in missing],
+            ignore_conflicts=True
+        )
+        found.update(lookup_technologies([cleaned[key] for key in missing]))
+    return found
+
+
+def canonical_names(names):
+    """
+    Names as stored in Project.technologies: duplicates (by canonical key)
+    removed and known technologies spelled as in the catalog
+    """
+    catalog = lookup_technologies(names)
+    result, seen = [], set()
+    for name in names:
+        key = normalize_name(name)
+        technology = catalog.get(key)
+        canonical_key = technology.normalized if technology else key
+        if not key or canonical_key in seen:
+            continue
+        seen.add(canonical_key)
+        result.append(technology.name if technology else clean_name(name))
+    return result
+
+
+def _adjust_counts(technology_ids, delta):
+    if technology_ids:
+        Technology.objects.filter(pk__in=technology_ids).update(project_count=F('project_count') + delta)
+
+
+def sync_project_technologies(project):
+    """Make the project's links match its technologies list"""
+    with transaction.atomic():
+        wanted = {technology.pk for technology in get_or_create_technologies(project.technologies or []).values()}
+        current = set(
+            ProjectTechnology.objects.filter(project_id=project.pk).values_list('technology_id', flat=True)
+        )
+        added, removed = wanted - current, current - wanted
+        if added:
+            ProjectTechnology.objects.bulk_create(
+                [ProjectTechnology(project_id=project.pk, technology_id=pk) for pk in added],
+                ignore_conflicts=True
+            )
+        if removed:
+            ProjectTechnology.objects.filter(project_id=project.pk, technology_id__in=removed).delete()
+        _adjust_counts(added, 1)
+        _adjust_counts(removed, -1)
+
+
+def release_project_technologies(project):
+    """Decrement the counts of a project's technologies before it is deleted"""
+    technology_ids = list(
+        ProjectTechnology.objects.filter(project_id=project.pk).values_list('technology_id', flat=True)
+    )
+    Technology.objects.filter(pk__in=technology_ids, project_count__gt=0).update(
+        project_count=F('project_count') - 1
+    )
+
+
+def link_projects(projects):
+    """
+    Create the missing links of many projects at once (backfill).
+
+    Counts are not adjusted, run recount_technologies() afterwards.
+    Returns the number of links created.
+    """
+    names = [name for project in projects for name in (project.technologies or []) if isinstance(name, str)]
+    catalog = get_or_create_technologies(names)
+    links = {
+        (project.pk, catalog[key].pk)
+        for project in projects
+        for key in (normalize_name(name) for name in (project.technologies or []) if isinstance(name, str))
+        if key in catalog
+    }
+    links -= set(
+        ProjectTechnology.objects.filter(project_id__in=[project.pk for project in projects])
+        .values_list('project_id', 'technology_id')
+    )
+    ProjectTechnology.objects.bulk_create(
+        [ProjectTechnology(project_id=project_id, technology_id=technology_id) for project_id, technology_id in links],
+        ignore_conflicts=True
+    )
+    return len(links)
+
+
+def backfill_technologies(batch_size=1000, progress=None):
+    """
+    Link every existing project to the catalog, ``batch_size`` projects per
+    transaction, then recompute the counts. Safe to run repeatedly.
+
+    Returns (projects processed, links created).
+    """
+    processed = created = 0
+    last_id = 0
+    while True:
+        projects = list(
+            Project.all_objects.filter(pk__gt=last_id).order_by('pk').only('id', 'technologies')[:batch_size]
+        )
+        if not projects:
+            break
+        with transaction.atomic():
+            created += link_projects(projects)
+        processed += len(projects)
+        last_id = projects[-1].pk
+        if progress:
+            progress(processed, created)
+    recount_technologies()
+    return processed, created
+
+
+def recount_technologies():
+    """Recompute every Technology.project_count from the links"""
+    counts = (
+        ProjectTechnology.objects.filter(technology_id=OuterRef('pk'))
+        .order_by().values('technology_id').annotate(total=Count('*')).values('total')
+    )
+    return Technology.objects.update(
+        project_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+    )
+
+
+def autocomplete(term, limit=AUTOCOMPLETE_LIMIT):
+    """
+    Technologies in use whose name or alias starts with ``term``, most used
+    first; filled up with infix matches for longer terms
+    """
+    key = normalize_name(term)
+    if not key:
+        return []
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+    in_use = Technology.objects.filter(project_count__gt=0).order_by('-project_count', 'name')
+
+    alias_ids = TechnologyAlias.objects.filter(normalized__startswith=key).values('technology_id')
+    results = list(in_use.filter(normalized__startswith=key)[:limit])
+    results += [
+        technology for technology in in_use.filter(pk__in=alias_ids)[:limit]
+        if technology not in results
+    ]
+    results.sort(key=lambda technology: (-technology.project_count, technology.name))
+    results = results[:limit]
+
+    if len(results) < limit and len(key) >= INFIX_MIN_LENGTH:
+        # LIKE '%term%', answered by the trigram index
+        results += list(
+            in_use.filter(normalized__contains=key)
+            .exclude(pk__in=[technology.pk for technology in results])[:limit - len(results)]
+        )
+    return results
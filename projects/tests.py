@@ -1,3 +1,1110 @@
-from django.test import TestCase
+import gzip
+import json
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from project_management import middleware, schema
+from project_management.nplusone import detect_n_plus_one
+
+from .archive import archive_vacancies
+from .changes import get_changes, prune_changes, pruned_through, settled_sequence
+from .models import ChangeEvent, Project, ProjectTechnology, Technology, TechnologyAlias, Vacancy
+from .pagination import resolve_count
+from .permissions import ProjectAccess, VacancyAccess
+from .streams import _authenticate, check_ticket
+from . import matching, similarity, suggestions
+from .suggestions import KIND_TITLE, suggest
+
+# Fewer repetitions than rows per page, so a per-row query is reported
+THRESHOLD = 2
+
+
+class NPlusOneTests(TestCase):
+    """List and detail endpoints run a constant number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='testpass123')
+        cls.token = Token.objects.create(user=cls.user)
+        for i in range(5):
+            project = Project.objects.create(
+                title=f'Project {i}',
+                description='Test project',
+                technologies=['Python', 'Django', 'PostgreSQL'],
+                owner=cls.user,
+            )
+            for level in ('Junior', 'Middle', 'Senior'):
+                Vacancy.objects.create(
+                    project=project,
+                    title=f'{level} Python Developer',
+                    description='Test vacancy',
+                    requirements='Python, Django',
+                    salary_min=50000,
+                    salary_max=90000,
+                )
+        cls.project = project
+        cls.vacancy = project.vacancies.first()
+
+    def setUp(self):
+        # Cached responses would not run any query
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def assert_no_n_plus_one(self, url):
+        with detect_n_plus_one(threshold=THRESHOLD, label=url):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response
+
+    def test_project_list(self):
+        response = self.assert_no_n_plus_one('/api/projects/')
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_project_detail(self):
+        self.assert_no_n_plus_one(f'/api/projects/{self.project.pk}/')
+
+    def test_project_list_counts_without_loading_vacancies(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.assert_no_n_plus_one('/api/projects/')
+        self.assertEqual({row['vacancies_count'] for row in response.data['results']}, {3})
+        # Only the count subquery of the project query reads vacancies
+        self.assertFalse([
+            query['sql'] for query in queries.captured_queries
+            if Vacancy._meta.db_table in query['sql'] and Project._meta.db_table not in query['sql']
+        ])
+        self.assertNotIn('vacancies', response.data['results'][0])
+
+    def test_project_list_include_vacancies(self):
+        response = self.assert_no_n_plus_one('/api/projects/?include=vacancies&vacancies.limit=2')
+        for row in response.data['results']:
+            self.assertEqual(row['vacancies_count'], 3)
+            self.assertEqual(len(row['vacancies']), 2)
+
+    def test_vacancy_list(self):
+        response = self.assert_no_n_plus_one('/api/vacancies/')
+        self.assertEqual(len(response.data['results']), 15)
+
+    def test_vacancy_detail(self):
+        self.assert_no_n_plus_one(f'/api/vacancies/{self.vacancy.pk}/')
+
+    def test_public_vacancy_list(self):
+        self.client.credentials()
+        self.assert_no_n_plus_one('/api/public/vacancies/')
+
+
+class DeadlineFilterTests(TestCase):
+    """Deadline filters, the overdue flag and ordering are computed by the database"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='testpass123')
+        cls.token = Token.objects.create(user=cls.user)
+        today = timezone.now().date()
+        cls.deadlines = {
+            'past': today - timedelta(days=10),
+            'soon': today + timedelta(days=5),
+            'later': today + timedelta(days=30),
+            'none': None,
+        }
+        for index, (title, deadline) in enumerate(cls.deadlines.items()):
+            Project.objects.create(
+                title=title, description='Test project', deadline=deadline,
+                budget=1000 * (index + 1), owner=cls.user,
+            )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def titles(self, **params):
+        response = self.client.get('/api/projects/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['title'] for row in response.data['results']]
+
+    def test_overdue(self):
+        self.assertEqual(self.titles(overdue='true'), ['past'])
+        self.assertEqual(sorted(self.titles(overdue='false')), ['later', 'none', 'soon'])
+        rows = self.client.get('/api/projects/').data['results']
+        self.assertEqual({row['title']: row['is_overdue'] for row in rows}['past'], True)
+
+    def test_deadline_range(self):
+        soon = self.deadlines['soon'].isoformat()
+        self.assertEqual(sorted(self.titles(deadline_before=soon)), ['past', 'soon'])
+        self.assertEqual(sorted(self.titles(deadline_after=soon)), ['later', 'soon'])
+        self.assertEqual(self.titles(deadline_after=soon, deadline_before=soon), ['soon'])
+
+    def test_ordering_puts_missing_deadlines_last(self):
+        self.assertEqual(self.titles(ordering='deadline'), ['past', 'soon', 'later', 'none'])
+        self.assertEqual(self.titles(ordering='-deadline'), ['later', 'soon', 'past', 'none'])
+        self.assertEqual(self.titles(ordering='-budget'), ['none', 'later', 'soon', 'past'])
+
+    def test_invalid_parameters(self):
+        for params in ({'ordering': 'title'}, {'deadline_before': '01/02/2025'}):
+            response = self.client.get('/api/projects/', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(next(iter(params)), response.data)
+
+    def test_stats_days_until_deadline(self):
+        project = Project.objects.get(title='later')
+        response = self.client.get(f'/api/projects/{project.pk}/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['days_until_deadline'], 30)
+        self.assertFalse(response.data['is_overdue'])
+
+
+class PaginationTests(TestCase):
+    """Cached and estimated page counts, keyset pagination of vacancy feeds"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='testpass123')
+        cls.token = Token.objects.create(user=cls.user)
+        for i in range(25):
+            Project.objects.create(title=f'Project {i}', description='Test project', owner=cls.user)
+        project = Project.objects.first()
+        for i in range(25):
+            Vacancy.objects.create(
+                project=project,
+                title=f'Vacancy {i}',
+                description='Test vacancy',
+                requirements='Python',
+            )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_count_cached_until_owner_writes(self):
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.data['count'], 25)
+        self.assertTrue(response.data['count_is_exact'])
+
+        # Another page of the same list reuses the count
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/projects/', {'page': 2})
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertFalse([query for query in queries.captured_queries if '"__count"' in query['sql']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(title='Project 25', description='Test project', owner=self.user)
+        response = self.client.get('/api/projects/', {'page': 2})
+        self.assertEqual(response.data['count'], 26)
+
+    def test_bounded_count(self):
+        queryset = Project.objects.filter(owner=self.user)
+        self.assertEqual(resolve_count(queryset, 100), (25, True))
+        # No planner estimate outside PostgreSQL: exact count
+        self.assertEqual(resolve_count(queryset, 10), (25, True))
+        with mock.patch('projects.pagination.estimate_count', return_value=5):
+            # Never below the rows already seen by the bounded count
+            self.assertEqual(resolve_count(queryset, 10), (11, False))
+
+    @override_settings(COUNT_PAGINATION={'ESTIMATE_THRESHOLD': 3})
+    def test_estimated_count_does_not_hide_rows(self):
+        with mock.patch('projects.pagination.estimate_count', return_value=5):
+            response = self.client.get('/api/projects/', {'page': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 5)
+        self.assertFalse(response.data['count_is_exact'])
+        self.assertEqual(len(response.data['results']), 5)
+
+        with mock.patch('projects.pagination.estimate_count', return_value=5):
+            response = self.client.get('/api/projects/', {'page': 3})
+        self.assertEqual(response.status_code, 404)
+
+    def follow(self, url, params=None):
+        titles = []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertNotIn('count', response.data)
+            titles += [row['title'] for row in response.data['results']]
+            url, params = response.data['next'], None
+        return titles
+
+    def test_cursor_pages(self):
+        project = Project.objects.first()
+        titles = self.follow(f'/api/projects/{project.pk}/vacancies/', {'cursor': '', 'page_size': 10})
+        self.assertEqual(titles, [f'Vacancy {i}' for i in reversed(range(25))])
+
+        self.client.credentials()
+        self.assertEqual(self.follow('/api/public/vacancies/', {'page_size': 10}), titles)
+
+    def test_cursor_row_deleted(self):
+        response = self.client.get('/api/public/vacancies/', {'page_size': 10})
+        Vacancy.objects.get(title=response.data['results'][-1]['title']).delete()
+        titles = self.follow(response.data['next'])
+        self.assertEqual(titles, [f'Vacancy {i}' for i in reversed(range(15))])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/public/vacancies/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(str(response.data['detail']), 'Invalid cursor')
+
+
+class IncludeVacanciesTests(TestCase):
+    """?include=vacancies embeds vacancies with a constant number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='testpass123')
+        cls.token = Token.objects.create(user=cls.user)
+        now = timezone.now()
+        for i in range(4):
+            project = Project.objects.create(title=f'Project {i}', description='Test project', owner=cls.user)
+            for j in range(4):
+                vacancy = Vacancy.objects.create(
+                    project=project,
+                    title=f'Vacancy {i}.{j}',
+                    description='Test vacancy',
+                    requirements='Python',
+                    is_active=j != 3,
+                )
+                Vacancy.objects.filter(pk=vacancy.pk).update(created_at=now - timedelta(hours=j))
+        cls.project = project
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_detail(self):
+        url = f'/api/projects/{self.project.pk}/'
+        self.assertNotIn('vacancies', self.client.get(url).data)
+
+        response = self.client.get(url, {'include': 'vacancies'})
+        self.assertEqual(len(response.data['vacancies']), 4)
+
+        response = self.client.get(url, {'include': 'vacancies', 'vacancies.is_active': 'false'})
+        self.assertEqual([row['title'] for row in response.data['vacancies']], ['Vacancy 3.3'])
+
+    def test_list_limit_keeps_newest(self):
+        response = self.client.get('/api/projects/', {'include': 'vacancies', 'vacancies.limit': 2})
+        for row in response.data['results']:
+            index = row['title'].split()[-1]
+            self.assertEqual(
+                [vacancy['title'] for vacancy in row['vacancies']],
+                [f'Vacancy {index}.0', f'Vacancy {index}.1']
+            )
+            self.assertEqual(row['vacancies_count'], 4)
+
+    def count_queries(self, params):
+        for cache in caches.all():
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/projects/', params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries)
+
+    def test_constant_queries(self):
+        params = {'include': 'vacancies', 'vacancies.is_active': 'true', 'vacancies.limit': 2}
+        # The first request also runs the periodic is_active recheck of token auth
+        self.count_queries(params)
+        expected = self.count_queries(params)
+        for i in range(4, 8):
+            project = Project.objects.create(title=f'Project {i}', description='Test project', owner=self.user)
+            Vacancy.objects.create(project=project, title='Vacancy', description='Test', requirements='Python')
+        self.assertEqual(self.count_queries(params), expected)
+        # One extra query over the plain list, whatever the number of projects
+        self.assertEqual(self.count_queries({}), expected - 1)
+
+    def test_invalid_parameters(self):
+        for params in ({'include': 'owner'}, {'include': 'vacancies', 'vacancies.limit': 0}):
+            response = self.client.get('/api/projects/', params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class ProjectVacanciesTests(TestCase):
+    """The project vacancies action is paginated, filterable and streamable"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='testpass123')
+        cls.token = Token.objects.create(user=cls.user)
+        cls.project = Project.objects.create(title='Hiring project', description='Test project', owner=cls.user)
+        for i in range(30):
+            Vacancy.objects.create(
+                project=cls.project,
+                title=f'Vacancy {i}',
+                description='Test vacancy',
+                requirements='Python',
+                employment_type='contract' if i % 3 == 0 else 'full-time',
+                is_active=i % 2 == 0,
+            )
+        cls.url = f'/api/projects/{cls.project.pk}/vacancies/'
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_paginated(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 30)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual({row['project_title'] for row in response.data['results']}, {'Hiring project'})
+        self.assertEqual(len(self.client.get(self.url, {'page': 2}).data['results']), 10)
+
+    def test_filters(self):
+        response = self.client.get(self.url, {'employment_type': 'contract', 'is_active': 'true'})
+        self.assertEqual(response.data['count'], 5)
+        self.assertTrue(all(row['is_active'] for row in response.data['results']))
+
+    def test_stream_filtered(self):
+        response = self.client.get(self.url, {'is_active': 'false', 'stream': 'true'})
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(rows), 15)
+        self.assertEqual({row['project_title'] for row in rows}, {'Hiring project'})
+
+    def test_no_query_per_row(self):
+        # Token auth, project, count and page; project_title reuses the loaded project
+        self.client.get(self.url, {'page': 2})
+        for cache in caches.all():
+            cache.clear()
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+
+    def test_other_owner(self):
+        other = User.objects.create_user('other', password='testpass123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=other).key}')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class SharedReadAccess(ProjectAccess):
+    """Everyone may read projects titled "Shared", only the owner writes"""
+
+    def shared_read_rules(self, user):
+        return [Q(title__startswith='Shared')]
+
+
+class RowPermissionTests(TestCase):
+    """Access rules are queryset filters, object checks never query"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', password='testpass123')
+        cls.other = User.objects.create_user('other', password='testpass123')
+        cls.shared = Project.objects.create(title='Shared project', description='Test', owner=cls.owner)
+        cls.private = Project.objects.create(title='Private project', description='Test', owner=cls.owner)
+        cls.vacancy = Vacancy.objects.create(
+            project=cls.private, title='Developer', description='Test', requirements='Python'
+        )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.factory = RequestFactory()
+
+    def check(self, access, method, obj):
+        request = getattr(self.factory, method)('/')
+        with self.assertNumQueries(0):
+            return access.has_object_permission(request, None, obj)
+
+    def test_owner(self):
+        projects = ProjectAccess().filter_queryset(self.owner, Project.objects.all())
+        self.assertEqual(set(projects), {self.shared, self.private})
+        for project in projects:
+            self.assertTrue(self.check(ProjectAccess(), 'patch', project))
+
+        vacancy = VacancyAccess().filter_queryset(self.owner, Vacancy.objects.all()).get()
+        self.assertTrue(self.check(VacancyAccess(), 'delete', vacancy))
+
+    def test_other_user(self):
+        self.assertFalse(ProjectAccess().filter_queryset(self.other, Project.objects.all()).exists())
+        self.assertFalse(VacancyAccess().filter_queryset(self.other, Vacancy.objects.all()).exists())
+        self.assertFalse(ProjectAccess().filter_queryset(AnonymousUser(), Project.objects.all()).exists())
+
+    def test_shared_read_rule(self):
+        access = SharedReadAccess()
+        project = access.filter_queryset(self.other, Project.objects.all()).get()
+        self.assertEqual(project, self.shared)
+        self.assertTrue(self.check(access, 'get', project))
+        self.assertFalse(self.check(access, 'patch', project))
+
+        project = access.filter_queryset(self.owner, Project.objects.all()).get(pk=self.shared.pk)
+        self.assertTrue(self.check(access, 'patch', project))
+
+    def test_api_hides_other_owners_rows(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.other).key}')
+        response = client.patch(f'/api/projects/{self.private.pk}/', {'title': 'Taken'}, format='json')
+        self.assertEqual(response.status_code, 404)
+        response = client.delete(f'/api/vacancies/{self.vacancy.pk}/')
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Vacancy.objects.filter(pk=self.vacancy.pk).exists())
+
+
+class ArchiveTierTests(TestCase):
+    """?archived=true lists both tiers, ?archived=only the archive"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='testpass123')
+        cls.token = Token.objects.create(user=cls.user)
+        cls.project = Project.objects.create(title='Project', description='Test project', owner=cls.user)
+        for i in range(6):
+            Vacancy.objects.create(
+                project=cls.project,
+                title=f'Developer {i}',
+                description='Test vacancy',
+                requirements='Python',
+                is_active=i % 2 == 0,
+            )
+        cls.archived_ids = set(cls.project.vacancies.filter(is_active=False).values_list('id', flat=True))
+        archive_vacancies(retention_days=0)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_current_tier_by_default(self):
+        response = self.client.get('/api/vacancies/')
+        self.assertEqual(response.data['count'], 3)
+        self.assertNotIn('archived', response.data['results'][0])
+
+    def test_archived_only(self):
+        response = self.client.get('/api/vacancies/', {'archived': 'only'})
+        self.assertEqual({row['id'] for row in response.data['results']}, self.archived_ids)
+
+    def test_both_tiers(self):
+        response = self.client.get('/api/vacancies/', {'archived': 'true'})
+        self.assertEqual(response.data['count'], 6)
+        rows = response.data['results']
+        self.assertEqual(len({row['id'] for row in rows}), 6)
+        self.assertEqual({row['id'] for row in rows if row['archived']}, self.archived_ids)
+        # Newest first across both tiers
+        self.assertEqual([row['id'] for row in rows], sorted((row['id'] for row in rows), reverse=True))
+
+    def test_both_tiers_with_filters(self):
+        response = self.client.get('/api/vacancies/', {'archived': 'true', 'is_active': 'true'})
+        self.assertEqual(response.data['count'], 3)
+        self.assertFalse(any(row['archived'] for row in response.data['results']))
+
+    def test_project_vacancies_cursor(self):
+        url = f'/api/projects/{self.project.pk}/vacancies/'
+        response = self.client.get(url, {'archived': 'true', 'cursor': '', 'page_size': 4})
+        rows = response.data['results'] + self.client.get(response.data['next']).data['results']
+        self.assertEqual(len({row['id'] for row in rows}), 6)
+        self.assertEqual({row['id'] for row in rows if row['archived']}, self.archived_ids)
+
+    def test_project_vacancies_stream(self):
+        url = f'/api/projects/{self.project.pk}/vacancies/'
+        response = self.client.get(url, {'archived': 'true', 'stream': 'true'})
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({row['id'] for row in rows if row['archived']}, self.archived_ids)
+
+
+class ResponseCacheTests(TestCase):
+    """Cached responses of an owner are invalidated when a write commits"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='testpass123')
+        cls.token = Token.objects.create(user=cls.user)
+        cls.project = Project.objects.create(
+            title='Cached project',
+            description='Test project',
+            technologies=['Python'],
+            owner=cls.user,
+        )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_version_bumped_on_commit(self):
+        self.assertEqual(self.client.get('/api/projects/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/projects/')['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.project.title = 'Renamed project'
+            self.project.save()
+            # Not committed yet: a concurrent reader must not cache old rows under a new version
+            self.assertEqual(self.client.get('/api/projects/')['X-Cache'], 'HIT')
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed project')
+
+
+class PublicVacancyFilterTests(TestCase):
+    """Salary filters of the public feed only accept finite numbers"""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', password='testpass123')
+        project = Project.objects.create(title='Project', description='Test project', owner=owner)
+        Vacancy.objects.create(
+            project=project,
+            title='Python Developer',
+            description='Test vacancy',
+            requirements='Python',
+            salary_min=50000,
+            salary_max=90000,
+        )
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def test_salary_range(self):
+        response = APIClient().get('/api/public/vacancies/', {'salary_min': '80000'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_non_finite_salary_rejected(self):
+        for value in ('NaN', 'sNaN', 'Infinity', '-inf', 'abc'):
+            response = APIClient().get('/api/public/vacancies/', {'salary_min': value})
+            self.assertEqual(response.status_code, 400, value)
+            self.assertIn('salary_min', response.data)
+
+
+class ChangeFeedPruningTests(TestCase):
+    """Pruned ranges are tracked in the database"""
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user('owner', password='testpass123')
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        for i in range(3):
+            Project.objects.create(title=f'Project {i}', description='Test project', owner=self.user)
+
+    def test_prune_advances_watermark(self):
+        self.assertEqual(pruned_through(), 0)
+        self.assertEqual(self.client.get('/api/changes/', {'since': 0}).status_code, 200)
+
+        events = list(ChangeEvent.objects.order_by('id').values_list('id', flat=True))
+        ChangeEvent.objects.filter(id__in=events[:2]).update(created_at=timezone.now() - timedelta(days=60))
+        self.assertEqual(prune_changes(retention_days=30), 2)
+
+        self.assertEqual(pruned_through(), events[1])
+        self.assertEqual(self.client.get('/api/changes/', {'since': 0}).status_code, 410)
+        self.assertEqual(self.client.get('/api/changes/', {'since': events[1]}).status_code, 200)
+
+        # Pruning nothing never moves the watermark back
+        self.assertEqual(prune_changes(retention_days=30), 0)
+        self.assertEqual(pruned_through(), events[1])
+
+
+class ChangeFeedSettleTests(TestCase):
+    """Readers never move past an event that may still commit"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='testpass123')
+        for i in range(3):
+            Project.objects.create(title=f'Project {i}', description='Test project', owner=self.user)
+        self.events = list(ChangeEvent.objects.order_by('id').values_list('id', flat=True))
+
+    def test_every_event_final_without_settling(self):
+        events, next_since, has_more = get_changes(self.user.pk, 0, 10)
+        self.assertEqual([event.pk for event in events], self.events)
+        self.assertEqual(next_since, self.events[-1])
+        self.assertEqual(settled_sequence(), self.events[-1])
+
+    @override_settings(CHANGE_FEED={'SETTLE_SECONDS': 60})
+    def test_page_stops_before_first_unsettled_event(self):
+        # Only the middle event is recent: the one after it is held back too
+        ChangeEvent.objects.exclude(pk=self.events[1]).update(created_at=timezone.now() - timedelta(minutes=5))
+
+        events, next_since, has_more = get_changes(self.user.pk, 0, 10)
+        self.assertEqual([event.pk for event in events], self.events[:1])
+        self.assertEqual(next_since, self.events[0])
+        self.assertEqual(settled_sequence(), self.events[1] - 1)
+
+
+class EventTicketTests(TestCase):
+    """Event streams authenticate browsers with signed tickets, not tokens"""
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user('owner', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get_ticket(self):
+        response = self.client.post('/api/events/ticket/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.token.key, response.data['ticket'])
+        return response.data['ticket']
+
+    def test_ticket_authenticates(self):
+        self.assertEqual(check_ticket(self.get_ticket()), self.user)
+
+    def test_ticket_expires(self):
+        ticket = self.get_ticket()
+        with self.settings(EVENT_STREAM={'TICKET_MAX_AGE': -1}):
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                check_ticket(ticket)
+
+    def test_ticket_revoked_with_token(self):
+        ticket = self.get_ticket()
+        self.token.delete()
+        Token.objects.create(user=self.user)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            check_ticket(ticket)
+
+    def test_token_not_accepted_in_url(self):
+        request = RequestFactory().get('/api/events/', {'token': self.token.key})
+        with self.assertRaises(exceptions.NotAuthenticated):
+            _authenticate(request)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            _authenticate(RequestFactory().get('/api/events/', {'ticket': self.token.key}))
+
+
+class SuggestionTests(TestCase):
+    """Titles of projects pending deletion are not suggested"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('owner', password='testpass123')
+        kept = Project.objects.create(title='Kept', description='Test project', owner=user)
+        deleted = Project.objects.create(title='Deleted', description='Test project', owner=user)
+        for project, title in ((kept, 'Backend developer'), (deleted, 'Backend lead')):
+            Vacancy.objects.create(
+                project=project, title=title, description='Test vacancy', requirements='Python',
+            )
+        Project._base_manager.filter(pk=deleted.pk).update(deletion_pending=True)
+
+    def test_index(self):
+        suggestions.build_indexes()
+        self.addCleanup(suggestions._indexes.clear)
+        self.assertEqual(suggest('back', kinds=(KIND_TITLE,)), {KIND_TITLE: [('Backend developer', 1)]})
+
+    @override_settings(SUGGESTIONS={'ENABLED': False})
+    def test_query(self):
+        self.assertEqual(suggest('back', kinds=(KIND_TITLE,)), {KIND_TITLE: [('Backend developer', 1)]})
+
+
+class MatchingTests(TestCase):
+    """Vacancies are ranked by skill overlap and follow the change feed"""
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        matching._index = None
+        self.addCleanup(setattr, matching, '_index', None)
+        user = User.objects.create_user('owner', password='testpass123')
+        self.backend = Project.objects.create(
+            title='Shop', description='Test project', owner=user, technologies=['Python', 'Django']
+        )
+        self.frontend = Project.objects.create(
+            title='Site', description='Test project', owner=user, technologies=['React']
+        )
+        self.api = self._vacancy(self.backend, 'API developer', 'PostgreSQL and Redis')
+        self.admin = self._vacancy(self.backend, 'Admin developer', 'HTML')
+        self.ui = self._vacancy(self.frontend, 'UI developer', 'TypeScript')
+
+    def _vacancy(self, project, title, requirements, **fields):
+        return Vacancy.objects.create(
+            project=project, title=title, description='Test vacancy', requirements=requirements, **fields
+        )
+
+    def test_ranking(self):
+        matches = matching.build_index().match(['Python', 'PostgreSQL'])
+        self.assertEqual([vacancy_id for vacancy_id, score, skills in matches], [self.api.pk, self.admin.pk])
+        self.assertEqual(matches[0][2], ['Python', 'PostgreSQL'])
+        self.assertGreater(matches[0][1], matches[1][1])
+
+        response = APIClient().get('/api/public/vacancies/match/', {'skills': 'react'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['vacancy']['id'] for item in response.data['results']], [self.ui.pk])
+
+    def test_refresh_from_change_feed(self):
+        index = matching.build_index()
+        config = matching.get_config()
+        data = self._vacancy(self.frontend, 'Data engineer', 'Python and Spark')
+        self.admin.delete()
+        # Project events reload every vacancy of the project
+        self.frontend.technologies = ['React', 'Django']
+        self.frontend.save()
+
+        self.assertTrue(matching.refresh_index(index, config))
+        self.assertEqual(index.cursor, ChangeEvent.objects.order_by('id').last().pk)
+        found = {vacancy_id for vacancy_id, score, skills in index.match(['Django'])}
+        self.assertEqual(found, {self.api.pk, self.ui.pk, data.pk})
+
+        # Compacted into the base matrix, without a query
+        with self.assertNumQueries(0):
+            index.apply({}, compact_ratio=0)
+        self.assertEqual(index.delta.size, 0)
+        self.assertEqual({vacancy_id for vacancy_id, score, skills in index.match(['Django'])}, found)
+
+    @override_settings(MATCHING={'MAX_AGE': 0, 'REFRESH_SECONDS': 0})
+    def test_rebuild_off_request_path(self):
+        index = matching._index = matching.build_index()
+        self.addCleanup(setattr, matching, '_rebuilding', False)
+        with mock.patch.object(matching.threading, 'Thread') as thread:
+            # The expired index keeps answering while a thread rebuilds it
+            self.assertIs(matching.get_index(), index)
+            self.assertIs(matching.get_index(), index)
+        thread.assert_called_once_with(target=matching._rebuild, name='matching-rebuild', daemon=True)
+        thread.return_value.start.assert_called_once_with()
+
+
+class SimilarityTests(TestCase):
+    """The on-disk index is built in chunks, follows the change feed and is required"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(SIMILARITY={
+            'DIRECTORY': directory.name, 'RELOAD_SECONDS': 0, 'COMPACT_RATIO': 10, 'AUTO_UPDATE': False,
+        })
+        settings.enable()
+        self.addCleanup(settings.disable)
+        similarity._index = similarity._checked_at = None
+        self.addCleanup(setattr, similarity, '_index', None)
+
+        self.user = User.objects.create_user('owner', password='testpass123')
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.api = self._project('Django REST API', 'Backend for the shop', ['Python', 'Django'])
+        self.admin = self._project('Django admin panel', 'Backend for the staff', ['Python', 'Django'])
+        self.game = self._project('Mobile game', 'Puzzle levels', ['Unity'])
+
+    def _project(self, title, description, technologies):
+        return Project.objects.create(
+            title=title, description=description, technologies=technologies, owner=self.user
+        )
+
+    def test_index_required(self):
+        response = self.client.get(f'/api/projects/{self.api.pk}/similar/')
+        self.assertEqual(response.status_code, 503)
+
+    def test_build(self):
+        # Several chunks, so rows are appended across writes
+        with mock.patch.object(similarity, 'BUILD_CHUNK_SIZE', 2):
+            self.assertEqual(similarity.update_index(), {'mode': 'full', 'projects': 3})
+
+        neighbours = similarity.similar_projects(self.api)
+        self.assertEqual([project_id for project_id, score in neighbours], [self.admin.pk])
+        response = self.client.get(f'/api/projects/{self.api.pk}/similar/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['project']['id'] for item in response.data['results']], [self.admin.pk])
+
+    def test_delta(self):
+        similarity.update_index()
+        self.game.title, self.game.technologies = 'Django shop API', ['Python', 'Django']
+        self.game.save()
+
+        self.assertEqual(similarity.update_index(), {'mode': 'incremental', 'projects': 1})
+        current = similarity.read_current(similarity.get_config()['DIRECTORY'])
+        self.assertIsNotNone(current['delta'])
+        neighbours = dict(similarity.similar_projects(self.api))
+        self.assertEqual(set(neighbours), {self.admin.pk, self.game.pk})
+
+
+class BatchTests(TransactionTestCase):
+    """Read-only batches run on the thread pool and keep request order"""
+
+    def test_read_only_batch(self):
+        user = User.objects.create_user('owner', password='testpass123')
+        token = Token.objects.create(user=user)
+        project = Project.objects.create(title='Project', description='Test project', owner=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        requests = [
+            {'id': 'projects', 'method': 'GET', 'path': '/api/projects/'},
+            {'id': 'project', 'method': 'GET', 'path': f'/api/projects/{project.pk}/'},
+            {'id': 'missing', 'method': 'GET', 'path': '/api/projects/0/'},
+            {'id': 'me', 'method': 'GET', 'path': '/auth/profile/'},
+        ]
+        with self.settings(BATCH_REQUESTS={'MAX_WORKERS': 4}):
+            response = client.post('/api/batch/', {'requests': requests}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['responses']
+        self.assertEqual([result['id'] for result in results], ['projects', 'project', 'missing', 'me'])
+        self.assertEqual([result['status'] for result in results], [200, 200, 404, 200])
+        self.assertEqual(results[3]['body']['username'], 'owner')
+
+
+class SyntheticDataTests(TestCase):
+    """create_test_data derives every timestamp from the seed and the base date"""
+
+    def generate(self, prefix):
+        call_command(
+            'create_test_data', users=3, projects_per_user=2, vacancies_per_project=2,
+            seed=7, base_date=date(2024, 6, 1), username_prefix=prefix, skip_sample=True,
+            stdout=StringIO(),
+        )
+        users = User.objects.filter(username__startswith=prefix).order_by('id')
+        projects = Project.objects.filter(owner__in=users).order_by('id')
+        vacancies = Vacancy.objects.filter(project__in=projects).order_by('id')
+        return users, projects, vacancies
+
+    def test_timestamps_follow_base_date(self):
+        users, projects, vacancies = self.generate('first')
+        base = datetime(2024, 6, 1, tzinfo=dt_timezone.utc)
+        self.assertTrue(projects and vacancies)
+        for user in users:
+            self.assertLessEqual(user.date_joined, base)
+        for project in projects:
+            self.assertLessEqual(project.owner.date_joined, project.created_at)
+            self.assertLessEqual(project.created_at, base)
+            self.assertEqual(project.created_at, project.updated_at)
+        for vacancy in vacancies:
+            self.assertLessEqual(vacancy.project.created_at, vacancy.created_at)
+            self.assertLessEqual(vacancy.created_at, base)
+
+    def test_same_seed_same_timestamps(self):
+        first_users, first_projects, first_vacancies = self.generate('first')
+        users, projects, vacancies = self.generate('second')
+        self.assertEqual([user.date_joined for user in users], [user.date_joined for user in first_users])
+        self.assertEqual(
+            [project.created_at for project in projects],
+            [project.created_at for project in first_projects]
+        )
+        self.assertEqual(
+            [vacancy.created_at for vacancy in vacancies],
+            [vacancy.created_at for vacancy in first_vacancies]
+        )
+
+
+class OpenApiSchemaTests(TestCase):
+    """The schema is rendered once, stored and served with ETags and gzip"""
+
+    RENDERED = {'yaml': b'openapi: 3.0.3\n', 'json': b'{"openapi": "3.0.3"}'}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings_override = override_settings(OPENAPI_SCHEMA={'DIRECTORY': self.directory, 'LIVE': False})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Documents are loaded once per process
+        schema._documents.clear()
+        self.addCleanup(schema._documents.clear)
+
+    def test_build_command(self):
+        call_command('build_openapi_schema', directory=self.directory, stdout=StringIO())
+        document = json.loads(schema.schema_path('json', self.directory).read_bytes())
+        self.assertIn('/api/projects/', document['paths'])
+        self.assertTrue(schema.schema_path('yaml', self.directory).exists())
+
+    def test_serves_stored_schema(self):
+        schema.write_schema(rendered=self.RENDERED)
+        with mock.patch.object(schema, 'render_schema') as render_schema:
+            response = self.client.get('/api/schema/', {'format': 'json'})
+        render_schema.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.RENDERED['json'])
+        self.assertIn('max-age=', response['Cache-Control'])
+
+    def test_generated_once_when_missing(self):
+        with mock.patch.object(schema, 'render_schema', return_value=self.RENDERED) as render_schema:
+            self.assertEqual(self.client.get('/api/schema/').content, self.RENDERED['yaml'])
+            self.assertEqual(self.client.get('/api/schema/').content, self.RENDERED['yaml'])
+        render_schema.assert_called_once()
+        self.assertEqual(schema.schema_path('yaml').read_bytes(), self.RENDERED['yaml'])
+
+    def test_etag_and_gzip(self):
+        schema.write_schema(rendered=self.RENDERED)
+        response = self.client.get('/api/schema/')
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertEqual(self.client.get('/api/schema/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.get('/api/schema/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(gzip.decompress(response.content), self.RENDERED['yaml'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_live(self):
+        with override_settings(OPENAPI_SCHEMA={'DIRECTORY': self.directory, 'LIVE': True}):
+            with mock.patch.object(schema, 'render_schema') as render_schema:
+                response = self.client.get('/api/schema/', {'format': 'json'})
+        render_schema.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/api/projects/', json.loads(response.content)['paths'])
+        self.assertFalse(schema.schema_path('json').exists())
+
+
+class RouteMiddlewareTests(TestCase):
+    """Browser middleware only runs outside of the token-authenticated routes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='testpass123')
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def passed_request(self, path):
+        """The request as seen by the view behind the session and auth middleware"""
+        requests = []
+        handler = middleware.SessionMiddleware(middleware.AuthenticationMiddleware(
+            lambda request: requests.append(request) or HttpResponse()
+        ))
+        handler(RequestFactory().get(path))
+        return requests[0]
+
+    def test_session_and_user_skipped_on_lean_routes(self):
+        for path, lean in (('/api/projects/', True), ('/auth/profile/', True),
+                           ('/api/docs/', False), ('/admin/', False)):
+            request = self.passed_request(path)
+            self.assertEqual(hasattr(request, 'session'), not lean, path)
+            self.assertEqual(hasattr(request, 'user'), not lean, path)
+
+    def test_api_response_has_no_browser_headers(self):
+        client = APIClient(enforce_csrf_checks=True)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response = client.post(
+            '/api/projects/', {'title': 'Project', 'description': 'Test project'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertFalse(response.cookies)
+        self.assertNotIn('X-Frame-Options', response)
+
+        response = client.post('/auth/logout/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.cookies)
+
+    def test_admin_keeps_full_stack(self):
+        response = self.client.get('/admin/login/')
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', response.cookies)
+
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.post('/admin/login/', {'username': 'owner', 'password': 'testpass123'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_bench_command(self):
+        output = StringIO()
+        call_command('bench_middleware', requests=20, rounds=1, stdout=output)
+        self.assertIn('lean middleware', output.getvalue())
+
+
+class TechnologyCatalogTests(TestCase):
+    """Project technologies are canonicalized and linked to the shared catalog"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='testpass123')
+        cls.token = Token.objects.create(user=cls.user)
+        javascript = Technology.objects.create(name='JavaScript', normalized='javascript')
+        TechnologyAlias.objects.create(technology=javascript, normalized='js')
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def create_project(self, technologies):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/projects/', {
+                'title': 'Project', 'description': 'Test project', 'technologies': technologies,
+            }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.data
+
+    def counts(self):
+        return dict(Technology.objects.filter(project_count__gt=0).values_list('name', 'project_count'))
+
+    def test_canonicalized_and_linked(self):
+        data = self.create_project(['Django', 'django ', 'DJango', 'js', ' Python  3 '])
+        self.assertEqual(data['technologies'], ['Django', 'JavaScript', 'Python 3'])
+        self.assertEqual(
+            set(ProjectTechnology.objects.filter(project_id=data['id'])
+                .values_list('technology__name', flat=True)),
+            {'Django', 'JavaScript', 'Python 3'}
+        )
+        # Later spellings reuse the catalog entry
+        self.assertEqual(self.create_project(['DJANGO'])['technologies'], ['Django'])
+        self.assertEqual(self.counts(), {'Django': 2, 'JavaScript': 1, 'Python 3': 1})
+
+    def test_counts_follow_updates_and_deletes(self):
+        data = self.create_project(['Django', 'React'])
+        url = f'/api/projects/{data["id"]}/'
+        response = self.client.patch(url, {'technologies': ['react', 'Go']}, format='json')
+        self.assertEqual(response.data['technologies'], ['React', 'Go'])
+        self.assertEqual(self.counts(), {'React': 1, 'Go': 1})
+
+        Project.objects.get(pk=data['id']).delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_backfill(self):
+        project = Project.objects.create(
+            title='Legacy', description='Test project', technologies=['vue', 'JS'], owner=self.user
+        )
+        self.assertFalse(ProjectTechnology.objects.filter(project=project).exists())
+        output = StringIO()
+        call_command('backfill_technologies', batch_size=1, stdout=output)
+        call_command('backfill_technologies', stdout=output)
+        self.assertEqual(
+            set(ProjectTechnology.objects.filter(project=project).values_list('technology__name', flat=True)),
+            {'vue', 'JavaScript'}
+        )
+        self.assertEqual(self.counts(), {'vue': 1, 'JavaScript': 1})
+
+    def test_autocomplete(self):
+        self.create_project(['Django', 'Django REST Framework', 'JavaScript'])
+        self.create_project(['Django', 'Go'])
+        Technology.objects.create(name='Dart', normalized='dart')  # not used by any project
+
+        def names(**params):
+            response = self.client.get('/api/technologies/', params)
+            self.assertEqual(response.status_code, 200)
+            return [row['name'] for row in response.data]
+
+        self.assertEqual(names(prefix='d'), ['Django', 'Django REST Framework'])
+        self.assertEqual(names(prefix='DJ', limit=1), ['Django'])
+        self.assertEqual(names(prefix='js'), ['JavaScript'])
+        # Infix matches only from three characters
+        self.assertEqual(names(prefix='res'), ['Django REST Framework'])
+        self.assertEqual(names(prefix='re'), [])
+        self.assertEqual(names(prefix=''), [])
+        self.assertEqual(self.client.get('/api/technologies/', {'prefix': 'd', 'limit': 'x'}).status_code, 400)
+
+    def test_public_feed_technology_filter(self):
+        data = self.create_project(['JavaScript'])
+        Vacancy.objects.create(
+            project_id=data['id'], title='Frontend Developer', description='Test', requirements='JS'
+        )
+        response = APIClient().get('/api/public/vacancies/', {'technology': 'js'})
+        self.assertEqual([row['title'] for row in response.data['results']], ['Frontend Developer'])
+        response = APIClient().get('/api/public/vacancies/', {'technology': 'cobol'})
+        self.assertEqual(response.data['results'], [])
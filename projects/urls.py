@@ -1,14 +1,20 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import streams, views
 
 # Create router and register ViewSets
 router = DefaultRouter()
 router.register(r'projects', views.ProjectViewSet, basename='project')
 router.register(r'vacancies', views.VacancyViewSet, basename='vacancy')
+router.register(r'public/vacancies', views.PublicVacancyViewSet, basename='public-vacancy')
+router.register(r'public/suggestions', views.SuggestionViewSet, basename='public-suggestion')
+router.register(r'changes', views.ChangeFeedViewSet, basename='change')
+router.register(r'technologies', views.TechnologyViewSet, basename='technology')
 
 # The API URLs are now determined automatically by the router.
 urlpatterns = [
+    path('events/ticket/', streams.EventTicketView.as_view(), name='event-stream-ticket'),
+    path('events/', streams.event_stream, name='event-stream'),
     path('', include(router.urls)),
 ]
 
@@ -24,10 +30,25 @@ urlpatterns = [
 # GET    /api/projects/{id}/vacancies/ - Get project vacancies
 # POST   /api/projects/{id}/vacancies/ - Create vacancy for project
 # GET    /api/projects/{id}/stats/   - Get project statistics
+# GET    /api/projects/{id}/similar/ - Get the owner's most similar projects
 #
 # Vacancy URLs:
 # GET    /api/vacancies/             - List all vacancies
 # GET    /api/vacancies/{id}/        - Get specific vacancy
 # PUT    /api/vacancies/{id}/        - Update vacancy (full)
 # PATCH  /api/vacancies/{id}/        - Update vacancy (partial)
-# DELETE /api/vacancies/{id}/        - Delete vacancy
\ No newline at end of file
+# DELETE /api/vacancies/{id}/        - Delete vacancy
+#
+# Change feed URLs:
+# GET    /api/changes/?since={seq}   - Changes (with tombstones) since a sequence token
+# POST   /api/events/ticket/         - Short-lived ticket for /api/events/?ticket=
+# GET    /api/events/                - Server-Sent Events stream of changes (ASGI only)
+#
+# Technology URLs:
+# GET    /api/technologies/?prefix=dj - Autocomplete technologies of the shared catalog
+#
+# Public URLs (no authentication):
+# GET    /api/public/vacancies/      - Search active vacancies of all owners
+# GET    /api/public/vacancies/{id}/ - Get specific active vacancy
+# GET    /api/public/vacancies/match/?skills=python,django - Active vacancies ranked for a skill list
+# GET    /api/public/suggestions/?prefix=py - Search-box suggestions (vacancy titles, technologies)
\ No newline at end of file
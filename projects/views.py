@@ -1,32 +1,149 @@
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from rest_framework.utils.encoders import JSONEncoder
+from django.contrib.postgres.search import SearchQuery
+from django.db.models import F, Prefetch, Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
-from .models import Project, Vacancy
+from throttling.throttles import PublicVacancyThrottle
+
+from .archive import BothTiers
+from .cache import cached_public_response, cached_response
+from .changes import (
+    get_changes,
+    get_config as get_change_feed_config,
+    latest_sequence,
+    pruned_through,
+    sequence_for_timestamp,
+    serialize_changes
+)
+from .deletion import delete_project, get_progress
+from .matching import MATCH_LIMIT, MAX_SKILLS, match_vacancies
+from .models import ArchivedVacancy, Project, Vacancy, vacancy_search_vector
+from .pagination import (
+    CachedCountPageNumberPagination,
+    PublicVacancyCursorPagination,
+    VacancyCursorPagination
+)
+from .permissions import ProjectAccess, VacancyAccess
 from .serializers import (
+    ArchivedVacancySerializer,
+    BothTiersVacancySerializer,
     ProjectSerializer,
     ProjectListSerializer,
+    PublicVacancySerializer,
+    SimilarProjectsSerializer,
+    SuggestionsSerializer,
+    TechnologySerializer,
+    VacancyMatchesSerializer,
     VacancySerializer,
     VacancyCreateSerializer
 )
+from .similarity import SIMILAR_LIMIT, similar_projects
+from .suggestions import KIND_TECHNOLOGY, KIND_TITLE, SUGGESTION_LIMIT, suggest
+from .technologies import AUTOCOMPLETE_LIMIT, autocomplete, lookup_technologies, normalize_name
+
 
+TIERS_CURRENT = 'current'
+TIERS_ARCHIVED = 'archived'
+TIERS_BOTH = 'both'
 
-class IsOwnerOrReadOnly(permissions.BasePermission):
+
+def requested_tiers(request):
+    """Vacancy tiers a list covers: ?archived=true both, ?archived=only the archive tier"""
+    value = request.query_params.get('archived', '').lower()
+    if value == 'only':
+        return TIERS_ARCHIVED
+    if value in ('true', '1', 'yes'):
+        return TIERS_BOTH
+    return TIERS_CURRENT
+
+
+ARCHIVED_PARAMETER = OpenApiParameter(
+    name='archived',
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    enum=['true', 'only'],
+    description=(
+        'Include archived vacancies (inactive for longer than the retention period), '
+        'every row flagged with `archived`, or (`only`) return just those'
+    )
+)
+
+
+def filter_vacancies(queryset, params):
     """
-    Custom permission to only allow owners of an object to edit it.
+    Apply the vacancy list filters (?project, ?employment_type, ?is_active)
+    to a Vacancy or ArchivedVacancy queryset
     """
+    project_id = params.get('project')
+    if project_id:
+        queryset = queryset.filter(project_id=project_id)
+
+    employment_type = params.get('employment_type')
+    if employment_type:
+        queryset = queryset.filter(employment_type=employment_type)
+
+    is_active = params.get('is_active')
+    if is_active is not None:
+        is_active_bool = is_active.lower() in ('true', '1', 'yes')
+        if queryset.model is ArchivedVacancy:
+            # Archived vacancies are inactive by definition
+            if is_active_bool:
+                queryset = queryset.none()
+        else:
+            queryset = queryset.filter(is_active=is_active_bool)
+
+    return queryset
+
+
+VACANCY_FILTER_PARAMETERS = [
+    OpenApiParameter(
+        name='employment_type',
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description='Filter by employment type (full-time, part-time, contract, freelance, internship)'
+    ),
+    OpenApiParameter(
+        name='is_active',
+        type=OpenApiTypes.BOOL,
+        location=OpenApiParameter.QUERY,
+        description='Filter by active status'
+    ),
+]
 
-    def has_object_permission(self, request, view, obj):
-        # Read permissions are allowed for any request,
-        # so we'll always allow GET, HEAD or OPTIONS requests.
-        if request.method in permissions.SAFE_METHODS:
-            return True
 
-        # Write permissions are only allowed to the owner of the project.
-        return obj.owner == request.user
+INCLUDE_PARAMETERS = [
+    OpenApiParameter(
+        name='include',
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description='Embed related data: "vacancies" adds a vacancies list to every project'
+    ),
+    OpenApiParameter(
+        name='vacancies.is_active',
+        type=OpenApiTypes.BOOL,
+        location=OpenApiParameter.QUERY,
+        description='With include=vacancies: only active (or inactive) vacancies'
+    ),
+    OpenApiParameter(
+        name='vacancies.limit',
+        type=OpenApiTypes.INT,
+        location=OpenApiParameter.QUERY,
+        description='With include=vacancies: newest N vacancies per project (max 100)'
+    ),
+]
 
 
 class ProjectViewSet(viewsets.ModelViewSet):
@@ -42,13 +159,112 @@ class ProjectViewSet(viewsets.ModelViewSet):
     - destroy: Delete a project
     """
     serializer_class = ProjectSerializer
-    permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    permission_classes = [permissions.IsAuthenticated, ProjectAccess]
+    pagination_class = CachedCountPageNumberPagination
+
+    # Allowed values of ?ordering= (prefix with "-" for descending order)
+    ORDERING_FIELDS = ('deadline', 'budget', 'created_at')
+    # Actions serializing vacancies_count, annotated by the database
+    COUNT_VACANCIES_ACTIONS = ('list', 'retrieve', 'update', 'partial_update')
+    # Related data that can be embedded with ?include=
+    INCLUDE_OPTIONS = ('vacancies',)
+    INCLUDE_VACANCIES_MAX_LIMIT = 100
 
     def get_queryset(self):
         """
-        Return projects owned by the current user only
+        Return projects the current user can access (owned ones)
+        """
+        queryset = ProjectAccess().filter_queryset(
+            self.request.user, Project.objects.all()
+        ).with_deadline_info().select_related('owner')
+
+        if self.action not in self.COUNT_VACANCIES_ACTIONS:
+            # e.g. the vacancies action: nothing to count
+            return queryset
+
+        queryset = queryset.with_vacancies_count()
+        if self.action in ('list', 'retrieve'):
+            vacancies = self.get_included_vacancies()
+            if vacancies is not None:
+                # One extra query for all projects, limited per project by a window function
+                queryset = queryset.prefetch_related(
+                    Prefetch('vacancies', queryset=vacancies, to_attr='included_vacancies')
+                )
+        return queryset
+
+    def get_included_vacancies(self):
+        """
+        Vacancy queryset for ?include=vacancies, or None when not requested
+
+        Supports ``vacancies.is_active=true|false`` and ``vacancies.limit=N``
+        (per project).
+        """
+        params = self.request.query_params
+        include = {value for value in params.get('include', '').split(',') if value}
+        unknown = include - set(self.INCLUDE_OPTIONS)
+        if unknown:
+            raise ValidationError({
+                'include': f"Invalid include. Choose from: {', '.join(self.INCLUDE_OPTIONS)}."
+            })
+        if 'vacancies' not in include:
+            return None
+
+        vacancies = Vacancy.objects.all()
+        is_active = params.get('vacancies.is_active')
+        if is_active is not None:
+            vacancies = vacancies.filter(is_active=is_active.lower() in ('true', '1', 'yes'))
+
+        limit = params.get('vacancies.limit')
+        if limit:
+            if not limit.isdigit() or not 1 <= int(limit) <= self.INCLUDE_VACANCIES_MAX_LIMIT:
+                raise ValidationError({
+                    'vacancies.limit': f'A number between 1 and {self.INCLUDE_VACANCIES_MAX_LIMIT} is required.'
+                })
+            # Sliced prefetch: Django applies ROW_NUMBER() OVER (PARTITION BY project)
+            vacancies = vacancies[:int(limit)]
+        return vacancies
+
+    @staticmethod
+    def _parse_date(params, name):
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError({name: 'Date has wrong format. Use YYYY-MM-DD.'})
+
+    def filter_list_queryset(self, queryset):
+        """
+        Apply deadline filters and ordering from the query string
         """
-        return Project.objects.filter(owner=self.request.user).select_related('owner').prefetch_related('vacancies')
+        params = self.request.query_params
+
+        overdue = params.get('overdue')
+        if overdue is not None:
+            queryset = queryset.overdue(overdue.lower() in ('true', '1', 'yes'))
+
+        deadline_before = self._parse_date(params, 'deadline_before')
+        if deadline_before:
+            queryset = queryset.filter(deadline__lte=deadline_before)
+
+        deadline_after = self._parse_date(params, 'deadline_after')
+        if deadline_after:
+            queryset = queryset.filter(deadline__gte=deadline_after)
+
+        ordering = params.get('ordering')
+        if ordering:
+            field = ordering.lstrip('-')
+            if field not in self.ORDERING_FIELDS:
+                raise ValidationError({
+                    'ordering': f"Invalid ordering. Choose from: {', '.join(self.ORDERING_FIELDS)}."
+                })
+            if ordering.startswith('-'):
+                queryset = queryset.order_by(F(field).desc(nulls_last=True), '-id')
+            else:
+                queryset = queryset.order_by(F(field).asc(nulls_last=True), 'id')
+
+        return queryset
 
     def get_serializer_class(self):
         """
@@ -61,11 +277,47 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @extend_schema(
         summary="List all projects",
         description="Get a list of all projects owned by the authenticated user",
+        parameters=[
+            OpenApiParameter(
+                name='overdue',
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description='Filter by overdue status (deadline in the past)'
+            ),
+            OpenApiParameter(
+                name='deadline_before',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description='Projects with a deadline on or before this date'
+            ),
+            OpenApiParameter(
+                name='deadline_after',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description='Projects with a deadline on or after this date'
+            ),
+            OpenApiParameter(
+                name='ordering',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Order by deadline, budget or created_at (prefix with "-" for descending)'
+            ),
+            *INCLUDE_PARAMETERS
+        ],
         responses={200: ProjectListSerializer(many=True)}
     )
+    @cached_response
     def list(self, request, *args, **kwargs):
         """List all projects for the authenticated user"""
-        return super().list(request, *args, **kwargs)
+        queryset = self.filter_list_queryset(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
 
     @extend_schema(
         summary="Create a new project",
@@ -79,8 +331,10 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @extend_schema(
         summary="Get project details",
         description="Retrieve detailed information about a specific project",
+        parameters=INCLUDE_PARAMETERS,
         responses={200: ProjectSerializer}
     )
+    @cached_response
     def retrieve(self, request, *args, **kwargs):
         """Get a specific project"""
         return super().retrieve(request, *args, **kwargs)
@@ -105,27 +359,132 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
     @extend_schema(
         summary="Delete project",
-        description="Delete a project and all associated vacancies",
-        responses={204: None}
+        description=(
+            "Delete a project and all associated vacancies. Small projects are deleted "
+            "immediately (204); large ones are hidden at once and deleted in the background (202)."
+        ),
+        responses={204: None, 202: {
+            'type': 'object',
+            'properties': {
+                'status': {'type': 'string'},
+                'progress_url': {'type': 'string', 'format': 'uri'},
+                'job_url': {'type': 'string', 'format': 'uri'}
+            }
+        }}
     )
     def destroy(self, request, *args, **kwargs):
         """Delete a project"""
-        return super().destroy(request, *args, **kwargs)
+        project = self.get_object()
+        job = delete_project(project, owner=request.user)
+        if job is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        data = {
+            'status': 'pending',
+            'progress_url': reverse('project-deletion-status', kwargs={'pk': project.pk}, request=request)
+        }
+        if hasattr(job, 'pk'):
+            data['job_url'] = reverse('job-detail', kwargs={'pk': job.pk}, request=request)
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+    @extend_schema(
+        summary="Get project deletion progress",
+        description="Progress of a background project deletion started by DELETE /api/projects/{id}/",
+        responses={200: {
+            'type': 'object',
+            'properties': {
+                'status': {'type': 'string', 'enum': ['pending', 'deleting', 'deleted']},
+                'deleted': {'type': 'integer'},
+                'total': {'type': 'integer', 'nullable': True}
+            }
+        }}
+    )
+    @action(detail=True, methods=['get'], url_path='deletion-status')
+    def deletion_status(self, request, pk=None):
+        """
+        Get the progress of a background deletion (the project itself is already hidden)
+        """
+        try:
+            progress = get_progress(int(pk))
+        except (TypeError, ValueError):
+            progress = None
+        if not progress or progress['owner_id'] != request.user.pk:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'status': progress['status'],
+            'deleted': progress['deleted'],
+            'total': progress['total']
+        })
 
     @extend_schema(
         summary="Get project vacancies",
-        description="Get all vacancies for this project",
+        description=(
+            "Get the vacancies of this project, paginated like /api/vacancies/. "
+            "Pass cursor=<token> (or cursor= for the first page) for keyset pagination, "
+            "or stream=true to stream the complete list as one JSON array."
+        ),
+        parameters=[
+            *VACANCY_FILTER_PARAMETERS,
+            ARCHIVED_PARAMETER,
+            OpenApiParameter(
+                name='cursor',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Use keyset pagination (empty value for the first page)'
+            ),
+            OpenApiParameter(
+                name='stream',
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description='Stream all matching vacancies without pagination'
+            )
+        ],
         responses={200: VacancySerializer(many=True)}
     )
     @action(detail=True, methods=['get'])
+    @cached_response
     def vacancies(self, request, pk=None):
         """
-        Get all vacancies for this project
+        Get the vacancies of this project
         """
         project = self.get_object()
-        vacancies = project.vacancies.all()
-        serializer = VacancySerializer(vacancies, many=True)
-        return Response(serializer.data)
+        # The related manager attaches the loaded project to every row, so
+        # project_title needs neither a join nor a query per vacancy
+        current = filter_vacancies(project.vacancies.all(), request.query_params)
+        archived = filter_vacancies(project.archived_vacancies.all(), request.query_params)
+        tiers = requested_tiers(request)
+        if tiers == TIERS_BOTH:
+            queryset, serializer_class = BothTiers(current, archived), BothTiersVacancySerializer
+        elif tiers == TIERS_ARCHIVED:
+            queryset, serializer_class = archived, ArchivedVacancySerializer
+        else:
+            queryset, serializer_class = current, VacancySerializer
+
+        if request.query_params.get('stream', '').lower() in ('true', '1', 'yes'):
+            return StreamingHttpResponse(
+                self._stream_json_array(queryset, serializer_class()),
+                content_type='application/json'
+            )
+
+        if 'cursor' in request.query_params:
+            paginator = VacancyCursorPagination()
+        else:
+            paginator = self.paginator
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        if isinstance(queryset, BothTiers):
+            page = queryset.rows(page)
+        serializer = serializer_class(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @staticmethod
+    def _stream_json_array(queryset, serializer, chunk_size=500):
+        """Serialize rows one by one while they are fetched in chunks"""
+        encoder = JSONEncoder()
+        yield '['
+        for index, obj in enumerate(queryset.iterator(chunk_size=chunk_size)):
+            yield (',' if index else '') + encoder.encode(serializer.to_representation(obj))
+        yield ']'
 
     @extend_schema(
         summary="Create project vacancy",
@@ -148,6 +507,52 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(
+        summary="Get similar projects",
+        description=(
+            "Other projects of the owner ranked by the cosine similarity of their title, "
+            "description and technologies (precomputed TF-IDF index)"
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description=f'Number of projects (default {SIMILAR_LIMIT}, max 50)'
+            )
+        ],
+        responses={
+            200: SimilarProjectsSerializer,
+            503: {'description': 'The similarity index has not been built yet'}
+        }
+    )
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        Get the projects most similar to this one
+        """
+        project = self.get_object()
+        limit = request.query_params.get('limit', '')
+        if limit and not limit.isdigit():
+            raise ValidationError({'limit': 'A positive integer is required.'})
+
+        neighbours = similar_projects(project, int(limit) if limit else SIMILAR_LIMIT)
+        if neighbours is None:
+            return Response(
+                {'detail': 'The similarity index has not been built yet.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        # Readable projects only: the index may lag behind deletions
+        projects = self.get_queryset().with_vacancies_count().in_bulk(
+            [project_id for project_id, score in neighbours]
+        )
+        context = self.get_serializer_context()
+        return Response({'results': [
+            {'score': score, 'project': ProjectListSerializer(projects[project_id], context=context).data}
+            for project_id, score in neighbours
+            if project_id in projects
+        ]})
+
     @extend_schema(
         summary="Get project statistics",
         description="Get project statistics including technology counts and vacancy statistics",
@@ -157,6 +562,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 'total_technologies': {'type': 'integer'},
                 'total_vacancies': {'type': 'integer'},
                 'active_vacancies': {'type': 'integer'},
+                'archived_vacancies': {'type': 'integer'},
                 'is_overdue': {'type': 'boolean'},
                 'days_until_deadline': {'type': 'integer', 'nullable': True}
             }
@@ -169,20 +575,21 @@ class ProjectViewSet(viewsets.ModelViewSet):
         """
         project = self.get_object()
         vacancies = project.vacancies.all()
+        # Archived vacancies are inactive but still part of the project's history
+        archived_count = project.archived_vacancies.count()
 
         stats_data = {
             'total_technologies': project.technologies_count,
-            'total_vacancies': vacancies.count(),
+            'total_vacancies': vacancies.count() + archived_count,
             'active_vacancies': vacancies.filter(is_active=True).count(),
-            'is_overdue': project.is_overdue,
+            'archived_vacancies': archived_count,
+            'is_overdue': project.overdue,
             'days_until_deadline': None
         }
 
-        # Calculate days until deadline
-        if project.deadline:
-            from django.utils import timezone
-            delta = project.deadline - timezone.now().date()
-            stats_data['days_until_deadline'] = delta.days
+        # Days until deadline, computed by the database (see with_deadline_info)
+        if project.time_until_deadline is not None:
+            stats_data['days_until_deadline'] = project.time_until_deadline.days
 
         return Response(stats_data)
 
@@ -199,37 +606,32 @@ class VacancyViewSet(viewsets.ModelViewSet):
     - destroy: Delete a vacancy
     """
     serializer_class = VacancySerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, VacancyAccess]
+    pagination_class = CachedCountPageNumberPagination
 
     def get_queryset(self):
         """
-        Return vacancies for projects owned by the current user only
-        """
-        return Vacancy.objects.filter(
-            project__owner=self.request.user
-        ).select_related('project')
-
-    def get_permissions(self):
-        """
-        Instantiate and return the list of permissions that this view requires.
+        Return vacancies of projects the current user can access
         """
-        if self.action in ['update', 'partial_update', 'destroy']:
-            # Only project owners can modify vacancies
-            permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
-        else:
-            permission_classes = [permissions.IsAuthenticated]
+        if self.action == 'list' and requested_tiers(self.request) == TIERS_ARCHIVED:
+            return self.get_tier_queryset(ArchivedVacancy)
+        return self.get_tier_queryset(Vacancy)
 
-        return [permission() for permission in permission_classes]
+    def get_tier_queryset(self, model):
+        """Accessible rows of one tier (Vacancy or ArchivedVacancy)"""
+        return VacancyAccess().filter_queryset(
+            self.request.user,
+            model.objects.filter(project__deletion_pending=False)
+        ).select_related('project')
 
-    def check_object_permissions(self, request, obj):
-        """
-        Check object-level permissions for vacancy operations
-        """
-        # For vacancies, check if user owns the project
-        if hasattr(obj, 'project'):
-            if obj.project.owner != request.user:
-                self.permission_denied(request, message="You can only access vacancies from your own projects.")
-        return super().check_object_permissions(request, obj)
+    def get_serializer_class(self):
+        if self.action == 'list':
+            tiers = requested_tiers(self.request)
+            if tiers == TIERS_BOTH:
+                return BothTiersVacancySerializer
+            if tiers == TIERS_ARCHIVED:
+                return ArchivedVacancySerializer
+        return VacancySerializer
 
     @extend_schema(
         summary="List all vacancies",
@@ -241,44 +643,31 @@ class VacancyViewSet(viewsets.ModelViewSet):
                 location=OpenApiParameter.QUERY,
                 description='Filter vacancies by project ID'
             ),
-            OpenApiParameter(
-                name='employment_type',
-                type=OpenApiTypes.STR,
-                location=OpenApiParameter.QUERY,
-                description='Filter by employment type (full-time, part-time, contract, freelance, internship)'
-            ),
-            OpenApiParameter(
-                name='is_active',
-                type=OpenApiTypes.BOOL,
-                location=OpenApiParameter.QUERY,
-                description='Filter by active status'
-            )
+            *VACANCY_FILTER_PARAMETERS,
+            ARCHIVED_PARAMETER
         ],
         responses={200: VacancySerializer(many=True)}
     )
+    @cached_response
     def list(self, request, *args, **kwargs):
         """List vacancies with optional filtering"""
-        queryset = self.get_queryset()
-
-        # Apply filters
-        project_id = request.query_params.get('project')
-        if project_id:
-            queryset = queryset.filter(project_id=project_id)
-
-        employment_type = request.query_params.get('employment_type')
-        if employment_type:
-            queryset = queryset.filter(employment_type=employment_type)
-
-        is_active = request.query_params.get('is_active')
-        if is_active is not None:
-            is_active_bool = is_active.lower() in ('true', '1', 'yes')
-            queryset = queryset.filter(is_active=is_active_bool)
+        if requested_tiers(request) == TIERS_BOTH:
+            queryset = BothTiers(*(
+                filter_vacancies(self.get_tier_queryset(model), request.query_params)
+                for model in (Vacancy, ArchivedVacancy)
+            ))
+        else:
+            queryset = filter_vacancies(self.get_queryset(), request.query_params)
 
         page = self.paginate_queryset(queryset)
         if page is not None:
+            if isinstance(queryset, BothTiers):
+                page = queryset.rows(page)
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
 
+        if isinstance(queryset, BothTiers):
+            queryset = queryset.rows(list(queryset))
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -287,6 +676,7 @@ class VacancyViewSet(viewsets.ModelViewSet):
         description="Retrieve detailed information about a specific vacancy",
         responses={200: VacancySerializer}
     )
+    @cached_response
     def retrieve(self, request, *args, **kwargs):
         """Get a specific vacancy"""
         return super().retrieve(request, *args, **kwargs)
@@ -316,4 +706,425 @@ class VacancyViewSet(viewsets.ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         """Delete a vacancy"""
-        return super().destroy(request, *args, **kwargs)
\ No newline at end of file
+        return super().destroy(request, *args, **kwargs)
+
+
+class PublicVacancyViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Public, read-only feed of active vacancies across all owners.
+
+    Anonymous access, keyset (cursor) pagination and shared response caching
+    make it safe to serve to job boards at high request rates.
+    """
+    serializer_class = PublicVacancySerializer
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+    throttle_classes = [PublicVacancyThrottle]
+    pagination_class = PublicVacancyCursorPagination
+
+    def get_queryset(self):
+        """
+        Return active vacancies of all projects
+        """
+        return Vacancy.objects.filter(
+            is_active=True,
+            project__deletion_pending=False
+        ).select_related('project').defer(
+            'project__description',
+            'project__metadata'
+        )
+
+    @staticmethod
+    def _parse_decimal(params, name):
+        value = params.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            result = Decimal(value)
+        except InvalidOperation:
+            raise ValidationError({name: 'A valid number is required.'})
+        # NaN and Infinity parse fine but cannot be compared with a salary
+        if not result.is_finite():
+            raise ValidationError({name: 'A valid number is required.'})
+        return result
+
+    def filter_queryset(self, queryset):
+        params = self.request.query_params
+
+        employment_types = [value for value in params.get('employment_type', '').split(',') if value]
+        if employment_types:
+            queryset = queryset.filter(employment_type__in=employment_types)
+
+        # Salary range overlap: vacancies without any salary are excluded
+        salary_min = self._parse_decimal(params, 'salary_min')
+        salary_max = self._parse_decimal(params, 'salary_max')
+        if salary_min is not None or salary_max is not None:
+            queryset = queryset.exclude(salary_min__isnull=True, salary_max__isnull=True)
+        if salary_min is not None:
+            queryset = queryset.filter(Q(salary_max__gte=salary_min) | Q(salary_max__isnull=True))
+        if salary_max is not None:
+            queryset = queryset.filter(Q(salary_min__lte=salary_max) | Q(salary_min__isnull=True))
+
+        technology = params.get('technology')
+        if technology:
+            # Catalog lookup: any spelling or alias, answered by the link table index
+            match = lookup_technologies([technology]).get(normalize_name(technology))
+            if match is None:
+                return queryset.none()
+            queryset = queryset.filter(project__technology_links__technology=match)
+
+        search = params.get('q')
+        if search:
+            # Same expression as the GIN index, so PostgreSQL can use it
+            queryset = queryset.alias(search=vacancy_search_vector()).filter(
+                search=SearchQuery(search, config='english', search_type='websearch')
+            )
+
+        return super().filter_queryset(queryset)
+
+    @extend_schema(
+        summary="Search public vacancies",
+        description="Public feed of active vacancies across all projects, with keyset pagination",
+        parameters=[
+            OpenApiParameter(
+                name='employment_type',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Comma-separated employment types (full-time, part-time, contract, freelance, internship)'
+            ),
+            OpenApiParameter(
+                name='salary_min',
+                type=OpenApiTypes.NUMBER,
+                location=OpenApiParameter.QUERY,
+                description='Lower bound of the wanted salary range (matches overlapping vacancy ranges)'
+            ),
+            OpenApiParameter(
+                name='salary_max',
+                type=OpenApiTypes.NUMBER,
+                location=OpenApiParameter.QUERY,
+                description='Upper bound of the wanted salary range (matches overlapping vacancy ranges)'
+            ),
+            OpenApiParameter(
+                name='technology',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Technology used by the vacancy project (any spelling or alias)'
+            ),
+            OpenApiParameter(
+                name='q',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Full-text search in vacancy title and requirements'
+            )
+        ],
+        responses={200: PublicVacancySerializer(many=True)},
+        tags=['Public']
+    )
+    @cached_public_response
+    def list(self, request, *args, **kwargs):
+        """List active vacancies of all owners"""
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        summary="Match vacancies to skills",
+        description=(
+            "Active vacancies ranked by how many of the candidate's skills they ask for, "
+            "through their project technologies or requirements. Rare skills weigh more."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='skills',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description=f'Comma-separated skills of the candidate (up to {MAX_SKILLS}), e.g. "Python,Django,Docker"'
+            ),
+            OpenApiParameter(
+                name='employment_type',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Comma-separated employment types (full-time, part-time, contract, freelance, internship)'
+            ),
+            OpenApiParameter(
+                name='salary_min',
+                type=OpenApiTypes.NUMBER,
+                location=OpenApiParameter.QUERY,
+                description='Lower bound of the wanted salary range (matches overlapping vacancy ranges)'
+            ),
+            OpenApiParameter(
+                name='salary_max',
+                type=OpenApiTypes.NUMBER,
+                location=OpenApiParameter.QUERY,
+                description='Upper bound of the wanted salary range (matches overlapping vacancy ranges)'
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description=f'Number of vacancies (default {MATCH_LIMIT}, max 50)'
+            )
+        ],
+        responses={200: VacancyMatchesSerializer},
+        tags=['Public']
+    )
+    @action(detail=False, methods=['get'])
+    @cached_public_response
+    def match(self, request):
+        """Rank active vacancies for a candidate's skills"""
+        params = request.query_params
+        skills = [skill for skill in params.get('skills', '').split(',') if skill.strip()]
+        if not skills:
+            raise ValidationError({'skills': 'A comma-separated list of skills is required.'})
+        if len(skills) > MAX_SKILLS:
+            raise ValidationError({'skills': f'At most {MAX_SKILLS} skills are allowed.'})
+        limit = params.get('limit', '')
+        if limit and not limit.isdigit():
+            raise ValidationError({'limit': 'A positive integer is required.'})
+        salary_min = self._parse_decimal(params, 'salary_min')
+        salary_max = self._parse_decimal(params, 'salary_max')
+
+        matches = match_vacancies(
+            skills,
+            employment_types=[value for value in params.get('employment_type', '').split(',') if value],
+            salary_min=float(salary_min) if salary_min is not None else None,
+            salary_max=float(salary_max) if salary_max is not None else None,
+            limit=int(limit) if limit else MATCH_LIMIT
+        )
+        # The index may lag behind by a few seconds, only current vacancies are returned
+        vacancies = self.get_queryset().in_bulk([vacancy_id for vacancy_id, score, matched in matches])
+        return Response({'results': [
+            {
+                'score': score,
+                'matched_skills': matched,
+                'vacancy': self.get_serializer(vacancies[vacancy_id]).data
+            }
+            for vacancy_id, score, matched in matches
+            if vacancy_id in vacancies
+        ]})
+
+    @extend_schema(
+        summary="Get public vacancy details",
+        description="Retrieve an active vacancy by ID",
+        responses={200: PublicVacancySerializer},
+        tags=['Public']
+    )
+    @cached_public_response
+    def retrieve(self, request, *args, **kwargs):
+        """Get a specific active vacancy"""
+        return super().retrieve(request, *args, **kwargs)
+
+
+class ChangeFeedViewSet(viewsets.ViewSet):
+    """
+    Incremental change feed of the user's projects and vacancies.
+
+    Clients pass the ``next_since`` token of their previous call and receive
+    the objects changed since then, with tombstones for deletions.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _resolve_since(self, request):
+        params = request.query_params
+        since = params.get('since')
+        updated_since = params.get('updated_since')
+
+        if since == 'latest':
+            return latest_sequence(request.user.pk)
+        if since:
+            if not since.isdigit():
+                raise ValidationError({'since': 'A sequence token (integer) or "latest" is required.'})
+            return int(since)
+        if updated_since:
+            timestamp = parse_datetime(updated_since)
+            if timestamp is None:
+                raise ValidationError({'updated_since': 'Datetime has wrong format. Use ISO 8601.'})
+            retention = timedelta(days=get_change_feed_config()['RETENTION_DAYS'])
+            if timestamp < timezone.now() - retention:
+                # Possibly pruned history: 0 is answered with 410 once pruning ran
+                return 0
+            return sequence_for_timestamp(request.user.pk, timestamp)
+        return 0
+
+    def _resolve_limit(self, request):
+        config = get_change_feed_config()
+        limit = request.query_params.get('limit')
+        if not limit:
+            return config['PAGE_SIZE']
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValidationError({'limit': 'A positive integer is required.'})
+        return min(int(limit), config['MAX_PAGE_SIZE'])
+
+    @extend_schema(
+        summary="Get changes since a sequence token",
+        description=(
+            "Projects and vacancies created, updated or deleted after the given token, "
+            "ordered by sequence. Deleted objects are returned as tombstones (data is null); "
+            "a project tombstone also removes all of its vacancies. "
+            "Responds 410 when the token is older than the retained history."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='since',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description='Sequence token from a previous response (next_since), or "latest"'
+            ),
+            OpenApiParameter(
+                name='updated_since',
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description='Alternative to since: changes made at or after this time'
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Maximum number of events per response'
+            )
+        ],
+        responses={200: {
+            'type': 'object',
+            'properties': {
+                'changes': {'type': 'array', 'items': {
+                    'type': 'object',
+                    'properties': {
+                        'seq': {'type': 'integer'},
+                        'type': {'type': 'string', 'enum': ['project', 'vacancy']},
+                        'id': {'type': 'integer'},
+                        'action': {'type': 'string', 'enum': ['upsert', 'delete']},
+                        'data': {'type': 'object', 'nullable': True}
+                    }
+                }},
+                'next_since': {'type': 'integer'},
+                'has_more': {'type': 'boolean'}
+            }
+        }, 410: None},
+        tags=['Changes']
+    )
+    def list(self, request):
+        """Get changes of the user's projects and vacancies"""
+        since = self._resolve_since(request)
+        limit = self._resolve_limit(request)
+
+        if since < pruned_through():
+            return Response(
+                {'detail': 'Changes since this token are no longer available, download the lists again.'},
+                status=status.HTTP_410_GONE
+            )
+
+        events, next_since, has_more = get_changes(request.user.pk, since, limit)
+        return Response({
+            'changes': serialize_changes(request.user, events),
+            'next_since': next_since,
+            'has_more': has_more
+        })
+
+
+class TechnologyViewSet(viewsets.ViewSet):
+    """
+    Autocomplete over the shared technology catalog.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="Autocomplete technologies",
+        description=(
+            "Technologies used by projects whose name or alias starts with the prefix "
+            "(case-insensitive), most used first. Prefixes of 3+ characters also match inside names."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='prefix',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='Beginning of the technology name, e.g. "dja"'
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description=f'Number of suggestions (default {AUTOCOMPLETE_LIMIT}, max 50)'
+            )
+        ],
+        responses={200: TechnologySerializer(many=True)},
+        tags=['Technologies']
+    )
+    def list(self, request):
+        """Suggest catalog technologies for a prefix"""
+        prefix = request.query_params.get('prefix', '')
+        limit = request.query_params.get('limit', '')
+        if limit and not limit.isdigit():
+            raise ValidationError({'limit': 'A positive integer is required.'})
+        technologies = autocomplete(prefix, int(limit) if limit else AUTOCOMPLETE_LIMIT)
+        response = Response(TechnologySerializer(technologies, many=True).data)
+        # Every keystroke asks again, let the browser reuse answers for a while
+        response['Cache-Control'] = 'private, max-age=60'
+        return response
+
+
+class SuggestionViewSet(viewsets.ViewSet):
+    """
+    Search-box suggestions for the public vacancy feed.
+
+    Answered from the per-process prefix index (see suggestions.py), so a
+    request per keystroke costs no database query.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    # ?type= value -> response key
+    KINDS = {KIND_TITLE: 'titles', KIND_TECHNOLOGY: 'technologies'}
+
+    @extend_schema(
+        summary="Suggest vacancy titles and technologies",
+        description=(
+            "Distinct titles of active vacancies and technologies used by projects that start "
+            "with the prefix (case-insensitive), most frequent first."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='prefix',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='What was typed so far, e.g. "senior py"'
+            ),
+            OpenApiParameter(
+                name='type',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                enum=list(KINDS),
+                description='Only suggest titles or technologies (default both)'
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description=f'Suggestions per type (default {SUGGESTION_LIMIT}, max 50)'
+            )
+        ],
+        responses={200: SuggestionsSerializer},
+        tags=['Public']
+    )
+    def list(self, request):
+        """Suggest titles and technologies for a prefix"""
+        params = request.query_params
+        kind = params.get('type')
+        if kind and kind not in self.KINDS:
+            raise ValidationError({'type': f'One of: {", ".join(self.KINDS)}.'})
+        limit = params.get('limit', '')
+        if limit and not limit.isdigit():
+            raise ValidationError({'limit': 'A positive integer is required.'})
+
+        suggestions = suggest(
+            params.get('prefix', ''),
+            kinds=(kind,) if kind else tuple(self.KINDS),
+            limit=int(limit) if limit else SUGGESTION_LIMIT
+        )
+        response = Response({
+            self.KINDS[name]: [{'text': text, 'count': count} for text, count in items]
+            for name, items in suggestions.items()
+        })
+        response['Cache-Control'] = 'public, max-age=60'
+        return response
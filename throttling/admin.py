@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import RateLimitBucket
+
+
+@admin.register(RateLimitBucket)
+class RateLimitBucketAdmin(admin.ModelAdmin):
+    list_display = ('key', 'scope', 'allowed', 'denied', 'updated_at')
+    list_filter = ('scope',)
+    search_fields = ('key',)
+    readonly_fields = ('level', 'previous', 'stamp', 'allowed', 'denied', 'updated_at')
@@ -0,0 +1,399 @@
+"""
+Rate limiters whose state is shared by all worker processes.
+
+Each client of a scope (an IP, a user or a login name) has one
+RateLimitBucket row. A request locks that row (SELECT ... FOR UPDATE),
+applies the scope's algorithm and writes it back in one short
+transaction, so every gunicorn worker sees the same counters without an
+external service.
+
+- ``token_bucket``: BURST requests at once, refilled at RATE.
+- ``sliding_window``: at most RATE requests in any window, approximated
+  from the current and previous fixed windows.
+
+Denials are answered without the database: once a client is over its
+limit, the process remembers until when it is blocked and counts the
+rejected requests in memory; the count is written with the next database
+decision for that client. A credential-stuffing burst therefore costs
+one row update per process and block, not one per request.
+
+High-volume scopes whose limit only guards against scraping (the public
+feed) set ``'STORAGE': 'local'``: their limiter state lives in the memory
+of each process, so the limit applies per worker process, and allowed
+and denied requests are only counted in memory. The counts are added to
+the clients' rows every ``FLUSH_SECONDS`` without locking them, which
+keeps those requests off the database write path.
+
+Configuration (settings.THROTTLING), one entry per scope:
+
+    THROTTLING = {
+        'ENABLED': True,
+        'RETENTION_HOURS': 24,    # idle buckets removed by throttle_stats --prune
+        'FLUSH_SECONDS': 10,      # counters of local scopes written this often
+        'SCOPES': {
+            'login': {'ALGORITHM': 'sliding_window', 'RATE': '20/min', 'KEY': 'ip'},
+            'batch': {'ALGORITHM': 'token_bucket', 'RATE': '60/min', 'BURST': 20, 'KEY': 'user'},
+            'feed': {'ALGORITHM': 'token_bucket', 'RATE': '300/min', 'BURST': 60, 'KEY': 'ip',
+                     'STORAGE': 'local'},
+        },
+    }
+
+KEY is ``ip``, ``user`` (anonymous requests fall back to the IP) or
+``username`` (the login name posted to the view). RATE is
+``<requests>/<sec|min|hour|day>``. STORAGE is ``database`` (the default)
+or ``local``.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'RETENTION_HOURS': 24,
+    'FLUSH_SECONDS': 10,
+    'SCOPES': {
+        # Per client address and per targeted account: spraying one account
+        # from many addresses is limited as well
+        'login': {'ALGORITHM': 'sliding_window', 'RATE': '20/min', 'KEY': 'ip'},
+        'login_account': {'ALGORITHM': 'sliding_window', 'RATE': '10/min', 'KEY': 'username'},
+        'register': {'ALGORITHM': 'sliding_window', 'RATE': '10/hour', 'KEY': 'ip'},
+        'change_password': {'ALGORITHM': 'token_bucket', 'RATE': '5/min', 'BURST': 3, 'KEY': 'user'},
+        'batch': {'ALGORITHM': 'token_bucket', 'RATE': '60/min', 'BURST': 20, 'KEY': 'user'},
+        # Anonymous and hit on every page load: limited per process
+        'public_vacancies': {
+            'ALGORITHM': 'token_bucket', 'RATE': '300/min', 'BURST': 60, 'KEY': 'ip', 'STORAGE': 'local',
+        },
+    },
+}
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+# Local blocks kept per process before expired ones are swept
+MAX_LOCAL_BLOCKS = 10000
+# Clients of local scopes kept per process before idle ones are dropped
+MAX_LOCAL_BUCKETS = 10000
+# A local bucket untouched this long is back to its initial state
+LOCAL_IDLE_SECONDS = 3600
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    overrides = getattr(settings, 'THROTTLING', {})
+    config.update(overrides)
+    config['SCOPES'] = {**DEFAULTS['SCOPES'], **overrides.get('SCOPES', {})}
+    return config
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60)"""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period.strip().lower()]
+
+
+class TokenBucket:
+    """``burst`` tokens, refilled continuously at ``limit`` per ``period``"""
+
+    def __init__(self, limit, period, burst=None):
+        self.refill_rate = limit / period
+        self.capacity = burst or limit
+
+    def initial(self, now):
+        return {'level': self.capacity, 'previous': 0, 'stamp': now}
+
+    def consume(self, bucket, now):
+        """Take one token; returns seconds to wait, 0 when allowed"""
+        elapsed = max(now - bucket.stamp, 0)
+        tokens = min(self.capacity, bucket.level + elapsed * self.refill_rate)
+        bucket.stamp = now
+        if tokens >= 1:
+            bucket.level = tokens - 1
+            return 0
+        bucket.level = tokens
+        return (1 - tokens) / self.refill_rate
+
+
+class SlidingWindow:
+    """
+    At most ``limit`` requests per ``period``: the previous window's count
+    is weighted by how much of it still overlaps the sliding window
+    """
+
+    def __init__(self, limit, period, burst=None):
+        self.limit = limit
+        self.period = period
+
+    def initial(self, now):
+        return {'level': 0, 'previous': 0, 'stamp': self._window_start(now)}
+
+    def _window_start(self, now):
+        return math.floor(now / self.period) * self.period
+
+    def consume(self, bucket, now):
+        """Count one request; returns seconds to wait, 0 when allowed"""
+        start = self._window_start(now)
+        if bucket.stamp != start:
+            bucket.previous = bucket.level if bucket.stamp == start - self.period else 0
+            bucket.level = 0
+            bucket.stamp = start
+
+        elapsed = now - start
+        weighted = bucket.previous * (1 - elapsed / self.period) + bucket.level
+        if weighted + 1 <= self.limit:
+            bucket.level += 1
+            return 0
+
+        if bucket.level + 1 <= self.limit:
+            # The previous window's share decays within this window
+            needed = self.period * (1 - (self.limit - 1 - bucket.level) / bucket.previous)
+            return max(needed - elapsed, 0.001)
+        # Not before the next window, once this window's share has decayed enough
+        needed = max(self.period * (1 - (self.limit - 1) / bucket.level), 0)
+        return self.period - elapsed + needed
+
+
+ALGORITHMS = {
+    'token_bucket': TokenBucket,
+    'sliding_window': SlidingWindow,
+}
+
+
+def get_limiter(scope_config):
+    limit, period = parse_rate(scope_config['RATE'])
+    return ALGORITHMS[scope_config.get('ALGORITHM', 'token_bucket')](
+        limit, period, scope_config.get('BURST')
+    )
+
+
+def bucket_key(scope, kind, identifier):
+    identifier = str(identifier)
+    if kind == 'username':
+        # Never store what was typed in a login form
+        identifier = hashlib.sha256(identifier.lower().encode('utf-8')).hexdigest()[:32]
+    return f'{scope}:{kind}:{identifier}'[:255]
+
+
+class LocalBlocks:
+    """Process-local memory of blocked keys and their uncounted denials"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks = {}
+
+    def check(self, key, now):
+        """Seconds the key stays blocked (counting the denial), or 0"""
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None or block[0] <= now:
+                return 0
+            block[1] += 1
+            return block[0] - now
+
+    def block(self, key, until, now):
+        with self._lock:
+            if len(self._blocks) >= MAX_LOCAL_BLOCKS:
+                self._blocks = {k: b for k, b in self._blocks.items() if b[0] > now}
+            self._blocks[key] = [until, 0]
+
+    def take_pending(self, key):
+        """Denials not yet written to the database"""
+        with self._lock:
+            block = self._blocks.pop(key, None)
+            return block[1] if block else 0
+
+    def pending_by_scope(self):
+        totals = {}
+        with self._lock:
+            for key, (until, pending) in self._blocks.items():
+                scope = key.split(':', 1)[0]
+                totals[scope] = totals.get(scope, 0) + pending
+        return totals
+
+
+local_blocks = LocalBlocks()
+
+
+class LocalBucket:
+    """Limiter state of one client of a local scope"""
+    __slots__ = ('level', 'previous', 'stamp', 'seen', 'denying')
+
+    def __init__(self, level, previous, stamp):
+        self.level = level
+        self.previous = previous
+        self.stamp = stamp
+        self.seen = 0
+        self.denying = False
+
+
+class LocalBuckets:
+    """
+    Process-local limiter state of local scopes, with the decisions counted
+    in memory until the next flush
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buckets = {}
+        self._counts = {}
+        self._flushed_at = time.monotonic()
+
+    def hit(self, key, scope, limiter, now):
+        """Apply the limiter; returns (seconds to wait, whether the client just got blocked)"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= MAX_LOCAL_BUCKETS:
+                    self._buckets = {
+                        k: b for k, b in self._buckets.items() if b.seen > now - LOCAL_IDLE_SECONDS
+                    }
+                bucket = self._buckets[key] = LocalBucket(**limiter.initial(now))
+            bucket.seen = now
+            wait = limiter.consume(bucket, now)
+            blocked = bool(wait) and not bucket.denying
+            bucket.denying = bool(wait)
+            counts = self._counts.setdefault(key, [scope, 0, 0])
+            counts[2 if wait else 1] += 1
+            return wait, blocked
+
+    def flush_due(self, interval):
+        return time.monotonic() - self._flushed_at >= interval
+
+    def flush(self):
+        """Add the counted decisions to the clients' rows, returns how many rows"""
+        # One thread flushes, the others keep counting
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                counts, self._counts = self._counts, {}
+                self._flushed_at = time.monotonic()
+            # One commit per flush; rows in key order, so concurrent flushes
+            # of other processes cannot deadlock with this one
+            with transaction.atomic():
+                for key, (scope, allowed, denied) in sorted(counts.items()):
+                    increments = {'allowed': F('allowed') + allowed, 'denied': F('denied') + denied}
+                    rows = RateLimitBucket.objects.filter(key=key)
+                    if rows.update(updated_at=timezone.now(), **increments):
+                        continue
+                    _, created = RateLimitBucket.objects.get_or_create(
+                        key=key, defaults={'scope': scope, 'allowed': allowed, 'denied': denied}
+                    )
+                    if not created:
+                        rows.update(updated_at=timezone.now(), **increments)
+            return len(counts)
+        finally:
+            self._flush_lock.release()
+
+    def pending_by_scope(self):
+        """{scope: (allowed, denied)} not yet flushed"""
+        totals = {}
+        with self._lock:
+            for scope, allowed, denied in self._counts.values():
+                total = totals.get(scope, (0, 0))
+                totals[scope] = (total[0] + allowed, total[1] + denied)
+        return totals
+
+
+local_buckets = LocalBuckets()
+
+
+def _hit_local(scope, key, scope_config, now):
+    wait, blocked = local_buckets.hit(key, scope, get_limiter(scope_config), now)
+    if local_buckets.flush_due(get_config()['FLUSH_SECONDS']):
+        try:
+            local_buckets.flush()
+        except DatabaseError:
+            # Counters only feed throttle_stats, the decision stands
+            logger.exception('Could not write the rate limit counters')
+    if blocked:
+        logger.warning('Rate limit exceeded for %s, blocked for %.1fs', key, wait)
+    return wait
+
+
+def hit(scope, kind, identifier, scope_config=None):
+    """
+    Record one request of a client in a scope.
+
+    Returns the number of seconds to wait before retrying, 0 when the
+    request is allowed.
+    """
+    scope_config = scope_config or get_config()['SCOPES'][scope]
+    key = bucket_key(scope, kind, identifier)
+    now = time.time()
+    if scope_config.get('STORAGE') == 'local':
+        return _hit_local(scope, key, scope_config, now)
+
+    wait = local_blocks.check(key, now)
+    if wait:
+        return wait
+
+    limiter = get_limiter(scope_config)
+    pending = local_blocks.take_pending(key)
+    try:
+        with transaction.atomic():
+            bucket, _ = RateLimitBucket.objects.select_for_update().get_or_create(
+                key=key, defaults={'scope': scope, **limiter.initial(now)}
+            )
+            wait = limiter.consume(bucket, now)
+            if wait:
+                bucket.denied += 1 + pending
+            else:
+                bucket.allowed += 1
+                bucket.denied += pending
+            bucket.save(update_fields=['level', 'previous', 'stamp', 'allowed', 'denied', 'updated_at'])
+    except DatabaseError:
+        # A limiter outage must not take the endpoints down with it
+        logger.exception('Rate limiter unavailable for %s, allowing the request', key)
+        return 0
+
+    if wait:
+        local_blocks.block(key, now + wait, now)
+        logger.warning('Rate limit exceeded for %s, blocked for %.1fs', key, wait)
+    return wait
+
+
+def get_throttle_stats():
+    """
+    Allowed/denied decisions per scope, across all processes (plus the
+    decisions this process has not written yet)
+    """
+    rows = (
+        RateLimitBucket.objects.order_by()
+        .values('scope')
+        .annotate(clients=Count('id'), allowed=Sum('allowed'), denied=Sum('denied'))
+    )
+    pending = local_blocks.pending_by_scope()
+    counted = local_buckets.pending_by_scope()
+    stats = {}
+    for row in rows:
+        allowed = row['allowed'] + counted.get(row['scope'], (0, 0))[0]
+        denied = row['denied'] + pending.get(row['scope'], 0) + counted.get(row['scope'], (0, 0))[1]
+        total = allowed + denied
+        stats[row['scope']] = {
+            'clients': row['clients'],
+            'allowed': allowed,
+            'denied': denied,
+            'denied_ratio': round(denied / total, 4) if total else None,
+        }
+    return stats
+
+
+def prune_buckets(hours=None):
+    """Remove buckets idle for RETENTION_HOURS, returns their count"""
+    hours = get_config()['RETENTION_HOURS'] if hours is None else hours
+    cutoff = timezone.now() - timedelta(hours=hours)
+    deleted, _ = RateLimitBucket.objects.filter(updated_at__lt=cutoff).delete()
+    return deleted
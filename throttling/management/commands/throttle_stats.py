@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from throttling.limiters import get_throttle_stats, prune_buckets
+
+
+class Command(BaseCommand):
+    help = 'Show rate limiter decisions per scope and optionally prune idle buckets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prune', action='store_true',
+            help='Delete buckets idle for longer than the retention period first'
+        )
+        parser.add_argument(
+            '--hours', type=int, default=None,
+            help='Retention period in hours (default: THROTTLING["RETENTION_HOURS"])'
+        )
+
+    def handle(self, *args, **options):
+        if options['prune']:
+            pruned = prune_buckets(hours=options['hours'])
+            self.stdout.write(self.style.SUCCESS(f'🧹 Pruned {pruned} idle bucket(s)'))
+
+        stats = get_throttle_stats()
+        if not stats:
+            self.stdout.write('No rate limiter decisions recorded')
+            return
+        for scope, row in stats.items():
+            ratio = f"{row['denied_ratio']:.1%}" if row['denied_ratio'] is not None else '-'
+            self.stdout.write(
+                f"🚦 {scope}: {row['allowed']} allowed, {row['denied']} denied ({ratio}) "
+                f"from {row['clients']} client(s)"
+            )
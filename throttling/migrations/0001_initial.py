@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='<scope>:<kind>:<identifier>', max_length=255, unique=True, verbose_name='Key')),
+                ('scope', models.CharField(max_length=50, verbose_name='Scope')),
+                ('level', models.FloatField(default=0, help_text='Token bucket: tokens left; sliding window: requests in the current window', verbose_name='Level')),
+                ('previous', models.FloatField(default=0, help_text='Sliding window: requests in the previous window', verbose_name='Previous Window')),
+                ('stamp', models.FloatField(default=0, help_text='Unix time of the last refill (token bucket) or current window start', verbose_name='Stamp')),
+                ('allowed', models.PositiveBigIntegerField(default=0, verbose_name='Allowed Requests')),
+                ('denied', models.PositiveBigIntegerField(default=0, verbose_name='Denied Requests')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Rate Limit Bucket',
+                'verbose_name_plural': 'Rate Limit Buckets',
+                'ordering': ['scope', 'key'],
+                'indexes': [models.Index(fields=['scope'], name='throttle_scope_idx'), models.Index(fields=['updated_at'], name='throttle_updated_idx')],
+            },
+        ),
+    ]
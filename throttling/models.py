@@ -0,0 +1,58 @@
+from django.db import models
+
+
+class RateLimitBucket(models.Model):
+    """
+    Limiter state of one client (IP, user or login name) for one scope,
+    shared by all worker processes through the database
+    """
+
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name="Key",
+        help_text="<scope>:<kind>:<identifier>"
+    )
+    scope = models.CharField(
+        max_length=50,
+        verbose_name="Scope"
+    )
+    level = models.FloatField(
+        default=0,
+        verbose_name="Level",
+        help_text="Token bucket: tokens left; sliding window: requests in the current window"
+    )
+    previous = models.FloatField(
+        default=0,
+        verbose_name="Previous Window",
+        help_text="Sliding window: requests in the previous window"
+    )
+    stamp = models.FloatField(
+        default=0,
+        verbose_name="Stamp",
+        help_text="Unix time of the last refill (token bucket) or current window start"
+    )
+    allowed = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Allowed Requests"
+    )
+    denied = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Denied Requests"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Updated At"
+    )
+
+    class Meta:
+        verbose_name = "Rate Limit Bucket"
+        verbose_name_plural = "Rate Limit Buckets"
+        ordering = ['scope', 'key']
+        indexes = [
+            models.Index(fields=['scope'], name='throttle_scope_idx'),
+            models.Index(fields=['updated_at'], name='throttle_updated_idx'),
+        ]
+
+    def __str__(self):
+        return self.key
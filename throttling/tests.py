@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .limiters import LocalBuckets, get_limiter, get_throttle_stats, hit, local_blocks, local_buckets
+from .models import RateLimitBucket
+
+LOCAL_SCOPE = {'ALGORITHM': 'token_bucket', 'RATE': '60/min', 'BURST': 2, 'KEY': 'ip', 'STORAGE': 'local'}
+SHARED_SCOPE = {'ALGORITHM': 'token_bucket', 'RATE': '60/min', 'BURST': 2, 'KEY': 'ip'}
+
+
+class LimiterTests(TestCase):
+
+    def setUp(self):
+        local_buckets.__init__()
+        local_blocks.__init__()
+
+    def test_database_scope_shares_bucket(self):
+        self.assertEqual(hit('shared', 'ip', '10.0.0.1', SHARED_SCOPE), 0)
+        self.assertEqual(hit('shared', 'ip', '10.0.0.1', SHARED_SCOPE), 0)
+        with self.assertLogs('throttling.limiters', 'WARNING'):
+            self.assertGreater(hit('shared', 'ip', '10.0.0.1', SHARED_SCOPE), 0)
+        bucket = RateLimitBucket.objects.get(key='shared:ip:10.0.0.1')
+        self.assertEqual((bucket.allowed, bucket.denied), (2, 1))
+
+    @override_settings(THROTTLING={'FLUSH_SECONDS': 3600})
+    def test_local_scope_skips_database(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(hit('feed', 'ip', '10.0.0.1', LOCAL_SCOPE), 0)
+            self.assertEqual(hit('feed', 'ip', '10.0.0.1', LOCAL_SCOPE), 0)
+            with self.assertLogs('throttling.limiters', 'WARNING') as logs:
+                self.assertGreater(hit('feed', 'ip', '10.0.0.1', LOCAL_SCOPE), 0)
+                self.assertGreater(hit('feed', 'ip', '10.0.0.1', LOCAL_SCOPE), 0)
+        self.assertEqual(len(queries), 0)
+        # Logged once per block, not per denial
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(local_buckets.pending_by_scope(), {'feed': (2, 2)})
+
+    def test_flush_adds_counts(self):
+        RateLimitBucket.objects.create(key='feed:ip:10.0.0.1', scope='feed', allowed=5, denied=1)
+        buckets = LocalBuckets()
+        limiter_scope = dict(LOCAL_SCOPE, BURST=10)
+        for address in ('10.0.0.1', '10.0.0.1', '10.0.0.2'):
+            buckets.hit(f'feed:ip:{address}', 'feed', get_limiter(limiter_scope), 1000.0)
+
+        self.assertEqual(buckets.flush(), 2)
+        self.assertEqual(buckets.pending_by_scope(), {})
+        counts = dict(RateLimitBucket.objects.values_list('key', 'allowed'))
+        self.assertEqual(counts, {'feed:ip:10.0.0.1': 7, 'feed:ip:10.0.0.2': 1})
+
+    @override_settings(THROTTLING={'FLUSH_SECONDS': 3600})
+    def test_stats_include_unflushed_counts(self):
+        RateLimitBucket.objects.create(key='feed:ip:10.0.0.1', scope='feed', allowed=5)
+        hit('feed', 'ip', '10.0.0.1', LOCAL_SCOPE)
+        self.assertEqual(get_throttle_stats()['feed']['allowed'], 6)
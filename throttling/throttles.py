@@ -0,0 +1,78 @@
+"""
+DRF throttle classes backed by the shared limiters (see limiters.py).
+
+A throttle class names the scopes it applies; every scope is checked in
+order and the first one over its limit rejects the request with
+429 Too Many Requests and a ``Retry-After`` header:
+
+    @api_view(['POST'])
+    @throttle_classes([LoginThrottle])
+    def login_view(request):
+        ...
+"""
+
+import math
+
+from rest_framework.throttling import BaseThrottle
+
+from .limiters import get_config, hit
+
+
+class SharedRateThrottle(BaseThrottle):
+    """Throttle whose counters are shared by all worker processes"""
+    scopes = ()
+
+    def __init__(self):
+        self._wait = None
+
+    def get_identifier(self, request, kind):
+        if kind == 'user':
+            if request.user and request.user.is_authenticated:
+                return request.user.pk
+            return self.get_ident(request)
+        if kind == 'username':
+            username = request.data.get('username') if hasattr(request.data, 'get') else None
+            return username.strip() if isinstance(username, str) and username.strip() else None
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        config = get_config()
+        if not config['ENABLED']:
+            return True
+        for scope in self.scopes:
+            scope_config = config['SCOPES'].get(scope)
+            if scope_config is None:
+                continue
+            kind = scope_config.get('KEY', 'ip')
+            identifier = self.get_identifier(request, kind)
+            if identifier is None:
+                continue
+            wait = hit(scope, kind, identifier, scope_config)
+            if wait:
+                self._wait = wait
+                return False
+        return True
+
+    def wait(self):
+        # Whole seconds, Retry-After does not take fractions
+        return math.ceil(self._wait) if self._wait else None
+
+
+class LoginThrottle(SharedRateThrottle):
+    scopes = ('login', 'login_account')
+
+
+class RegisterThrottle(SharedRateThrottle):
+    scopes = ('register',)
+
+
+class PasswordChangeThrottle(SharedRateThrottle):
+    scopes = ('change_password',)
+
+
+class BatchThrottle(SharedRateThrottle):
+    scopes = ('batch',)
+
+
+class PublicVacancyThrottle(SharedRateThrottle):
+    scopes = ('public_vacancies',)